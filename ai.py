@@ -0,0 +1,301 @@
+"""
+KI-Gegner und asynchrone Zugberechnung
+Die Suche läuft auf einer Kopie des Spiels in einem Worker-Thread oder
+-Prozess, damit die Spielschleife beim Nachdenken der KI nicht blockiert.
+multiprocessing und concurrent.futures lädt erst AsyncMoveProvider, damit
+Worker-Prozesse, die nur die Suchen brauchen, schnell starten.
+"""
+import random
+import threading
+import time
+
+from endgame import EndgameSolver
+from game import Game, Move
+from metrics import AI_THINK_SECONDS, REGISTRY, collect_in_worker
+
+
+class MoveSearch:
+    """
+    Basisklasse für Zugsuchen
+    """
+    
+    def choose_move(self, game:Game, cancel_event:threading.Event | None = None) -> Move | None:
+        """
+        Wählt einen Zug für den aktuellen Spieler
+        
+        Args:
+            game: Game-Objekt (darf verändert werden)
+            cancel_event: Wird gesetzt, wenn die Suche abbrechen soll
+        
+        Returns:
+            Move oder None (kein Zug möglich oder abgebrochen)
+        """
+        raise NotImplementedError
+
+
+class GreedySearch(MoveSearch):
+    """
+    Einfache Suche: probiert alle Felder und Drehungen aus und wählt den Zug
+    mit dem größten Vorsprung vor dem besten Gegner
+    """
+    
+    def __init__(self, seed:int | None = None):
+        """
+        Initialisiert die Suche
+        
+        Args:
+            seed: Seed für die Auswahl bei gleich guten Zügen
+        """
+        self.rng = random.Random(seed)
+    
+    def candidate_moves(self, game:Game) -> list[Move]:
+        """
+        Gibt alle unterschiedlichen Züge des Spielers am Zug zurück
+        
+        Args:
+            game: Game-Objekt
+        
+        Returns:
+            list: Liste von Move-Objekten
+        """
+        return game.legal_moves()
+    
+    def evaluate(self, game:Game, player_index:int) -> int:
+        """
+        Bewertet eine Stellung aus Sicht eines Spielers
+        
+        Args:
+            game: Game-Objekt
+            player_index: Index des Spielers
+        
+        Returns:
+            int: Eigene Punkte minus Punkte des besten Gegners
+        """
+        scores = [player.score for player in game.player_manager.players]
+        own = scores.pop(player_index)
+        return own - max(scores, default=0)
+    
+    def choose_move(self, game:Game, cancel_event:threading.Event | None = None) -> Move | None:
+        """Wählt den Zug mit der besten Bewertung nach einem Halbzug"""
+        player_index = game.player_manager.current_player_index
+        best_moves = []
+        best_value = None
+        
+        with game.probing():
+            for move in self.candidate_moves(game):
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                
+                # Zug ausprobieren und zurücknehmen statt das Spiel zu kopieren
+                if not game.apply_move(move):
+                    continue
+                value = self.evaluate(game, player_index)
+                game.undo_move()
+                
+                if best_value is None or value > best_value:
+                    best_value = value
+                    best_moves = [move]
+                elif value == best_value:
+                    best_moves.append(move)
+        
+        if not best_moves:
+            return None
+        return self.rng.choice(best_moves)
+
+
+class EndgameSearch(MoveSearch):
+    """
+    Spielt die letzten Züge exakt (EndgameSolver) und davor mit einer
+    anderen Suche
+    """
+    
+    def __init__(self, fallback:MoveSearch | None = None, solver:EndgameSolver | None = None):
+        """
+        Initialisiert die Suche
+        
+        Args:
+            fallback: Suche vor dem Endspiel (Standard: GreedySearch)
+            solver: Endspiel-Löser (Standard: EndgameSolver mit Standardschwelle)
+        """
+        self.fallback = fallback if fallback is not None else GreedySearch()
+        self.solver = solver if solver is not None else EndgameSolver()
+    
+    def choose_move(self, game:Game, cancel_event:threading.Event | None = None) -> Move | None:
+        """Wählt im Endspiel den optimalen Zug, sonst den Zug der Ersatzsuche"""
+        if self.solver.is_applicable(game):
+            result = self.solver.solve(game, cancel_event)
+            if result is not None and result.move is not None:
+                return result.move
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+        return self.fallback.choose_move(game, cancel_event)
+
+
+def _run_search(search:MoveSearch, game:Game, cancel_event=None) -> Move | None:
+    """Worker-Funktion für Threads und Prozesse, misst die Bedenkzeit"""
+    start = time.perf_counter_ns()
+    move = search.choose_move(game, cancel_event)
+    AI_THINK_SECONDS.observe_ns(time.perf_counter_ns() - start)
+    return move
+
+
+class _CancelFlag:
+    """
+    Abbruchsignal über Prozessgrenzen mit der Schnittstelle von threading.Event
+    Ein gemeinsamer Zähler (multiprocessing.RawValue) hält die höchste
+    abgebrochene Anfragenummer; eine Anfrage gilt als abgebrochen, sobald
+    der Zähler ihre Nummer erreicht. Ältere Anfragen sind dann ohnehin veraltet.
+    """
+    
+    __slots__ = ('cancelled', 'request_id')
+    
+    def __init__(self, cancelled, request_id:int):
+        """
+        Initialisiert das Signal
+        
+        Args:
+            cancelled: Gemeinsamer Zähler der abgebrochenen Anfragen
+            request_id: Nummer der Anfrage (fortlaufend ab 1)
+        """
+        self.cancelled = cancelled
+        self.request_id = request_id
+    
+    def is_set(self) -> bool:
+        """Ob die Anfrage abgebrochen wurde"""
+        return self.cancelled.value >= self.request_id
+    
+    def set(self) -> None:
+        """Bricht die Anfrage (und alle älteren) ab"""
+        if self.cancelled.value < self.request_id:
+            self.cancelled.value = self.request_id
+
+
+_process_cancelled = None  # Im Worker-Prozess: Zähler der abgebrochenen Anfragen
+
+
+def _init_search_process(cancelled) -> None:
+    """Initialisiert einen Worker-Prozess mit dem gemeinsamen Abbruchzähler"""
+    global _process_cancelled
+    _process_cancelled = cancelled
+
+
+def _run_search_in_process(search:MoveSearch, game:Game, request_id:int) -> tuple:
+    """Worker-Funktion für Prozesse: liefert den Zug und das Kennzahlen-Delta"""
+    return collect_in_worker(_run_search, search, game, _CancelFlag(_process_cancelled, request_id))
+
+
+def _merge_worker_metrics(future) -> None:
+    """Führt die Kennzahlen eines Worker-Prozesses in die eigene Registry zusammen"""
+    if not future.cancelled() and future.exception() is None:
+        REGISTRY.merge(future.result()[1])
+
+
+class MoveRequest:
+    """
+    Handle auf eine laufende Zugberechnung
+    Wird von der Spielschleife pro Frame abgefragt, ohne zu blockieren.
+    """
+    
+    def __init__(self, future, cancel_event, move_number:int, with_metrics:bool = False):
+        """
+        Initialisiert das Handle
+        
+        Args:
+            future: concurrent.futures.Future der Suche
+            cancel_event: threading.Event bzw. _CancelFlag (Prozesse) zum Abbrechen
+            move_number: Zugnummer des Spiels beim Start der Suche
+            with_metrics: Ergebnis ist ein Paar (Zug, Kennzahlen-Delta) aus einem Prozess
+        """
+        self.future = future
+        self.cancel_event = cancel_event
+        self.move_number = move_number
+        self.with_metrics = with_metrics
+        self.cancelled = False
+    
+    @property
+    def done(self) -> bool:
+        """Ob die Suche beendet (oder abgebrochen) ist"""
+        return self.cancelled or self.future.done()
+    
+    def poll(self) -> Move | None:
+        """
+        Fragt das Ergebnis ab, ohne zu warten
+        
+        Returns:
+            Move oder None (noch nicht fertig, abgebrochen oder kein Zug)
+        """
+        if self.cancelled or not self.future.done():
+            return None
+        if self.future.exception() is not None:
+            return None
+        if self.with_metrics:
+            return self.future.result()[0]
+        return self.future.result()
+    
+    def cancel(self) -> None:
+        """Bricht die Suche ab; ein späteres Ergebnis wird verworfen"""
+        self.cancelled = True
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.future.cancel()
+
+
+class AsyncMoveProvider:
+    """
+    Berechnet KI-Züge im Hintergrund
+    Jede Anfrage sucht auf einer Kopie des Spiels, der laufende Zustand
+    wird dabei nicht verändert.
+    """
+    
+    def __init__(self, search:MoveSearch | None = None, use_processes:bool = False):
+        """
+        Initialisiert den Provider
+        
+        Args:
+            search: Zugsuche (Standard: EndgameSearch mit GreedySearch)
+            use_processes: Suche in einem eigenen Prozess statt einem Thread
+        """
+        self.search = search if search is not None else EndgameSearch()
+        self.use_processes = use_processes
+        self._request_id = 0
+        if use_processes:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn: Worker laden nur die Logikmodule, kein PyGame
+            context = multiprocessing.get_context('spawn')
+            # Gemeinsamer Speicher statt Event: Synchronisationsobjekte lassen sich
+            # nur beim Start an den Worker übergeben, nicht mit jeder Anfrage
+            self._cancelled = context.RawValue('q', 0)
+            self.executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=context,
+                initializer=_init_search_process, initargs=(self._cancelled,)
+            )
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='carat-ai')
+    
+    def request(self, game:Game) -> MoveRequest:
+        """
+        Startet die Zugberechnung für den aktuellen Spieler
+        
+        Args:
+            game: Game-Objekt
+        
+        Returns:
+            MoveRequest: Handle zum Abfragen und Abbrechen
+        """
+        snapshot = game.snapshot()
+        if self.use_processes:
+            # Kennzahlen des Workers kommen mit dem Ergebnis zurück
+            self._request_id += 1
+            future = self.executor.submit(_run_search_in_process, self.search, snapshot, self._request_id)
+            future.add_done_callback(_merge_worker_metrics)
+            return MoveRequest(future, _CancelFlag(self._cancelled, self._request_id), game.move_number,
+                               with_metrics=True)
+        cancel_event = threading.Event()
+        future = self.executor.submit(_run_search, self.search, snapshot, cancel_event)
+        return MoveRequest(future, cancel_event, game.move_number)
+    
+    def shutdown(self) -> None:
+        """Beendet den Worker"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,227 @@
+"""
+Zeitgesteuerte Animationen (Plättchen legen, Chips einsammeln, Linien werten)
+Animationen laufen nach vergangener Zeit, nicht nach Frames, und zeichnen nur
+vorgezeichnete Sprites des Renderers (Renderer.tile_sprite, chip_sprite,
+highlight_sprite). Positionen stammen aus dem Layout beim Anlegen. Solange keine Animation aktiv ist, muss die Spielschleife
+nichts neu zeichnen.
+"""
+from constants import CHIP_FLIGHT_DURATION, CHIP_FLIGHT_STAGGER, LINE_HIGHLIGHT_DURATION, TILE_SLIDE_DURATION
+
+# Chips schrumpfen im Flug in Stufen; jede Stufe wird einmal skaliert
+CHIP_SCALE_STEPS = (100, 90, 80, 70, 60, 50)
+HIGHLIGHT_MAX_ALPHA = 140
+
+
+def ease_out(t:float) -> float:
+    """Abbremsende Bewegung: schnell am Anfang, weich am Ende (0..1 -> 0..1)"""
+    return 1 - (1 - t) ** 3
+
+
+def _lerp(start:tuple, end:tuple, t:float) -> tuple[int, int]:
+    """Interpoliert zwischen zwei Punkten"""
+    return round(start[0] + (end[0] - start[0]) * t), round(start[1] + (end[1] - start[1]) * t)
+
+
+class Animation:
+    """
+    Basisklasse: eine Animation mit Startzeit und Dauer
+    """
+    
+    def __init__(self, start:float, duration:float):
+        """
+        Initialisiert die Animation
+        
+        Args:
+            start: Startzeit in Sekunden
+            duration: Dauer in Sekunden
+        """
+        self.start = start
+        self.duration = duration
+    
+    def progress(self, now:float) -> float:
+        """Gibt den Fortschritt zurück (0 vor dem Start, 1 nach dem Ende)"""
+        return min(1.0, max(0.0, (now - self.start) / self.duration))
+    
+    def finished(self, now:float) -> bool:
+        """Prüft, ob die Animation abgelaufen ist"""
+        return now >= self.start + self.duration
+    
+    def draw(self, renderer, now:float) -> None:
+        """
+        Zeichnet den Zustand zum Zeitpunkt now
+        
+        Args:
+            renderer: Renderer-Objekt
+            now: Aktuelle Zeit in Sekunden
+        """
+        raise NotImplementedError
+
+
+class TileSlide(Animation):
+    """
+    Ein Plättchen gleitet von seiner Ausgangsposition in sein Feld
+    """
+    
+    def __init__(self, start:float, tile, cell:tuple[int, int], origin:tuple[int, int],
+                 target:tuple[int, int], duration:float = TILE_SLIDE_DURATION):
+        """
+        Initialisiert die Animation
+        
+        Args:
+            start: Startzeit in Sekunden
+            tile: Gelegtes Tile-Objekt
+            cell: (row, col) des Zielfelds (wird bis zum Ende ausgelassen)
+            origin: Ausgangsposition in Pixeln (linke obere Ecke)
+            target: Zielposition in Pixeln (linke obere Ecke)
+            duration: Dauer in Sekunden
+        """
+        super().__init__(start, duration)
+        self.tile = tile
+        self.cell = cell
+        self.origin = origin
+        self.target = target
+    
+    def draw(self, renderer, now:float) -> None:
+        """Zeichnet das Plättchen auf seinem Weg"""
+        position = _lerp(self.origin, self.target, ease_out(self.progress(now)))
+        renderer.screen.blit(renderer.tile_sprite(self.tile), position)
+
+
+class ChipFlight(Animation):
+    """
+    Ein eingesammelter Chip fliegt vom Feld zum Eintrag seines Spielers
+    Bis zum Start liegt er noch auf dem Feld.
+    """
+    
+    def __init__(self, start:float, value:int, origin:tuple[int, int], target:tuple[int, int],
+                 duration:float = CHIP_FLIGHT_DURATION):
+        """
+        Initialisiert die Animation
+        
+        Args:
+            start: Startzeit in Sekunden
+            value: Chipwert
+            origin: Mittelpunkt auf dem Spielfeld (Pixel)
+            target: Mittelpunkt in der Spielerinfo (Pixel)
+            duration: Dauer in Sekunden
+        """
+        super().__init__(start, duration)
+        self.value = value
+        self.origin = origin
+        self.target = target
+    
+    def draw(self, renderer, now:float) -> None:
+        """Zeichnet den Chip auf seinem Weg, kleiner werdend"""
+        t = self.progress(now)
+        x, y = _lerp(self.origin, self.target, ease_out(t))
+        step = CHIP_SCALE_STEPS[min(len(CHIP_SCALE_STEPS) - 1, int(t * len(CHIP_SCALE_STEPS)))]
+        renderer.draw_chip_value(self.value, x, y, step)
+
+
+class LineHighlight(Animation):
+    """
+    Eine gewertete Zeile oder Spalte leuchtet kurz auf
+    """
+    
+    def __init__(self, start:float, rect:tuple[int, int, int, int],
+                 duration:float = LINE_HIGHLIGHT_DURATION):
+        """
+        Initialisiert die Animation
+        
+        Args:
+            start: Startzeit in Sekunden
+            rect: (x, y, Breite, Höhe) der Linie in Pixeln
+            duration: Dauer in Sekunden
+        """
+        super().__init__(start, duration)
+        self.rect = rect
+    
+    def draw(self, renderer, now:float) -> None:
+        """Zeichnet die Hervorhebung, ein- und wieder ausblendend"""
+        t = self.progress(now)
+        alpha = round(HIGHLIGHT_MAX_ALPHA * (1 - abs(2 * t - 1)))
+        if alpha <= 0:
+            return
+        x, y, width, height = self.rect
+        sprite = renderer.highlight_sprite(width, height)
+        sprite.set_alpha(alpha)
+        renderer.screen.blit(sprite, (x, y))
+
+
+class Timeline:
+    """
+    Verwaltet laufende Animationen
+    """
+    
+    def __init__(self):
+        """Initialisiert eine leere Zeitleiste"""
+        self.animations = []
+    
+    @property
+    def active(self) -> bool:
+        """Ob noch Animationen laufen oder warten"""
+        return bool(self.animations)
+    
+    def add(self, animation:Animation) -> None:
+        """Fügt eine Animation hinzu"""
+        self.animations.append(animation)
+    
+    def clear(self) -> None:
+        """Entfernt alle Animationen"""
+        self.animations.clear()
+    
+    def update(self, now:float) -> None:
+        """Entfernt abgelaufene Animationen"""
+        if self.animations:
+            self.animations = [animation for animation in self.animations if not animation.finished(now)]
+    
+    def hidden_cells(self) -> set:
+        """Felder, deren Plättchen noch unterwegs ist und nicht gezeichnet werden soll"""
+        return {animation.cell for animation in self.animations if isinstance(animation, TileSlide)}
+    
+    def draw(self, renderer, now:float) -> None:
+        """Zeichnet alle Animationen in der Reihenfolge des Hinzufügens"""
+        for animation in self.animations:
+            animation.draw(renderer, now)
+
+
+def animate_move(timeline:Timeline, renderer, game, now:float,
+                 origin:tuple[int, int] | None = None) -> None:
+    """
+    Legt die Animationen für den zuletzt gespielten Zug an
+    Das Plättchen gleitet ins Feld, danach leuchten gewertete Linien auf und
+    die eingesammelten Chips fliegen nacheinander zu ihren Spielern.
+    
+    Args:
+        timeline: Zeitleiste
+        renderer: Renderer-Objekt
+        game: Game-Objekt direkt nach dem Zug
+        now: Aktuelle Zeit in Sekunden
+        origin: Ausgangsposition des Plättchens (Standard: Vorschau des aktuellen Plättchens)
+    """
+    layout = renderer.layout
+    cell_size = layout.cell_size
+    move = game.move_history[-1]
+    tile = game.board.get_tile(move.row, move.col)
+    x, y = renderer.cell_origin(move.row, move.col)
+    if origin is None:
+        origin = renderer.current_tile_origin()
+    timeline.add(TileSlide(now, tile, (move.row, move.col), origin, (x + layout.tile_inset, y + layout.tile_inset)))
+    
+    scoring = game.last_scoring
+    if not scoring or not scoring['scored']:
+        return
+    start = now + TILE_SLIDE_DURATION
+    size = game.board.size * cell_size
+    for row in scoring['rows']:
+        left, top = renderer.cell_origin(row, 0)
+        timeline.add(LineHighlight(start, (left, top, size, cell_size)))
+    for col in scoring['cols']:
+        left, top = renderer.cell_origin(0, col)
+        timeline.add(LineHighlight(start, (left, top, cell_size, size)))
+    for index, (row, col, player_index, value) in enumerate(scoring['chips']):
+        left, top = renderer.cell_origin(row, col)
+        panel_x, panel_y = renderer.player_panel_origin(player_index)
+        timeline.add(ChipFlight(start + index * CHIP_FLIGHT_STAGGER, value,
+                                (left + cell_size // 2, top + cell_size // 2),
+                                (panel_x + layout.px(20), panel_y + layout.px(15))))
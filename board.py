@@ -1,28 +1,109 @@
 """
 Board-Klasse für Spielfeldverwaltung
 """
+import random
+from array import array
+from bisect import insort
+from collections import Counter
+from collections.abc import Sequence
+
 from constants import *
-from point_chip import PointChip
+from point_chip import PointChip, PointChipView
+from rules import STANDARD_RULES, RuleSet
 from tile import Tile
 
 
+class BoardCells(Sequence):
+    """
+    Alle Felder eines leeren Spielfelds als (row, col), zeilenweise
+    Liefert Felder erst beim Zugriff, damit ein leeres 128x128-Spielfeld
+    keine Liste mit allen Feldern braucht; Enthaltensein und Indexzugriff
+    kosten O(1).
+    """
+    
+    def __init__(self, size:int):
+        """
+        Initialisiert die Folge
+        
+        Args:
+            size: Größe des Spielfelds
+        """
+        self.size = size
+    
+    def __len__(self):
+        return self.size * self.size
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Feldindex außerhalb des Spielfelds")
+        return divmod(index, self.size)
+    
+    def __iter__(self):
+        size = self.size
+        for row in range(size):
+            for col in range(size):
+                yield row, col
+    
+    def __contains__(self, cell):
+        row, col = cell
+        return 0 <= row < self.size and 0 <= col < self.size
+    
+    def __eq__(self, other):
+        if isinstance(other, BoardCells):
+            return self.size == other.size
+        if isinstance(other, (list, tuple)):
+            return len(other) == len(self) and list(self) == list(other)
+        return NotImplemented
+    
+    def __repr__(self):
+        return f"BoardCells(size={self.size})"
+
+
 class Board:
     """
     Repräsentiert das 7x7 Spielfeld
     """
     
-    def __init__(self, size:int = BOARD_SIZE):
+    def __init__(self, size:int = BOARD_SIZE, rules:RuleSet = STANDARD_RULES, rng:random.Random | None = None):
         """
         Initialisiert das Spielfeld
         
         Args:
             size: Größe des Spielfelds (Standard: 8x8)
+            rules: Regelsatz (Nachbarschaft und Chipverteilung)
+            rng: Zufallsgenerator für die Chipverteilung (None = Modul random)
         """
         self.size = size
-        self.grid = [[None for _ in range(size)] for _ in range(size)]  # Plättchen
-        self.chips = PointChip.place_chips_on_board(size)  # Punktechips
+        self.rules = rules
+        # Einmal festgelegt, damit Randmenge und Rücknahme nicht nach Regeln verzweigen
+        self.neighbor_offsets = rules.neighbor_offsets
+        self._init_storage(rng)
         self.placed_tiles_count = 0 # for first placed tile
-        self.placed_tiles = [[0 for _ in range(size)] for _ in range(size)]
+        self.row_counts = self._new_line_counter()  # Plättchen je Zeile
+        self.col_counts = self._new_line_counter()  # Plättchen je Spalte
+        self.completed_rows = []
+        self.completed_cols = []
+        self.frontier = set()  # Leere Felder, die an ein Plättchen angrenzen
+    
+    def _init_storage(self, rng:random.Random | None = None):
+        """Legt die dichte Speicherung für Plättchen und Punktechips an"""
+        self.grid = [[None for _ in range(self.size)] for _ in range(self.size)]  # Plättchen
+        # Punktechips als flache Arrays (Index = row * size + col)
+        cell_count = self.size * self.size
+        self.chip_values = array('B', PointChip.generate_chip_values(cell_count, self.rules.chip_values, rng))
+        self.chip_collected = 0  # Bitmaske der eingesammelten Chips
+        self.chip_owner = array('b', [-1]) * cell_count  # Spielerindex oder -1
+        # Plättchen zusätzlich flach: 4 Diamanten je Feld (0 = leer) und Besitzerindex
+        self.cell_diamonds = bytearray(4 * cell_count)
+        self.cell_owners = array('b', [-1]) * cell_count
+    
+    def _new_line_counter(self):
+        """Erzeugt einen Zähler für belegte Felder pro Zeile bzw. Spalte"""
+        return [0] * self.size
     
     def is_valid_position(self, row, col):
         """
@@ -55,7 +136,8 @@ class Board:
         Prüft, ob ein Plättchen an dieser Position platziert werden kann
         Regeln:
         - Erstes Plättchen kann überall hin
-        - Weitere Plättchen müssen eine gemeinsame Ecke mit einem vorhandenen haben
+        - Weitere Plättchen müssen an ein vorhandenes angrenzen (Standard:
+          gemeinsame Ecke, je nach Regelsatz gemeinsame Kante)
         
         Args:
             row: Zeile
@@ -64,29 +146,12 @@ class Board:
         Returns:
             bool: True wenn Platzierung erlaubt
         """
-        # Position muss gültig und leer sein
-        if not self.is_empty(row, col):
-            return False
-        
         # Erstes Plättchen darf überall hin
         if self.placed_tiles_count == 0:
-            return True
-        
-        # Prüfe ob es eine gemeinsame Ecke mit einem vorhandenen Plättchen gibt
-        # Ecknachbarn: diagonal benachbart
-        corner_neighbors = [
-            (row - 1, col - 1),  # oben links
-            (row - 1, col + 1),  # oben rechts
-            (row + 1, col - 1),  # unten links
-            (row + 1, col + 1)   # unten rechts
-        ]
+            return self.is_empty(row, col)
         
-        for neighbor_row, neighbor_col in corner_neighbors:
-            if self.is_valid_position(neighbor_row, neighbor_col):
-                if self.grid[neighbor_row][neighbor_col] is not None:
-                    return True
-        
-        return False
+        # Die Randmenge enthält genau die leeren angrenzenden Felder
+        return (row, col) in self.frontier
     
     def place_tile(self, tile, row, col):
         """
@@ -103,10 +168,91 @@ class Board:
         if not self.can_place_tile(row, col):
             return False
         
-        self.grid[row][col] = tile
+        self.restore_tile(tile, row, col)
+        return True
+    
+    def restore_tile(self, tile, row, col):
+        """
+        Legt ein Plättchen ohne Regelprüfung ab, z.B. beim Laden eines Spielstands
+        Zähler, vollständige Linien und Randmenge werden wie beim Platzieren
+        fortgeschrieben, die Reihenfolge der Aufrufe spielt keine Rolle.
+        
+        Args:
+            tile: Tile-Objekt
+            row: Zeile
+            col: Spalte
+        """
+        self._store_tile(tile, row, col)
         tile.set_position(row, col)
         self.placed_tiles_count += 1
-        return True
+        self._update_lines(row, col)
+        self._update_frontier(row, col)
+    
+    def remove_tile(self, row, col):
+        """
+        Nimmt ein Plättchen wieder vom Spielfeld, z.B. beim Zurücknehmen eines Zugs
+        Zähler, vollständige Linien und Randmenge werden lokal zurückgerechnet.
+        
+        Args:
+            row: Zeile
+            col: Spalte
+        
+        Returns:
+            Tile: Das entfernte Plättchen
+        """
+        tile = self.get_tile(row, col)
+        if tile is None:
+            raise ValueError(f"Kein Plättchen auf Feld ({row}, {col})")
+        self._store_tile(None, row, col)
+        self.placed_tiles_count -= 1
+        
+        if self.row_counts[row] == self.size:
+            self.completed_rows.remove(row)
+        self.row_counts[row] -= 1
+        if self.col_counts[col] == self.size:
+            self.completed_cols.remove(col)
+        self.col_counts[col] -= 1
+        
+        # Nur das Feld selbst und seine Nachbarn können sich ändern
+        cells = [(row, col)] + [(row + d_row, col + d_col) for d_row, d_col in self.neighbor_offsets]
+        for cell in cells:
+            if self.is_empty(*cell) and self._touches_tile(*cell):
+                self.frontier.add(cell)
+            else:
+                self.frontier.discard(cell)
+        return tile
+    
+    def _touches_tile(self, row, col):
+        """Prüft, ob ein Feld an ein Plättchen angrenzt"""
+        return any(self.get_tile(row + d_row, col + d_col) is not None for d_row, d_col in self.neighbor_offsets)
+    
+    def _store_tile(self, tile, row, col):
+        """Legt ein Plättchen im Speicher des Spielfelds ab (None entfernt es)"""
+        self.grid[row][col] = tile
+        index = row * self.size + col
+        if tile is None:
+            self.cell_diamonds[4 * index:4 * index + 4] = bytes(4)
+            self.cell_owners[index] = -1
+        else:
+            self.cell_diamonds[4 * index:4 * index + 4] = bytes(tile.diamonds)
+            self.cell_owners[index] = PLAYER_COLOR_INDEX.get(tile.owner, -1)
+    
+    def _update_lines(self, row, col):
+        """Aktualisiert die Zeilen-/Spaltenzähler nach einer Platzierung"""
+        self.row_counts[row] += 1
+        if self.row_counts[row] == self.size:
+            insort(self.completed_rows, row)
+        
+        self.col_counts[col] += 1
+        if self.col_counts[col] == self.size:
+            insort(self.completed_cols, col)
+    
+    def _update_frontier(self, row, col):
+        """Aktualisiert die Randmenge gültiger Felder nach einer Platzierung"""
+        self.frontier.discard((row, col))
+        for d_row, d_col in self.neighbor_offsets:
+            if self.is_empty(row + d_row, col + d_col):
+                self.frontier.add((row + d_row, col + d_col))
     
     def get_tile(self, row:int, col:int) -> Tile | None:
         """
@@ -123,18 +269,85 @@ class Board:
             return self.grid[row][col]
         return None
     
-    def get_chip(self, row:int, col:int) -> PointChip | None:
+    def get_chip(self, row:int, col:int) -> PointChipView | None:
         """
         Gibt den Punktechip an einer Position zurück
+        Die Sicht liest direkt aus dem Chipspeicher des Spielfelds.
         
         Args:
             row: Zeile
             col: Spalte
         
         Returns:
-            PointChip oder None
+            PointChipView oder None
         """
-        return self.chips.get((row, col))
+        if self.get_chip_value(row, col):
+            return PointChipView(self, row, col)
+        return None
+    
+    def get_chip_value(self, row:int, col:int) -> int:
+        """
+        Gibt den Wert des Punktechips an einer Position zurück
+        
+        Returns:
+            int: Chipwert oder 0, wenn kein Chip vorhanden ist
+        """
+        if self.is_valid_position(row, col):
+            return self.chip_values[row * self.size + col]
+        return 0
+    
+    def is_chip_collected(self, row:int, col:int) -> bool:
+        """Prüft, ob der Chip an einer Position bereits eingesammelt wurde"""
+        return bool(self.chip_collected >> (row * self.size + col) & 1)
+    
+    def get_chip_owner(self, row:int, col:int) -> int:
+        """
+        Gibt den Spielerindex zurück, der den Chip eingesammelt hat
+        
+        Returns:
+            int: Spielerindex oder -1
+        """
+        return self.chip_owner[row * self.size + col]
+    
+    def collect_chip(self, row:int, col:int, owner_index:int) -> int:
+        """
+        Sammelt den Chip an einer Position für einen Spieler ein
+        
+        Args:
+            row: Zeile
+            col: Spalte
+            owner_index: Index des Spielers
+        
+        Returns:
+            int: Wert des eingesammelten Chips (0 wenn bereits gesammelt)
+        """
+        index = row * self.size + col
+        if self.chip_collected >> index & 1:
+            return 0
+        self.chip_collected |= 1 << index
+        self.chip_owner[index] = owner_index
+        return self.chip_values[index]
+    
+    def release_chip(self, row:int, col:int) -> None:
+        """Gibt einen eingesammelten Chip wieder frei (Gegenstück zu collect_chip)"""
+        index = row * self.size + col
+        self.chip_collected &= ~(1 << index)
+        self.chip_owner[index] = -1
+    
+    def get_chip_state(self):
+        """
+        Gibt eine Kopie des veränderlichen Chipzustands zurück
+        
+        Returns:
+            tuple: (Bitmaske, Besitzer-Array)
+        """
+        return self.chip_collected, array('b', self.chip_owner)
+    
+    def restore_chip_state(self, state) -> None:
+        """Stellt einen mit get_chip_state gesicherten Chipzustand wieder her"""
+        collected, owner = state
+        self.chip_collected = collected
+        self.chip_owner = array('b', owner)
     
     def is_row_complete(self, row:int) -> bool:
         """
@@ -146,10 +359,7 @@ class Board:
         Returns:
             bool: True wenn Zeile vollständig
         """
-        for col in range(self.size):
-            if self.grid[row][col] is None:
-                return False
-        return True
+        return self.row_counts[row] == self.size
     
     def is_column_complete(self, col:int) -> bool:
         """
@@ -161,10 +371,7 @@ class Board:
         Returns:
             bool: True wenn Spalte vollständig
         """
-        for row in range(self.size):
-            if self.grid[row][col] is None:
-                return False
-        return True
+        return self.col_counts[col] == self.size
     
     def get_completed_lines(self):
         """
@@ -173,35 +380,134 @@ class Board:
         Returns:
             dict: {'rows': [row_indices], 'cols': [col_indices]}
         """
-        completed = {'rows': [], 'cols': []}
-        
-        for row in range(self.size):
-            if self.is_row_complete(row):
-                completed['rows'].append(row)
-        
-        for col in range(self.size):
-            if self.is_column_complete(col):
-                completed['cols'].append(col)
-        
-        return completed
+        return {'rows': list(self.completed_rows), 'cols': list(self.completed_cols)}
     
     def get_valid_placements(self):
         """
         Gibt alle gültigen Positionen zurück, an denen ein Plättchen platziert werden kann
         
+        Vor dem ersten Plättchen ist jedes Feld gültig (BoardCells, ohne
+        Liste aller Felder), danach nur die Felder der Randmenge.
+        
         Returns:
-            list: Liste von (row, col) Tupeln
+            Sequence: (row, col) Tupel
+        """
+        if self.placed_tiles_count == 0:
+            return BoardCells(self.size)
+        return sorted(self.frontier)
+    
+    def has_valid_placement(self) -> bool:
+        """Prüft ohne Aufbau der Liste, ob noch eine gültige Position existiert"""
+        if self.placed_tiles_count == 0:
+            return self.size > 0
+        return bool(self.frontier)
+    
+    def iter_tiles(self):
+        """
+        Liefert alle platzierten Plättchen
+        
+        Yields:
+            tuple: (row, col, Tile)
         """
-        valid_positions = []
-        for row in range(self.size):
-            for col in range(self.size):
-                if self.can_place_tile(row, col):
-                    valid_positions.append((row, col))
-        return valid_positions
+        for row, tiles in enumerate(self.grid):
+            for col, tile in enumerate(tiles):
+                if tile is not None:
+                    yield row, col, tile
     
     def __repr__(self):
         return f"Board(size={self.size}, placed_tiles={self.placed_tiles_count})"
 
-if __name__ == "__main__":
-    board = Board()
-    print(board.placed_tiles)
\ No newline at end of file
+
+class SparseBoard(Board):
+    """
+    Dünn besetztes Spielfeld für große Varianten (z.B. 32x32 bis 128x128)
+    Speichert nur belegte Felder und eingesammelte Punktechips in
+    Dictionaries. Chipwerte werden bei Bedarf aus einem Seed abgeleitet,
+    sodass der Aufwand aller Methoden mit der Zahl belegter Felder wächst
+    und nicht mit der Fläche des Spielfelds.
+    """
+    
+    def __init__(self, size:int = BOARD_SIZE, chip_seed:int | None = None, rules:RuleSet = STANDARD_RULES,
+                 rng:random.Random | None = None):
+        """
+        Initialisiert das Spielfeld
+        
+        Args:
+            size: Größe des Spielfelds
+            chip_seed: Seed für die Chipverteilung (None = zufällig)
+            rules: Regelsatz (Nachbarschaft und Chipverteilung)
+            rng: Zufallsgenerator für einen zufälligen chip_seed (None = Modul random)
+        """
+        self.chip_seed = (rng or random).getrandbits(64) if chip_seed is None else chip_seed
+        self._chip_distribution = rules.chip_values
+        super().__init__(size, rules)
+    
+    def _init_storage(self, rng:random.Random | None = None):
+        """Legt die dünne Speicherung für Plättchen und Punktechips an"""
+        self.tiles = {}  # (row, col) -> Tile
+        self.chip_owners = {}  # (row, col) -> Spielerindex, nur eingesammelte
+    
+    def _new_line_counter(self):
+        """Erzeugt einen Zähler, der nur belegte Zeilen bzw. Spalten speichert"""
+        return Counter()
+    
+    def is_empty(self, row, col):
+        """Prüft, ob eine Position leer ist"""
+        return self.is_valid_position(row, col) and (row, col) not in self.tiles
+    
+    def _store_tile(self, tile, row, col):
+        """Legt ein Plättchen im Speicher des Spielfelds ab (None entfernt es)"""
+        if tile is None:
+            self.tiles.pop((row, col), None)
+        else:
+            self.tiles[(row, col)] = tile
+    
+    def get_tile(self, row:int, col:int) -> Tile | None:
+        """Gibt das Plättchen an einer Position zurück"""
+        return self.tiles.get((row, col))
+    
+    def get_chip_value(self, row:int, col:int) -> int:
+        """Gibt den aus dem Seed abgeleiteten Chipwert einer Position zurück"""
+        if self.is_valid_position(row, col):
+            return PointChip.chip_value_at(self.chip_seed, row, col, self._chip_distribution)
+        return 0
+    
+    def is_chip_collected(self, row:int, col:int) -> bool:
+        """Prüft, ob der Chip an einer Position bereits eingesammelt wurde"""
+        return (row, col) in self.chip_owners
+    
+    def get_chip_owner(self, row:int, col:int) -> int:
+        """Gibt den Spielerindex zurück, der den Chip eingesammelt hat"""
+        return self.chip_owners.get((row, col), -1)
+    
+    def collect_chip(self, row:int, col:int, owner_index:int) -> int:
+        """Sammelt den Chip an einer Position für einen Spieler ein"""
+        if (row, col) in self.chip_owners:
+            return 0
+        self.chip_owners[(row, col)] = owner_index
+        return self.get_chip_value(row, col)
+    
+    def release_chip(self, row:int, col:int) -> None:
+        """Gibt einen eingesammelten Chip wieder frei (Gegenstück zu collect_chip)"""
+        self.chip_owners.pop((row, col), None)
+    
+    def get_chip_state(self):
+        """Gibt eine Kopie des veränderlichen Chipzustands zurück"""
+        return dict(self.chip_owners)
+    
+    def restore_chip_state(self, state) -> None:
+        """Stellt einen mit get_chip_state gesicherten Chipzustand wieder her"""
+        self.chip_owners = dict(state)
+    
+    def iter_tiles(self):
+        """
+        Liefert alle platzierten Plättchen
+        
+        Yields:
+            tuple: (row, col, Tile)
+        """
+        for (row, col), tile in self.tiles.items():
+            yield row, col, tile
+    
+    def __repr__(self):
+        return f"SparseBoard(size={self.size}, placed_tiles={self.placed_tiles_count})"
\ No newline at end of file
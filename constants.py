@@ -14,16 +14,24 @@ GRAY = (128, 128, 128)
 LIGHT_GRAY = (200, 200, 200)
 DARK_GRAY = (50, 50, 50)
 BACKGROUND = (37, 150, 190)  # Grey
+HINT_COLOR = (255, 215, 0)  # Rahmen des vorgeschlagenen Felds
+HIGHLIGHT_COLOR = (255, 255, 255)  # Aufleuchten gewerteter Linien
 
 # Spielerfarben
 PLAYER_COLORS = {
     'red': (220, 33, 33),
     'blue': (33, 33, 220),
     'green': (33, 180, 33),
-    'yellow': (220, 200, 33)
+    'yellow': (220, 200, 33),
+    'purple': (150, 60, 200),  # Spieler 5 und 6 nur in Regelvarianten
+    'orange': (240, 130, 30)
 }
 
-# Diamantenfarben (für die Plättchen)
+# Reihenfolge der Spielerfarben (Index = Spielerindex)
+PLAYER_COLOR_ORDER = list(PLAYER_COLORS)
+PLAYER_COLOR_INDEX = {color: index for index, color in enumerate(PLAYER_COLOR_ORDER)}
+
+# Diamantenfarben (für die Plättchen, immer die ersten vier Spielerfarben)
 DIAMOND_COLORS = {
     1: PLAYER_COLORS['red'],
     2: PLAYER_COLORS['blue'],
@@ -54,6 +62,12 @@ TEXT_COLOR = BLACK
 FONT_SIZE = 24
 TITLE_FONT_SIZE = 36
 
+# Animationen (Dauer in Sekunden)
+TILE_SLIDE_DURATION = 0.25
+CHIP_FLIGHT_DURATION = 0.6
+CHIP_FLIGHT_STAGGER = 0.08  # Versatz zwischen mehreren Chips
+LINE_HIGHLIGHT_DURATION = 0.8
+
 # Spielzustände
 GAME_STATE_MENU = "menu"
 GAME_STATE_PLAYING = "playing"
@@ -0,0 +1,154 @@
+"""
+Determinisierung verdeckter Hände für eine faire KI
+Ein Spieler sieht das Spielfeld und seine eigene Hand, aber nicht die Hände
+der Gegner. Der DeterminizationSampler erzeugt aus Sicht eines Spielers
+vollständige Spielstände, deren Gegnerhände zu allem Gesehenen passen:
+gleiche Plätze und Plättchenzahl, Plättchen aus der Verteilung des
+Plättchensatzes bzw. aus den noch nicht gesehenen Plättchen eines festen Satzes.
+
+Für Geschwindigkeit wird nur einmal eine Kopie des Spiels angelegt; jede
+Stichprobe überschreibt die Diamanten der verdeckten Plättchen an Ort und
+Stelle. Suchen auf der Stichprobe müssen ihre Züge daher vor der nächsten
+Stichprobe zurücknehmen (apply_move/undo_move).
+"""
+import random
+import threading
+from collections import Counter
+
+from ai import EndgameSearch, MoveSearch
+from constants import DIAMOND_COLORS
+from game import Game, Move
+from tile import rotation_class
+
+DEFAULT_SAMPLES = 16
+
+
+class DeterminizationSampler:
+    """
+    Erzeugt zur Sicht eines Spielers passende Spielstände mit zufälligen Gegnerhänden
+    """
+    
+    def __init__(self, game:Game, observer:int | None = None, deck:list | None = None,
+                 seed:int | None = None):
+        """
+        Initialisiert den Sampler mit einer eigenen Kopie des Spiels
+        
+        Args:
+            game: Game-Objekt (wird nicht verändert)
+            observer: Index des beobachtenden Spielers (Standard: Spieler am Zug)
+            deck: Fester Plättchensatz als Liste von Diamanten (None = jedes
+                  Plättchen unabhängig zufällig wie Tile.create_tile_set)
+            seed: Seed für die Stichproben
+        
+        Raises:
+            ValueError: Wenn Gesehenes nicht zum festen Plättchensatz passt
+        """
+        self.game = game.snapshot()
+        manager = self.game.player_manager
+        self.observer = manager.current_player_index if observer is None else observer
+        self.rng = random.Random(seed)
+        self._move_number = self.game.move_number
+        
+        # Verdeckt sind alle Plättchen auf den Händen der Gegner
+        self._hidden = [tile for index, player in enumerate(manager.players) if index != self.observer
+                        for tile in player.hand]
+        self._values = range(1, len(DIAMOND_COLORS) + 1)
+        self._pool = None if deck is None else self._unseen(deck)
+    
+    def _unseen(self, deck:list) -> list:
+        """Bestimmt die Plättchen des Satzes, die der Beobachter nicht gesehen hat"""
+        unseen = Counter(rotation_class(diamonds) for diamonds in deck)
+        seen = [tile for _, _, tile in self.game.board.iter_tiles()]
+        seen.extend(self.game.player_manager.players[self.observer].hand)
+        for tile in seen:
+            key = rotation_class(tile.diamonds)
+            if not unseen[key]:
+                raise ValueError(f"Plättchen {tile.diamonds} gehört nicht zum Plättchensatz")
+            unseen[key] -= 1
+        pool = [list(diamonds) for diamonds in unseen.elements()]
+        if len(pool) < len(self._hidden):
+            raise ValueError("Zu wenige ungesehene Plättchen für die Gegnerhände")
+        return pool
+    
+    @property
+    def hidden_count(self) -> int:
+        """Anzahl verdeckter Plättchen"""
+        return len(self._hidden)
+    
+    def sample(self) -> Game:
+        """
+        Erzeugt die nächste Stichprobe
+        Zurückgegeben wird immer dieselbe Game-Kopie mit neu gezogenen
+        Gegnerhänden; frühere Stichproben werden dabei überschrieben.
+        
+        Returns:
+            Game: Vollständiger Spielstand
+        
+        Raises:
+            RuntimeError: Wenn Züge auf der vorigen Stichprobe nicht zurückgenommen wurden
+        """
+        if self.game.move_number != self._move_number:
+            raise RuntimeError("Züge der vorigen Stichprobe wurden nicht zurückgenommen")
+        hidden = self._hidden
+        if self._pool is None:
+            values = self.rng.choices(self._values, k=4 * len(hidden))
+            for index, tile in enumerate(hidden):
+                tile.diamonds[:] = values[4 * index:4 * index + 4]
+        else:
+            # Teilweises Mischen: nur so viele Plättchen ziehen wie verdeckt sind
+            pool = self._pool
+            rng = self.rng
+            for index, tile in enumerate(hidden):
+                pick = rng.randrange(index, len(pool))
+                pool[index], pool[pick] = pool[pick], pool[index]
+                tile.diamonds[:] = pool[index]
+        return self.game
+    
+    def samples(self, count:int):
+        """
+        Liefert count Stichproben nacheinander (siehe sample)
+        
+        Yields:
+            Game: Vollständiger Spielstand
+        """
+        for _ in range(count):
+            yield self.sample()
+
+
+class DeterminizedSearch(MoveSearch):
+    """
+    Faire Zugsuche: wendet eine Suche auf mehrere Determinisierungen an und
+    wählt den Zug, der am häufigsten gewählt wurde
+    Die eigenen Plättchen und ihre Slots sind in allen Stichproben gleich,
+    die Züge daher vergleichbar.
+    """
+    
+    def __init__(self, search:MoveSearch | None = None, samples:int = DEFAULT_SAMPLES,
+                 deck:list | None = None, seed:int | None = None):
+        """
+        Initialisiert die Suche
+        
+        Args:
+            search: Suche je Stichprobe (Standard: EndgameSearch)
+            samples: Anzahl der Stichproben je Zug
+            deck: Fester Plättchensatz (siehe DeterminizationSampler)
+            seed: Seed für die Stichproben
+        """
+        self.search = search if search is not None else EndgameSearch()
+        self.samples = samples
+        self.deck = deck
+        self.rng = random.Random(seed)
+    
+    def choose_move(self, game:Game, cancel_event:threading.Event | None = None) -> Move | None:
+        """Wählt den Zug mit den meisten Stimmen über alle Stichproben"""
+        sampler = DeterminizationSampler(game, deck=self.deck, seed=self.rng.getrandbits(64))
+        votes = Counter()
+        for determinized in sampler.samples(self.samples):
+            move = self.search.choose_move(determinized, cancel_event)
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            if move is not None:
+                votes[move] += 1
+        if not votes:
+            return None
+        return votes.most_common(1)[0][0]
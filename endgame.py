@@ -0,0 +1,140 @@
+"""
+Exakter Endspiel-Löser
+Sind nur noch wenige Plättchen und Felder übrig, wird der Spielbaum mit
+apply_move/undo_move vollständig durchsucht. Jeder Spieler wählt den Zug mit
+dem größten Vorsprung vor dem besten Gegner (max^n).
+
+Stellungen werden über die Menge der seit der Wurzel gelegten Plättchen
+zwischengespeichert: Ein Chip gehört immer dem Besitzer des Plättchens und
+eine Linie wird nur nach ihrem vollständigen Inhalt gewertet, daher hängen
+Punktestand und Hände nicht von der Reihenfolge der Züge ab.
+"""
+import threading
+from typing import NamedTuple
+
+from game import Game, Move
+
+# Obergrenze für (Plättchen in allen Händen) × (Felder der Randmenge)
+DEFAULT_THRESHOLD = 24
+# Abbruch, falls eine Stellung trotz Schwelle zu groß ist
+DEFAULT_NODE_LIMIT = 200_000
+
+
+class EndgameResult(NamedTuple):
+    """
+    Ergebnis einer Endspiel-Berechnung
+    """
+    move: Move | None  # Bester Zug des Spielers am Zug
+    scores: tuple  # Exakte Endpunktzahlen aller Spieler bei optimalem Spiel
+    nodes: int  # Anzahl untersuchter Stellungen
+
+
+class _SearchAborted(Exception):
+    """Suche wurde abgebrochen oder hat das Knotenlimit überschritten"""
+
+
+class EndgameSolver:
+    """
+    Vollständige Suche mit Zwischenspeicher für die letzten Züge eines Spiels
+    """
+    
+    def __init__(self, threshold:int = DEFAULT_THRESHOLD, node_limit:int = DEFAULT_NODE_LIMIT):
+        """
+        Initialisiert den Löser
+        
+        Args:
+            threshold: Höchstwert für Plättchen × Randfelder, ab dem gelöst wird
+            node_limit: Höchstzahl untersuchter Stellungen pro Aufruf
+        """
+        self.threshold = threshold
+        self.node_limit = node_limit
+    
+    def is_applicable(self, game:Game) -> bool:
+        """
+        Prüft, ob die Stellung klein genug für eine exakte Lösung ist
+        
+        Args:
+            game: Game-Objekt
+        
+        Returns:
+            bool: True wenn solve() voraussichtlich schnell ist
+        """
+        if game.game_over or game.board.placed_tiles_count == 0:
+            return False
+        remaining = sum(player.get_tile_count() for player in game.player_manager.players)
+        return remaining * len(game.board.frontier) <= self.threshold
+    
+    def solve(self, game:Game, cancel_event:threading.Event | None = None) -> EndgameResult | None:
+        """
+        Berechnet den besten Zug und die exakten Endpunktzahlen
+        Das Spiel wird während der Suche verändert und danach exakt
+        wiederhergestellt.
+        
+        Args:
+            game: Game-Objekt
+            cancel_event: Wird gesetzt, wenn die Suche abbrechen soll
+        
+        Returns:
+            EndgameResult oder None (abgebrochen oder Knotenlimit erreicht)
+        """
+        self._table = {}
+        self._nodes = 0
+        self._cancel_event = cancel_event
+        depth = len(game.move_history)
+        with game.probing():
+            try:
+                scores, move = self._search(game, [])
+            except _SearchAborted:
+                while len(game.move_history) > depth:
+                    game.undo_move()
+                return None
+            finally:
+                self._table = None
+        return EndgameResult(move, scores, self._nodes)
+    
+    def _search(self, game:Game, placed:list) -> tuple:
+        """
+        Durchsucht eine Stellung rekursiv
+        
+        Args:
+            game: Game-Objekt
+            placed: Seit der Wurzel gelegte Plättchen (row, col, Diamanten, Spielerindex)
+        
+        Returns:
+            tuple: (Endpunktzahlen, bester Zug)
+        """
+        manager = game.player_manager
+        if game.game_over:
+            return tuple(player.score for player in manager.players), None
+        
+        player_index = manager.current_player_index
+        key = (frozenset(placed), player_index)
+        cached = self._table.get(key)
+        if cached is not None:
+            return cached
+        
+        self._nodes += 1
+        if self._nodes > self.node_limit or (self._cancel_event is not None and self._cancel_event.is_set()):
+            raise _SearchAborted()
+        
+        best = None
+        best_value = None
+        for move in game.legal_moves():
+            game.apply_move(move)
+            placed.append((move.row, move.col, tuple(game.board.get_tile(move.row, move.col).diamonds),
+                           player_index))
+            scores, _ = self._search(game, placed)
+            placed.pop()
+            game.undo_move()
+            
+            others = max((score for index, score in enumerate(scores) if index != player_index), default=0)
+            value = (scores[player_index] - others, scores[player_index])
+            if best_value is None or value > best_value:
+                best_value = value
+                best = (scores, move)
+        
+        if best is None:
+            # Kein Plättchen oder kein Feld mehr: aktueller Stand ist endgültig
+            best = (tuple(player.score for player in manager.players), None)
+        self._table[key] = best
+        return best
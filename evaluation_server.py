@@ -0,0 +1,307 @@
+"""
+Bewertungsserver mit dynamischer Bündelung
+Viele gleichzeitig laufende Suchen (eine je Partie) schicken ihre
+Kandidatenstellungen an einen gemeinsamen Server. Der Server sammelt die
+Anfragen je Brettgröße und Spielerzahl, bis max_batch Stellungen
+beisammen sind oder die älteste Anfrage max_delay Sekunden gewartet hat,
+bewertet alle in einem einzigen NumPy-Durchlauf (extract_features und
+Bewertung) und verteilt die Ergebnisse an die wartenden Anfragen.
+
+Der Server läuft in einer asyncio-Ereignisschleife im selben Prozess:
+Suchen in Koroutinen nutzen ServedSearch.choose_move_async, Suchen in
+Threads (z.B. AsyncMoveProvider) das blockierende choose_move, wenn der
+Server mit start_in_thread in einem eigenen Thread läuft.
+
+Benötigt NumPy.
+
+Aufruf (Vergleich mit einzeln bewertenden Suchen):
+    python evaluation_server.py --games 200 --players 2
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+
+import numpy as np
+
+from constants import BOARD_SIZE
+from evaluator import BatchedSearch, StateBatch, default_evaluator, extract_features, feature_count
+from game import Game, Move
+from metrics import EVAL_BATCH_SECONDS, EVAL_BATCHES, EVAL_POSITIONS, GAMES_COMPLETED
+
+DEFAULT_MAX_BATCH = 1024  # Stellungen je Durchlauf, ab denen sofort bewertet wird
+DEFAULT_MAX_DELAY = 0.002  # Höchste Wartezeit der ältesten Anfrage in Sekunden
+
+
+class EvaluationServer:
+    """
+    Sammelt Bewertungsanfragen und bewertet sie gebündelt
+    Je (Brettgröße, Spielerzahl) gibt es eine Liste wartender Anfragen. Sie
+    wird sofort bewertet, sobald max_batch Stellungen beisammen sind, sonst
+    nach max_delay Sekunden (ein Timer je Liste, keine Koroutine je Anfrage).
+    Der Puffer eines Durchlaufs wird wiederverwendet.
+    """
+    
+    def __init__(self, evaluator=None, max_batch:int = DEFAULT_MAX_BATCH, max_delay:float = DEFAULT_MAX_DELAY):
+        """
+        Initialisiert den Server
+        
+        Args:
+            evaluator: Bewertung, muss zu Brettgröße und Spielerzahl der Anfragen
+                       passen (Standard: default_evaluator je Brettgröße und Spielerzahl)
+            max_batch: Stellungen je Durchlauf, ab denen nicht mehr gewartet wird
+            max_delay: Höchste Wartezeit der ältesten Anfrage in Sekunden
+        """
+        self.evaluator = evaluator
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.loop = None
+        self._pending = {}  # (Brettgröße, Spielerzahl) -> [Stellungen, [(StateBatch, Future)], Timer]
+        self._buffers = {}
+        self._evaluators = {}
+        self._thread = None
+    
+    def _evaluator_for(self, key:tuple[int, int]):
+        """
+        Gibt die Bewertung für eine Brettgröße und Spielerzahl zurück (einmal je Schlüssel)
+        
+        Raises:
+            ValueError: Wenn die eingestellte Bewertung nicht zu den Merkmalen passt
+        """
+        evaluator = self._evaluators.get(key)
+        if evaluator is None:
+            if self.evaluator is None:
+                evaluator = default_evaluator(*key)
+            elif self.evaluator.input_size != feature_count(*key):
+                raise ValueError(f"Bewertung erwartet {self.evaluator.input_size} Merkmale, "
+                                 f"Spielfeld {key[0]} mit {key[1]} Spielern liefert {feature_count(*key)}")
+            else:
+                evaluator = self.evaluator
+            self._evaluators[key] = evaluator
+        return evaluator
+    
+    async def evaluate(self, batch:StateBatch) -> np.ndarray:
+        """
+        Bewertet alle Stellungen eines Puffers im nächsten gebündelten Durchlauf
+        Der Puffer darf bis zur Antwort nicht verändert werden.
+        
+        Args:
+            batch: Gefüllter StateBatch
+        
+        Returns:
+            ndarray: (len(batch),) Bewertungen
+        """
+        if not batch.count:
+            return np.zeros(0, dtype=np.float32)
+        loop = self.loop = asyncio.get_running_loop()
+        key = (batch.board_size, batch.player_count)
+        future = loop.create_future()
+        pending = self._pending.get(key)
+        if pending is None:
+            timer = loop.call_later(self.max_delay, self._flush, key)
+            pending = self._pending[key] = [0, [], timer]
+        pending[0] += batch.count
+        pending[1].append((batch, future))
+        if pending[0] >= self.max_batch:
+            self._flush(key)
+        return await future
+    
+    def evaluate_threadsafe(self, batch:StateBatch, timeout:float | None = None) -> np.ndarray:
+        """
+        Bewertet einen Puffer aus einem anderen Thread und wartet auf das Ergebnis
+        
+        Args:
+            batch: Gefüllter StateBatch
+            timeout: Höchste Wartezeit in Sekunden (None = unbegrenzt)
+        
+        Returns:
+            ndarray: (len(batch),) Bewertungen
+        
+        Raises:
+            RuntimeError: Wenn der Server nicht läuft oder aus seinem eigenen Thread aufgerufen wird
+        """
+        loop = self.loop
+        if loop is None or not loop.is_running():
+            raise RuntimeError("Bewertungsserver läuft nicht")
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("evaluate_threadsafe im Thread des Servers; evaluate verwenden")
+        return asyncio.run_coroutine_threadsafe(self.evaluate(batch), loop).result(timeout)
+    
+    def _flush(self, key:tuple[int, int]) -> None:
+        """Bewertet alle wartenden Anfragen eines Schlüssels in einem Durchlauf und beantwortet sie"""
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        count, requests, timer = pending
+        timer.cancel()
+        start = time.perf_counter_ns()
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.capacity < count:
+            buffer = self._buffers[key] = StateBatch(*key, max(count, self.max_batch))
+        buffer.clear()
+        try:
+            for batch, _ in requests:
+                buffer.extend(batch)
+            values = self._evaluator_for(key)(extract_features(buffer))
+        except Exception as error:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        
+        offset = 0
+        for batch, future in requests:
+            if not future.done():  # Abgebrochene Anfragen verwerfen ihr Ergebnis
+                future.set_result(values[offset:offset + batch.count])
+            offset += batch.count
+        EVAL_POSITIONS.inc(count)
+        EVAL_BATCHES.inc()
+        EVAL_BATCH_SECONDS.observe_ns(time.perf_counter_ns() - start)
+    
+    def close(self) -> None:
+        """Bricht alle wartenden Anfragen ab"""
+        for _, requests, timer in self._pending.values():
+            timer.cancel()
+            for _, future in requests:
+                future.cancel()
+        self._pending.clear()
+    
+    def start_in_thread(self) -> 'EvaluationServer':
+        """
+        Startet eine eigene Ereignisschleife in einem Hintergrund-Thread
+        Danach können Suchen aus beliebigen Threads evaluate_threadsafe nutzen.
+        
+        Returns:
+            EvaluationServer: Der Server selbst
+        """
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+        
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(started.set)
+            loop.run_forever()
+            self.close()
+            loop.close()
+        
+        self.loop = loop
+        self._thread = threading.Thread(target=run, name='carat-eval', daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+    
+    def stop(self) -> None:
+        """Beendet den mit start_in_thread gestarteten Thread"""
+        if self._thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self._thread = None
+        self.loop = None
+
+
+class ServedSearch(BatchedSearch):
+    """
+    Zugsuche wie BatchedSearch, die ihre Kandidaten vom Bewertungsserver bewerten lässt
+    Jede gleichzeitig laufende Partie braucht eine eigene Instanz (eigener Puffer).
+    """
+    
+    def __init__(self, server:EvaluationServer, seed:int | None = None):
+        """
+        Initialisiert die Suche
+        
+        Args:
+            server: Gemeinsamer Bewertungsserver
+            seed: Seed für die Auswahl bei gleich guten Zügen
+        """
+        super().__init__(server.evaluator, seed)
+        self.server = server
+    
+    async def choose_move_async(self, game:Game) -> Move | None:
+        """Wie choose_move, wartet aber in der Ereignisschleife des Servers auf die Bewertung"""
+        legal = self.collect_positions(game)
+        if legal is None:
+            return None
+        return self.pick_move(legal, await self.server.evaluate(self._batch))
+    
+    def choose_move(self, game:Game, cancel_event:threading.Event | None = None) -> Move | None:
+        """Wählt einen Zug aus einem anderen Thread (Server mit start_in_thread gestartet)"""
+        legal = self.collect_positions(game, cancel_event)
+        if legal is None:
+            return None
+        values = self.server.evaluate_threadsafe(self._batch)
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        return self.pick_move(legal, values)
+
+
+async def _play_game(game:Game, search:ServedSearch) -> None:
+    """Spielt eine Partie mit einer Suche für alle Spieler zu Ende"""
+    game.start_game()
+    while not game.game_over:
+        move = await search.choose_move_async(game)
+        if move is None or not game.apply_move(move):
+            break
+    if game.game_over:
+        GAMES_COMPLETED.inc()
+
+
+async def play_games(server:EvaluationServer, games:int, player_count:int = 2,
+                     board_size:int = BOARD_SIZE, seed:int | None = None) -> list[Game]:
+    """
+    Spielt viele Selbstspiel-Partien gleichzeitig gegen einen gemeinsamen Server
+    
+    Args:
+        server: Bewertungsserver
+        games: Anzahl der Partien
+        player_count: Anzahl der Spieler
+        board_size: Größe des Spielfelds
+        seed: Seed für Plättchen und Zugauswahl
+    
+    Returns:
+        list: Beendete Game-Objekte
+    """
+    rng = random.Random(seed)
+    tables = []
+    for _ in range(games):
+        # Eigener Generator für Plättchen und Chips der Partie (globales random bleibt unberührt)
+        game = Game(player_count, board_size, rng=random.Random(rng.getrandbits(64)))
+        tables.append((game, ServedSearch(server, rng.getrandbits(32))))
+    await asyncio.gather(*(_play_game(game, search) for game, search in tables))
+    return [game for game, _ in tables]
+
+
+async def _benchmark(games:int, player_count:int, max_batch:int, max_delay:float) -> None:
+    """Vergleicht einzeln bewertende Suchen mit dem Bewertungsserver"""
+    search = BatchedSearch(seed=1)
+    positions = 0
+    start = time.perf_counter()
+    for index in range(games):
+        game = Game(player_count, rng=random.Random(index))
+        game.start_game()
+        while not game.game_over:
+            move = search.choose_move(game)
+            positions += search._batch.count if move is not None else 0
+            if move is None or not game.apply_move(move):
+                break
+    elapsed = time.perf_counter() - start
+    print(f"Einzeln:  {positions / elapsed:10.0f} Stellungen/s ({elapsed:.2f} s)")
+    
+    server = EvaluationServer(max_batch=max_batch, max_delay=max_delay)
+    start = time.perf_counter()
+    await play_games(server, games, player_count, seed=1)
+    elapsed = time.perf_counter() - start
+    server.close()
+    print(f"Server:   {EVAL_POSITIONS.value / elapsed:10.0f} Stellungen/s ({elapsed:.2f} s, "
+          f"{EVAL_POSITIONS.value / max(1, EVAL_BATCHES.value):.0f} Stellungen je Durchlauf)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bewertungsserver mit dynamischer Bündelung")
+    parser.add_argument('--games', type=int, default=200, help="Gleichzeitige Partien")
+    parser.add_argument('--players', type=int, default=2)
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument('--max-delay', type=float, default=DEFAULT_MAX_DELAY)
+    args = parser.parse_args()
+    asyncio.run(_benchmark(args.games, args.players, args.max_batch, args.max_delay))
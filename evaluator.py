@@ -0,0 +1,482 @@
+"""
+Gebündelte Stellungsbewertung mit NumPy
+Viele Stellungen werden zuerst in vorbelegte Roh-Arrays kopiert (StateBatch,
+ein Eintrag pro Feld) und dann mit einem einzigen Aufruf in Merkmale
+umgerechnet und bewertet. Das lohnt sich für Suchblätter: statt jede
+Stellung einzeln in Python zu bewerten, werden alle Kandidaten eines
+Knotens gemeinsam bewertet.
+
+Merkmale je Linie (alle Zeilen, dann alle Spalten):
+    Füllstand, Vorsprung der dominanten Farbe, offene Chipwerte,
+    eigene und beste gegnerische Chipwerte auf dominanten Plättchen
+Globale Merkmale:
+    Punktestände und Handgrößen aller Spieler, beginnend beim bewerteten Spieler
+"""
+import random
+import threading
+
+import numpy as np
+
+from ai import MoveSearch
+from board import SparseBoard
+from constants import CHIP_VALUES
+from game import Game, Move
+from scoring import COLOR_COUNT
+from tile import BOTTOM, LEFT, RIGHT, TOP
+
+LINE_FEATURES = 5
+MAX_CHIP_VALUE = max(CHIP_VALUES)
+# Farbbit je Diamantwert (Index 0 = leeres Feld)
+COLOR_BITS = np.array([0] + [1 << color for color in range(COLOR_COUNT)], dtype=np.int64)
+# Normierung der Punktestände und Handgrößen
+SCORE_SCALE = 100.0
+HAND_SCALE = 18.0
+
+def feature_count(board_size:int, player_count:int) -> int:
+    """
+    Gibt die Länge des Merkmalsvektors zurück
+    
+    Args:
+        board_size: Größe des Spielfelds
+        player_count: Anzahl der Spieler
+    
+    Returns:
+        int: Anzahl der Merkmale
+    """
+    return 2 * board_size * LINE_FEATURES + 2 * player_count
+
+
+class StateBatch:
+    """
+    Vorbelegte Roh-Arrays für bis zu capacity Stellungen gleicher Größe
+    """
+    
+    def __init__(self, board_size:int, player_count:int, capacity:int):
+        """
+        Initialisiert den Puffer
+        
+        Args:
+            board_size: Größe des Spielfelds
+            player_count: Anzahl der Spieler
+            capacity: Höchstzahl der Stellungen
+        """
+        cells = board_size * board_size
+        self.board_size = board_size
+        self.player_count = player_count
+        self.capacity = capacity
+        self.diamonds = np.zeros((capacity, cells, 4), dtype=np.int8)  # 0 = leeres Feld
+        self.owners = np.full((capacity, cells), -1, dtype=np.int8)
+        self.chip_values = np.zeros((capacity, cells), dtype=np.int8)
+        self.chip_owners = np.full((capacity, cells), -1, dtype=np.int8)
+        self.scores = np.zeros((capacity, player_count), dtype=np.float32)
+        self.hands = np.zeros((capacity, player_count), dtype=np.float32)
+        self.perspective = np.zeros(capacity, dtype=np.int64)
+        self.count = 0
+    
+    def __len__(self):
+        return self.count
+    
+    def clear(self) -> None:
+        """Leert den Puffer, ohne Speicher freizugeben"""
+        self.count = 0
+    
+    def add(self, game:Game, perspective:int | None = None) -> int:
+        """
+        Kopiert eine Stellung in den Puffer
+        
+        Args:
+            game: Game-Objekt (dichtes Spielfeld passender Größe)
+            perspective: Index des bewerteten Spielers (Standard: Spieler am Zug)
+        
+        Returns:
+            int: Index der Stellung im Puffer
+        
+        Raises:
+            TypeError: Für dünn besetzte Spielfelder
+            IndexError: Wenn der Puffer voll ist
+        """
+        players = game.player_manager.players
+        if perspective is None:
+            perspective = game.player_manager.current_player_index
+        return self._add_board(game.board, [player.score for player in players],
+                               [player.get_tile_count() for player in players], perspective)
+    
+    def add_view(self, view, perspective:int | None = None) -> int:
+        """
+        Kopiert eine Stellung aus einer Sicht auf gemeinsamen Speicher in den Puffer
+        
+        Args:
+            view: shared_state.StateView
+            perspective: Index des bewerteten Spielers (Standard: Spieler am Zug)
+        
+        Returns:
+            int: Index der Stellung im Puffer
+        
+        Raises:
+            IndexError: Wenn der Puffer voll ist
+        """
+        if perspective is None:
+            perspective = view.current_player_index
+        hand_sizes = [view.hand_size(index) for index in range(view.player_count)]
+        return self._add_board(view.board, view.scores, hand_sizes, perspective)
+    
+    def extend(self, other:'StateBatch') -> None:
+        """
+        Hängt alle Stellungen eines anderen Puffers gleicher Größe an
+        
+        Args:
+            other: StateBatch mit gleicher Brettgröße und Spielerzahl
+        
+        Raises:
+            IndexError: Wenn der Puffer nicht genug Platz hat
+        """
+        start, count = self.count, other.count
+        if start + count > self.capacity:
+            raise IndexError("StateBatch ist voll")
+        stop = start + count
+        self.diamonds[start:stop] = other.diamonds[:count]
+        self.owners[start:stop] = other.owners[:count]
+        self.chip_values[start:stop] = other.chip_values[:count]
+        self.chip_owners[start:stop] = other.chip_owners[:count]
+        self.scores[start:stop] = other.scores[:count]
+        self.hands[start:stop] = other.hands[:count]
+        self.perspective[start:stop] = other.perspective[:count]
+        self.count = stop
+    
+    def _add_board(self, board, scores:list, hand_sizes:list, perspective:int) -> int:
+        """Kopiert Spielfeld, Punkte und Handgrößen in den nächsten freien Eintrag"""
+        if isinstance(board, SparseBoard):
+            raise TypeError("Gebündelte Bewertung unterstützt nur dichte Spielfelder")
+        if self.count >= self.capacity:
+            raise IndexError("StateBatch ist voll")
+        
+        # Das Spielfeld hält Plättchen und Chips bereits als flache Puffer
+        index = self.count
+        self.diamonds[index] = np.frombuffer(board.cell_diamonds, dtype=np.int8).reshape(-1, 4)
+        self.owners[index] = np.frombuffer(board.cell_owners, dtype=np.int8)
+        self.chip_values[index] = np.frombuffer(board.chip_values, dtype=np.uint8)
+        self.chip_owners[index] = np.frombuffer(board.chip_owner, dtype=np.int8)
+        
+        self.scores[index] = scores
+        self.hands[index] = hand_sizes
+        self.perspective[index] = perspective
+        self.count += 1
+        return index
+
+
+def _line_features(first, second, open_chips, relative_owner, size:int, player_count:int):
+    """
+    Berechnet die Merkmale für eine Gruppe von Linien
+    Farbanzahlen und Chipsummen je Spieler werden mit np.bincount in einem
+    Durchlauf über alle Linien des Puffers gezählt.
+    
+    Args:
+        first: (n, Linien, Felder) erster Diamant des Paars, das zur Linie zählt (0 = leer)
+        second: (n, Linien, Felder) zweiter Diamant des Paars
+        open_chips: (n, Linien, Felder) Werte noch nicht gesammelter Chips
+        relative_owner: (n, Linien, Felder) Besitzer relativ zum bewerteten Spieler
+    
+    Returns:
+        ndarray: (n, Linien, LINE_FEATURES)
+    """
+    n, lines, _ = first.shape
+    line_ids = np.arange(n * lines).reshape(n, lines, 1)
+    bins = COLOR_COUNT + 1
+    counts = (np.bincount((line_ids * bins + first).ravel(), minlength=n * lines * bins)
+              + np.bincount((line_ids * bins + second).ravel(), minlength=n * lines * bins))
+    counts = counts.reshape(n, lines, bins)[..., 1:]
+    
+    ordered = np.sort(counts, axis=2)
+    top = ordered[..., -1]
+    margin = (top - ordered[..., -2]) / (2 * size)
+    dominant = ((counts == top[..., None]) & (top[..., None] > 0)) @ COLOR_BITS[1:]
+    
+    # Plättchen, deren Paar eine dominante Farbe enthält, erhalten ihren Chip
+    contributes = (COLOR_BITS[first] | COLOR_BITS[second]) & dominant[..., None]
+    claim = open_chips * (contributes != 0)
+    per_player = np.bincount((line_ids * player_count + relative_owner).ravel(),
+                             weights=claim.ravel(), minlength=n * lines * player_count)
+    per_player = per_player.reshape(n, lines, player_count)
+    
+    scale = MAX_CHIP_VALUE * size
+    return np.stack([
+        (first > 0).sum(axis=2) / size,
+        margin,
+        open_chips.sum(axis=2) / scale,
+        per_player[..., 0] / scale,
+        per_player[..., 1:].max(axis=2) / scale,
+    ], axis=2)
+
+
+def extract_features(batch:StateBatch) -> np.ndarray:
+    """
+    Rechnet alle Stellungen eines Puffers in Merkmalsvektoren um
+    
+    Args:
+        batch: Gefüllter StateBatch
+    
+    Returns:
+        ndarray: (len(batch), feature_count) float32
+    """
+    n = batch.count
+    size = batch.board_size
+    player_count = batch.player_count
+    diamonds = batch.diamonds[:n].reshape(n, size, size, 4)
+    top, right, bottom, left = (diamonds[..., side] for side in (TOP, RIGHT, BOTTOM, LEFT))
+    
+    open_chips = (batch.chip_values[:n] * (batch.chip_owners[:n] < 0)).reshape(n, size, size)
+    perspective = batch.perspective[:n, None]
+    # Leere Felder tragen keinen Chip bei, ihr Besitzer ist daher beliebig
+    relative_owner = ((batch.owners[:n] - perspective) % player_count).reshape(n, size, size)
+    
+    # Zeilen zählen oben/unten, Spalten links/rechts
+    rows = _line_features(top, bottom, open_chips, relative_owner, size, player_count)
+    cols = _line_features(left.transpose(0, 2, 1), right.transpose(0, 2, 1),
+                          open_chips.transpose(0, 2, 1), relative_owner.transpose(0, 2, 1),
+                          size, player_count)
+    
+    # Spieler ab dem bewerteten Spieler aufzählen
+    order = (perspective + np.arange(player_count)) % player_count
+    picks = np.arange(n)[:, None]
+    scores = batch.scores[:n][picks, order] / SCORE_SCALE
+    hands = batch.hands[:n][picks, order] / HAND_SCALE
+    
+    return np.concatenate([
+        rows.reshape(n, -1), cols.reshape(n, -1), scores, hands
+    ], axis=1).astype(np.float32)
+
+
+class LinearEvaluator:
+    """
+    Lineare Bewertung: Merkmale · Gewichte + Bias
+    """
+    kind = 'linear'
+    
+    def __init__(self, weights, bias:float = 0.0):
+        """
+        Initialisiert die Bewertung
+        
+        Args:
+            weights: Gewichtsvektor (feature_count)
+            bias: Konstanter Anteil
+        """
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.float32(bias)
+        self.input_size = self.weights.shape[0]
+    
+    def __call__(self, features:np.ndarray) -> np.ndarray:
+        """Bewertet (n, feature_count) Merkmale, gibt (n,) Werte zurück"""
+        return features @ self.weights + self.bias
+    
+    def arrays(self) -> dict:
+        """Gibt die Parameter zum Speichern zurück"""
+        return {'weights': self.weights, 'bias': np.float32(self.bias)}
+
+
+class MLPEvaluator:
+    """
+    Kleines Netz mit einer verdeckten ReLU-Schicht
+    """
+    kind = 'mlp'
+    
+    def __init__(self, hidden_weights, hidden_bias, output_weights, output_bias:float = 0.0):
+        """
+        Initialisiert die Bewertung
+        
+        Args:
+            hidden_weights: (feature_count, hidden) Gewichte der verdeckten Schicht
+            hidden_bias: (hidden,) Bias der verdeckten Schicht
+            output_weights: (hidden,) Gewichte der Ausgabe
+            output_bias: Bias der Ausgabe
+        """
+        self.hidden_weights = np.asarray(hidden_weights, dtype=np.float32)
+        self.hidden_bias = np.asarray(hidden_bias, dtype=np.float32)
+        self.output_weights = np.asarray(output_weights, dtype=np.float32)
+        self.output_bias = np.float32(output_bias)
+        self.input_size = self.hidden_weights.shape[0]
+    
+    def __call__(self, features:np.ndarray) -> np.ndarray:
+        """Bewertet (n, feature_count) Merkmale, gibt (n,) Werte zurück"""
+        hidden = np.maximum(features @ self.hidden_weights + self.hidden_bias, 0)
+        return hidden @ self.output_weights + self.output_bias
+    
+    def arrays(self) -> dict:
+        """Gibt die Parameter zum Speichern zurück"""
+        return {'hidden_weights': self.hidden_weights, 'hidden_bias': self.hidden_bias,
+                'output_weights': self.output_weights, 'output_bias': np.float32(self.output_bias)}
+
+
+EVALUATOR_TYPES = {LinearEvaluator.kind: LinearEvaluator, MLPEvaluator.kind: MLPEvaluator}
+
+
+def default_evaluator(board_size:int, player_count:int) -> LinearEvaluator:
+    """
+    Erstellt eine handgewählte lineare Bewertung ohne Gewichtsdatei
+    Punktvorsprung plus die Chips, die auf dominanten Plättchen liegen.
+    
+    Args:
+        board_size: Größe des Spielfelds
+        player_count: Anzahl der Spieler
+    
+    Returns:
+        LinearEvaluator
+    """
+    line_weights = np.zeros((2 * board_size, LINE_FEATURES), dtype=np.float32)
+    line_weights[:, 3] = 0.5   # eigene Chips auf dominanten Plättchen
+    line_weights[:, 4] = -0.5  # gegnerische Chips auf dominanten Plättchen
+    line_weights *= MAX_CHIP_VALUE * board_size / SCORE_SCALE
+    scores = np.full(player_count, -1.0 / (player_count - 1), dtype=np.float32)
+    scores[0] = 1.0
+    hands = np.zeros(player_count, dtype=np.float32)
+    return LinearEvaluator(np.concatenate([line_weights.ravel(), scores, hands]))
+
+
+def save_evaluator(path:str, evaluator) -> None:
+    """
+    Speichert die Gewichte einer Bewertung (NumPy .npz)
+    
+    Args:
+        path: Zieldatei
+        evaluator: LinearEvaluator oder MLPEvaluator
+    """
+    np.savez(path, kind=np.array(evaluator.kind), **evaluator.arrays())
+
+
+def load_evaluator(path:str):
+    """
+    Lädt eine mit save_evaluator gespeicherte Bewertung
+    
+    Args:
+        path: Pfad der .npz-Datei
+    
+    Returns:
+        LinearEvaluator oder MLPEvaluator
+    
+    Raises:
+        ValueError: Bei unbekanntem Bewertungstyp
+    """
+    with np.load(path, allow_pickle=False) as data:
+        kind = str(data['kind'])
+        if kind not in EVALUATOR_TYPES:
+            raise ValueError(f"Unbekannter Bewertungstyp {kind}")
+        arrays = {name: data[name] for name in data.files if name != 'kind'}
+    return EVALUATOR_TYPES[kind](**arrays)
+
+
+def evaluate_games(games:list[Game], evaluator=None, perspective:int | None = None) -> np.ndarray:
+    """
+    Bewertet mehrere Stellungen mit einem Aufruf
+    
+    Args:
+        games: Liste von Game-Objekten gleicher Brettgröße und Spielerzahl
+        evaluator: Bewertung (Standard: default_evaluator)
+        perspective: Bewerteter Spieler (Standard: jeweils Spieler am Zug)
+    
+    Returns:
+        ndarray: (len(games),) Bewertungen
+    """
+    if not games:
+        return np.zeros(0, dtype=np.float32)
+    first = games[0]
+    batch = StateBatch(first.board.size, first.player_count, len(games))
+    for game in games:
+        batch.add(game, perspective)
+    if evaluator is None:
+        evaluator = default_evaluator(first.board.size, first.player_count)
+    return evaluator(extract_features(batch))
+
+
+class BatchedSearch(MoveSearch):
+    """
+    Zugsuche, die alle Kandidaten eines Zugs gemeinsam bewertet
+    """
+    
+    def __init__(self, evaluator=None, seed:int | None = None):
+        """
+        Initialisiert die Suche
+        
+        Args:
+            evaluator: Bewertung (Standard: default_evaluator passend zum Spiel)
+            seed: Seed für die Auswahl bei gleich guten Zügen
+        """
+        self.evaluator = evaluator
+        self.rng = random.Random(seed)
+        self._batch = None
+        self._active = None  # Bewertung für das aktuelle Spiel
+        self._defaults = {}  # (Brettgröße, Spielerzahl) -> default_evaluator, ohne eigene Bewertung
+    
+    def evaluator_for(self, board_size:int, player_count:int):
+        """
+        Gibt die Bewertung für eine Brettgröße und Spielerzahl zurück
+        
+        Args:
+            board_size: Größe des Spielfelds
+            player_count: Anzahl der Spieler
+        
+        Returns:
+            Die eingestellte Bewertung oder default_evaluator, wenn keine eingestellt ist
+        
+        Raises:
+            ValueError: Wenn die eingestellte Bewertung nicht zu den Merkmalen passt
+        """
+        expected = feature_count(board_size, player_count)
+        if self.evaluator is None:
+            key = (board_size, player_count)
+            if key not in self._defaults:
+                self._defaults[key] = default_evaluator(board_size, player_count)
+            return self._defaults[key]
+        if self.evaluator.input_size != expected:
+            raise ValueError(f"Bewertung erwartet {self.evaluator.input_size} Merkmale, "
+                             f"Spielfeld {board_size} mit {player_count} Spielern liefert {expected}")
+        return self.evaluator
+    
+    def _prepare(self, game:Game, capacity:int) -> StateBatch:
+        """Gibt einen passenden, geleerten Puffer zurück (wird wiederverwendet)"""
+        batch = self._batch
+        if (batch is None or batch.capacity < capacity or batch.board_size != game.board.size
+                or batch.player_count != game.player_count):
+            batch = self._batch = StateBatch(game.board.size, game.player_count, capacity)
+        batch.clear()
+        self._active = self.evaluator_for(game.board.size, game.player_count)
+        return batch
+    
+    def collect_positions(self, game:Game, cancel_event:threading.Event | None = None) -> list[Move] | None:
+        """
+        Probiert alle Züge aus und kopiert die entstehenden Stellungen in den Puffer
+        
+        Args:
+            game: Game-Objekt (wird nach jedem Zug zurückgesetzt)
+            cancel_event: Wird gesetzt, wenn die Suche abbrechen soll
+        
+        Returns:
+            list: Legale Züge in der Reihenfolge des Puffers (self._batch),
+                  None bei Abbruch oder ohne Zug
+        """
+        if game.selected_tile is None:
+            return None
+        player_index = game.player_manager.current_player_index
+        moves = game.legal_moves()
+        batch = self._prepare(game, len(moves))
+        
+        legal = []
+        with game.probing():
+            for move in moves:
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                if game.apply_move(move):
+                    batch.add(game, player_index)
+                    legal.append(move)
+                    game.undo_move()
+        return legal or None
+    
+    def pick_move(self, legal:list[Move], values:np.ndarray) -> Move:
+        """Wählt unter den bestbewerteten Zügen zufällig einen aus"""
+        best = np.flatnonzero(values == values.max())
+        return legal[self.rng.choice(best.tolist())]
+    
+    def choose_move(self, game:Game, cancel_event:threading.Event | None = None) -> Move | None:
+        """Probiert alle Züge aus, bewertet die Stellungen gebündelt und wählt die beste"""
+        legal = self.collect_positions(game, cancel_event)
+        if legal is None:
+            return None
+        return self.pick_move(legal, self._active(extract_features(self._batch)))
@@ -1,11 +1,30 @@
 """
 Game-Klasse mit Hauptspiellogik
 """
-from board import Board
+import copy
+import random
+from contextlib import contextmanager
+from time import perf_counter_ns
+from typing import NamedTuple
+
+from board import Board, SparseBoard
 from player import PlayerManager
-from tile import Tile
+from rules import STANDARD_RULES, RuleSet
+from tile import Tile, distinct_rotations, rotation_class
 from scoring import ScoringSystem
-from constants import GAME_STATE_MENU, GAME_STATE_PLAYING, GAME_STATE_GAME_OVER
+from constants import BOARD_SIZE, GAME_STATE_MENU, GAME_STATE_PLAYING, GAME_STATE_GAME_OVER
+from metrics import MOVE_CLOCK, SAMPLE_INTERVAL, SCORE_LINES_SECONDS, VALID_PLACEMENTS_SECONDS
+
+
+class Move(NamedTuple):
+    """
+    Ein Spielzug: Zielfeld, Anzahl Drehungen im Uhrzeigersinn (ab der
+    Ausrichtung bei Auswahl des Plättchens) und Plättchen
+    """
+    row: int
+    col: int
+    rotation: int = 0
+    tile: int = -1  # Slot des Plättchens in der Hand (-1 = ausgewähltes Plättchen)
 
 
 class Game:
@@ -13,31 +32,58 @@ class Game:
     Hauptspiellogik für Carat
     """
     
-    def __init__(self, player_count:int=2):
+    def __init__(self, player_count:int=2, board_size:int=BOARD_SIZE, sparse:bool=False,
+                 free_choice:bool=False, rules:RuleSet=STANDARD_RULES, rng:random.Random | None = None):
         """
         Initialisiert ein neues Spiel
         
         Args:
-            player_count: Anzahl der Spieler (2-4)
+            player_count: Anzahl der Spieler (2-4, je nach Regelsatz mehr)
+            board_size: Größe des Spielfelds
+            sparse: Dünn besetztes Spielfeld für große Brettgrößen verwenden
+            free_choice: Regel: der Spieler am Zug wählt ein beliebiges Plättchen
+                         seiner Hand (sonst immer das erste)
+            rules: Regelsatz (Nachbarschaft, Wertung, Chipverteilung, Spielerzahl);
+                   Spielfeld, Wertung und Spieler wählen ihre Umsetzung beim Anlegen
+            rng: Zufallsgenerator für Plättchen und Chips, z.B. für reproduzierbare
+                 Selbstspiel-Partien (None = Modul random)
+        
+        Raises:
+            ValueError: Bei ungültigem Regelsatz oder unpassender Spielerzahl
         """
         self.state = None
         self.player_count = player_count
-        self.board = Board()
-        self.player_manager = PlayerManager(player_count)
-        self.scoring_system = ScoringSystem(self.board, self.player_manager)
+        self.board_size = board_size
+        self.sparse = sparse
+        self.free_choice = free_choice
+        self.rules = rules.validate()
+        self.rng = rng
+        self.board = (SparseBoard(board_size, rules=rules, rng=rng) if sparse
+                      else Board(board_size, rules, rng))
+        self.player_manager = PlayerManager(player_count, rules)
+        self.scoring_system = ScoringSystem(self.board, self.player_manager, rules)
         
         self.state = GAME_STATE_MENU
         self.selected_tile = None
+        self.selected_slot = None  # Slot des ausgewählten Plättchens in der Hand
         self.selected_position = None
         self.valid_positions = []
         
         self.game_over = False
         self.winner = None
         
+        self.move_number = 0  # Anzahl gespielter Züge
+        self.move_history = []  # Gespielte Züge (Move) für Wiederholungen
+        self.selected_rotation = 0  # Drehungen des ausgewählten Plättchens
+        self.last_scoring = None  # Wertungsergebnis des letzten Zugs
+        self.pending_move = None  # Laufende Zugberechnung (ai.MoveRequest)
+        self.record_metrics = True  # Züge in den Kennzahlen zählen (nicht bei Probezügen, siehe probing)
+        self._undo_stack = []  # Informationen zum Zurücknehmen je Zug
+    
     def start_game(self):
         """Startet ein neues Spiel"""
         # Erstelle und verteile Plättchen
-        tiles = Tile.create_tile_set()
+        tiles = Tile.create_tile_set(self.rng)
         self.player_manager.distribute_tiles(tiles)
         
         # Setze Spielzustand
@@ -51,18 +97,74 @@ class Game:
     
     def _select_current_player_tile(self):
         """Wählt das aktuelle Plättchen des aktuellen Spielers"""
-        current_player = self.player_manager.get_current_player()
-        self.selected_tile = current_player.get_current_tile()
+        hand = self.player_manager.get_current_player().hand
+        self.selected_slot = hand.first_slot()
+        self.selected_tile = hand.get(self.selected_slot) if self.selected_slot is not None else None
+        self.selected_rotation = 0
+    
+    def select_tile(self, slot:int) -> bool:
+        """
+        Wählt ein Plättchen aus der Hand des Spielers am Zug
+        Ohne freie Wahl ist nur das erste Plättchen erlaubt.
+        
+        Args:
+            slot: Slot des Plättchens in der Hand
+        
+        Returns:
+            bool: True wenn das Plättchen ausgewählt ist
+        """
+        if slot == self.selected_slot:
+            return self.selected_tile is not None
+        hand = self.player_manager.get_current_player().hand
+        tile = hand.get(slot)
+        if tile is None or (not self.free_choice and slot != hand.first_slot()):
+            return False
+        # Das bisher gewählte Plättchen kehrt ungedreht in die Hand zurück
+        if self.selected_tile is not None:
+            for _ in range(self.selected_rotation):
+                self.selected_tile.rotate_counter_clockwise()
+        self.selected_slot = slot
+        self.selected_tile = tile
+        self.selected_rotation = 0
+        return True
+    
+    def legal_moves(self) -> list[Move]:
+        """
+        Gibt alle unterschiedlichen Züge des Spielers am Zug zurück
+        Plättchen × gültige Felder × unterscheidbare Drehungen; bei freier Wahl
+        alle Plättchen der Hand, gleiche Plättchen nur einmal.
+        
+        Returns:
+            list: Liste von Move-Objekten
+        """
+        if self.selected_tile is None:
+            return []
+        if self.free_choice:
+            candidates = self.player_manager.get_current_player().hand.items()
+        else:
+            candidates = ((self.selected_slot, self.selected_tile),)
+        
+        # Pro Plättchen-Klasse (gleich bis auf Drehung) reicht ein Slot
+        choices = {}
+        for slot, tile in candidates:
+            choices.setdefault(rotation_class(tile.diamonds), (slot, distinct_rotations(tile.diamonds)))
+        
+        return [Move(row, col, rotation, slot)
+                for slot, rotations in choices.values()
+                for row, col in self.valid_positions
+                for rotation in rotations]
     
     def rotate_current_tile_clockwise(self):
         """Rotiert das ausgewählte Plättchen im Uhrzeigersinn"""
         if self.selected_tile:
             self.selected_tile.rotate_clockwise()
+            self.selected_rotation = (self.selected_rotation + 1) % 4
     
     def rotate_current_tile_counter_clockwise(self):
         """Rotiert das ausgewählte Plättchen gegen den Uhrzeigersinn"""
         if self.selected_tile:
             self.selected_tile.rotate_counter_clockwise()
+            self.selected_rotation = (self.selected_rotation - 1) % 4
     
     def place_tile(self, row:int, col:int) -> bool:
         """
@@ -81,16 +183,35 @@ class Game:
         if not self.board.can_place_tile(row, col):
             return False
         
+        # Merke den Zustand vor dem Zug für undo_move
+        current_player = self.player_manager.get_current_player()
+        slot = self.selected_slot
+        undo = (self.selected_tile, slot, self.player_manager.current_player_index,
+                self.last_scoring)
+        
         # Platziere das Plättchen
         success = self.board.place_tile(self.selected_tile, row, col)
         
         if success:
             # Entferne Plättchen vom Spieler
-            current_player = self.player_manager.get_current_player()
-            current_player.remove_tile(self.selected_tile)
+            current_player.hand.remove(slot)
+            self.move_number += 1
+            self.move_history.append(Move(row, col, self.selected_rotation, slot))
+            self._undo_stack.append(undo)
+            
+            # Kennzahlen: jeder gespielte Zug wird gezählt, nur eine Stichprobe gemessen
+            sampled = False
+            if self.record_metrics:
+                MOVE_CLOCK.countdown -= 1
+                if MOVE_CLOCK.countdown <= 0:
+                    MOVE_CLOCK.tick()
+                    sampled = True
+                    start = perf_counter_ns()
             
             # Prüfe auf vollständige Zeilen/Spalten und vergebe Punkte
-            scoring_result = self.scoring_system.check_and_score_lines()
+            self.last_scoring = self.scoring_system.check_and_score_lines()
+            if sampled:
+                SCORE_LINES_SECONDS.observe_ns(perf_counter_ns() - start, SAMPLE_INTERVAL)
             
             # Prüfe ob Spiel zu Ende ist
             if self._is_game_over():
@@ -101,12 +222,112 @@ class Game:
                 self._select_current_player_tile()
                 
                 # Aktualisiere gültige Positionen
+                if sampled:
+                    start = perf_counter_ns()
                 self.valid_positions = self.board.get_valid_placements()
+                if sampled:
+                    VALID_PLACEMENTS_SECONDS.observe_ns(perf_counter_ns() - start, SAMPLE_INTERVAL)
             
             return True
         
         return False
     
+    def apply_move(self, move:Move) -> bool:
+        """
+        Führt einen Zug aus: wählt das Plättchen, dreht es und platziert es
+        
+        Args:
+            move: Move-Objekt
+        
+        Returns:
+            bool: True wenn erfolgreich platziert
+        """
+        if not self.selected_tile or not self.board.can_place_tile(move.row, move.col):
+            return False
+        if move.tile >= 0 and not self.select_tile(move.tile):
+            return False
+        
+        # Drehung zählt ab der Ausrichtung bei Auswahl (wie in move_history)
+        for _ in range((move.rotation - self.selected_rotation) % 4):
+            self.rotate_current_tile_clockwise()
+        return self.place_tile(move.row, move.col)
+    
+    def undo_move(self) -> Move | None:
+        """
+        Nimmt den letzten Zug vollständig zurück
+        Plättchen, Hand, eingesammelte Chips, Punkte und der Spieler am Zug
+        werden wiederhergestellt, das Plättchen liegt wieder in der Ausrichtung
+        vor der ersten Drehung. Der Aufwand hängt nur vom Zug ab,
+        nicht von der Größe des Spielfelds.
+        
+        Returns:
+            Move: Der zurückgenommene Zug oder None, wenn keiner vorhanden ist
+        """
+        if not self._undo_stack:
+            return None
+        tile, slot, player_index, previous_scoring = self._undo_stack.pop()
+        move = self.move_history.pop()
+        
+        players = self.player_manager.players
+        for row, col, owner, _ in reversed(self.last_scoring['chips']):
+            players[owner].return_last_chip()
+            self.board.release_chip(row, col)
+        
+        self.board.remove_tile(move.row, move.col)
+        players[player_index].restore_tile(slot, tile)
+        
+        # Drehung zurücknehmen: apply_move(move) spielt den Zug danach genau nach
+        for _ in range(move.rotation):
+            tile.rotate_counter_clockwise()
+        self.player_manager.current_player_index = player_index
+        self.selected_tile = tile
+        self.selected_slot = slot
+        self.selected_rotation = 0
+        
+        self.move_number -= 1
+        self.last_scoring = previous_scoring
+        self.game_over = False
+        self.winner = None
+        self.state = GAME_STATE_PLAYING
+        self.valid_positions = self.board.get_valid_placements()
+        return move
+    
+    def snapshot(self):
+        """
+        Erstellt eine unabhängige Kopie des Spiels, z.B. für die KI-Suche
+        Eine laufende Zugberechnung wird nicht mitkopiert.
+        
+        Returns:
+            Game: Kopie des Spiels
+        """
+        memo = {}
+        if self.pending_move is not None:
+            memo[id(self.pending_move)] = None
+        return copy.deepcopy(self, memo)
+    
+    @contextmanager
+    def probing(self):
+        """
+        Kontext für Probezüge einer Suche (apply_move/undo_move)
+        Züge im Kontext zählen nicht in den Kennzahlen, damit Zugrate und
+        Zeiten nur tatsächlich gespielte Züge zeigen. Verschachtelbar.
+        
+        Yields:
+            Game: Das Spiel selbst
+        """
+        previous = self.record_metrics
+        self.record_metrics = False
+        try:
+            yield self
+        finally:
+            self.record_metrics = previous
+    
+    def cancel_pending_move(self):
+        """Bricht eine laufende Zugberechnung ab"""
+        if self.pending_move is not None:
+            self.pending_move.cancel()
+            self.pending_move = None
+    
     def _is_game_over(self):
         """
         Prüft, ob das Spiel zu Ende ist
@@ -124,7 +345,7 @@ class Game:
             return True
         
         # Prüfe ob noch gültige Positionen existieren
-        if not self.board.get_valid_placements():
+        if not self.board.has_valid_placement():
             return True
         
         return False
@@ -144,12 +365,13 @@ class Game:
         return self.player_manager.get_leaderboard()
     
     def is_valid_placement(self, row:int, col:int) -> bool:
-        """Prüft, ob eine Position für die Platzierung gültig ist"""
-        return (row, col) in self.valid_positions
+        """Prüft, ob eine Position für die Platzierung gültig ist (fragt das Spielfeld, ohne Liste)"""
+        return self.state == GAME_STATE_PLAYING and self.board.can_place_tile(row, col)
     
     def reset(self):
         """Setzt das Spiel zurück"""
-        self.__init__(self.player_count)
+        self.cancel_pending_move()
+        self.__init__(self.player_count, self.board_size, self.sparse, self.free_choice, self.rules, self.rng)
     
     def __repr__(self):
         return f"Game(state={self.state}, current_player={self.get_current_player().name})"
@@ -0,0 +1,703 @@
+"""
+Suchindex über aufgezeichnete Partien
+Der Indexer spielt jede Wiederholung einmal nach und legt invertierte
+Listen an für
+    - eingesammelte Chips (nach Wert und Spieler),
+    - vervollständigte Zeilen und Spalten (nach Richtung, ziehendem Spieler
+      und enthaltenen Chipwerten),
+    - lokale Plättchenmuster (Hash jedes PATTERN_SIZE × PATTERN_SIZE-Fensters,
+      das sich durch einen Zug ändert).
+Die Listen je Schlüssel sind nach Zugnummer sortiert; eine Abfrage sucht den
+Schlüssel per Binärsuche im Verzeichnis, grenzt den Zugbereich per
+Binärsuche ein und liest nur die passenden Einträge aus der per mmap
+eingeblendeten Datei. Gebaut wird mit externer Sortierung (sortierte Läufe
+auf der Platte, danach ein Mischdurchgang), auch für Millionen Partien.
+
+Dateiformat:
+    Kopf (INDEX_HEADER)
+    Einträge (POSTING), je Schlüssel zusammenhängend, nach (Zug, Partie) sortiert
+    Verzeichnis: Schlüssel (Q je Schlüssel, aufsteigend), Anfänge (Q je Schlüssel + 1)
+    Partien (GAME_ENTRY je Partie), danach die Namen (UTF-8)
+
+Aufruf:
+    python game_index.py build replays/*.crp --output games.idx [--workers 4]
+    python game_index.py lines games.idx --seat 2 --axis row --chip 6 --before 20
+    python game_index.py chips games.idx --value 6 [--seat 0]
+"""
+import argparse
+import hashlib
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import NamedTuple
+
+from metrics import REGISTRY, collect_in_worker
+from replay import Replay
+from rules import MAX_CHIP_VALUE, MAX_PLAYER_COUNT
+from state_codec import decode_game
+from symmetry import SYMMETRY_COUNT, transform_cell, transform_diamonds
+
+PATTERN_SIZE = 3
+MIN_PATTERN_TILES = 2  # Fenster mit weniger Plättchen werden nicht indiziert
+DEFAULT_RUN_SIZE = 2_000_000  # Einträge je sortiertem Lauf im Speicher
+CHUNK_GAMES = 256  # Partien je Auftrag an einen Worker
+PENDING_CHUNKS_PER_WORKER = 2  # Gleichzeitig ausstehende Aufträge je Worker (begrenzt den Speicher)
+
+INDEX_MAGIC = b'CGI1'
+# magic, Mustergröße, Partien, Schlüssel, Einträge, Offset Verzeichnis, Offset Partien, Offset Namen
+INDEX_HEADER = struct.Struct('<4sBIQQQQQ')
+# Partie, Zug, zwei Felder je Art (Chip/Muster: Zeile, Spalte; Linie: Index, Chip- und Wertungsmaske)
+POSTING = struct.Struct('<IHHH')
+# Schlüssel, Zug, Partie, Feld a, Feld b (Sortierreihenfolge der Einträge)
+RUN_ENTRY = struct.Struct('<QHIHH')
+# Offset und Länge des Namens, Spielfeldgröße, Anzahl Züge, Spielerzahl
+GAME_ENTRY = struct.Struct('<QHHHB')
+KEY = struct.Struct('<Q')
+
+# Arten von Schlüsseln (oberstes Byte)
+KIND_CHIP = 1
+KIND_LINE = 2
+KIND_PATTERN = 3
+
+AXIS_ROW = 0
+AXIS_COL = 1
+AXIS_CODES = {'row': AXIS_ROW, 'col': AXIS_COL}
+ANY_VALUE = 0  # Linienschlüssel für Linien unabhängig von ihren Chips
+
+_KIND_SHIFT = 56
+
+
+class ChipHit(NamedTuple):
+    """Ein eingesammelter Chip"""
+    game: int
+    move: int
+    seat: int
+    value: int
+    row: int
+    col: int
+
+
+class LineHit(NamedTuple):
+    """Eine durch einen Zug vervollständigte Zeile oder Spalte"""
+    game: int
+    move: int
+    seat: int  # Spieler, der die Linie vervollständigt hat
+    axis: str  # 'row' oder 'col'
+    line: int
+    chip_values: tuple  # Chipwerte auf der Linie beim Vervollständigen
+    scorers: tuple  # Spieler, die in dieser Linie Chips eingesammelt haben
+
+
+class PatternHit(NamedTuple):
+    """Ein Muster, das durch einen Zug entstanden ist (linke obere Ecke des Fensters)"""
+    game: int
+    move: int
+    row: int
+    col: int
+
+
+def chip_key(value:int, seat:int) -> int:
+    """Schlüssel für eingesammelte Chips eines Werts durch einen Spieler"""
+    return KIND_CHIP << _KIND_SHIFT | value << 8 | seat
+
+
+def line_key(axis:int, seat:int, value:int = ANY_VALUE) -> int:
+    """Schlüssel für vervollständigte Linien einer Richtung durch einen Spieler mit einem Chipwert"""
+    return KIND_LINE << _KIND_SHIFT | axis << 16 | seat << 8 | value
+
+
+def pattern_key(window:bytes) -> int:
+    """
+    Schlüssel eines Plättchenmusters
+    
+    Args:
+        window: 4 Diamanten je Feld zeilenweise (0 = leeres Feld)
+    
+    Returns:
+        int: Schlüssel (56 Bit Hash)
+    """
+    digest = hashlib.blake2b(window, digest_size=7).digest()
+    return KIND_PATTERN << _KIND_SHIFT | int.from_bytes(digest, 'little')
+
+
+def pattern_bytes(cells) -> bytes:
+    """
+    Packt ein Muster für pattern_key
+    
+    Args:
+        cells: Zeilen von Feldern, je Feld 4 Diamanten oder None (leer)
+    
+    Returns:
+        bytes: 4 Bytes je Feld
+    
+    Raises:
+        ValueError: Wenn das Muster nicht quadratisch ist oder zu wenige Plättchen hat
+    """
+    size = len(cells)
+    if any(len(row) != size for row in cells):
+        raise ValueError("Muster muss quadratisch sein")
+    if sum(cell is not None for row in cells for cell in row) < MIN_PATTERN_TILES:
+        raise ValueError(f"Muster braucht mindestens {MIN_PATTERN_TILES} Plättchen")
+    return b''.join(bytes(cell) if cell is not None else bytes(4) for row in cells for cell in row)
+
+
+def transform_pattern(cells, symmetry:int) -> list:
+    """
+    Bildet ein Muster mit einer Symmetrie des Spielfelds ab
+    
+    Args:
+        cells: Zeilen von Feldern (siehe pattern_bytes)
+        symmetry: Symmetrie 0-7
+    
+    Returns:
+        list: Abgebildetes Muster
+    """
+    size = len(cells)
+    result = [[None] * size for _ in range(size)]
+    for row in range(size):
+        for col in range(size):
+            cell = cells[row][col]
+            target_row, target_col = transform_cell(symmetry, size, row, col)
+            result[target_row][target_col] = transform_diamonds(symmetry, cell) if cell is not None else None
+    return result
+
+
+def _window(board, top:int, left:int, size:int) -> tuple[bytes, int]:
+    """Gibt die gepackten Felder eines Fensters und die Anzahl seiner Plättchen zurück"""
+    parts = []
+    tiles = 0
+    for row in range(top, top + size):
+        for col in range(left, left + size):
+            tile = board.get_tile(row, col)
+            if tile is None:
+                parts.append(bytes(4))
+            else:
+                parts.append(bytes(tile.diamonds))
+                tiles += 1
+    return b''.join(parts), tiles
+
+
+def game_postings(replay:Replay, game_id:int, pattern_size:int = PATTERN_SIZE) -> tuple[list, tuple]:
+    """
+    Spielt eine Wiederholung nach und sammelt ihre Indexeinträge
+    
+    Args:
+        replay: Replay-Objekt
+        game_id: Nummer der Partie im Index
+        pattern_size: Kantenlänge der Musterfenster
+    
+    Returns:
+        tuple: (Liste von (Schlüssel, Zug, Partie, a, b), (Spielfeldgröße, Züge, Spielerzahl))
+    """
+    game = decode_game(replay.keyframes[0])
+    game.record_metrics = False  # Nachgespielte Züge nicht erneut zählen
+    board = game.board
+    size = board.size
+    records = []
+    
+    for move in replay.moves:
+        seat = game.player_manager.current_player_index
+        if not game.apply_move(move):
+            raise ValueError(f"Zug {game.move_number + 1} ist ungültig: {move}")
+        number = game.move_number
+        row, col = move.row, move.col
+        
+        scoring = game.last_scoring
+        chips = scoring['chips'] if scoring else []
+        for chip_row, chip_col, owner, value in chips:
+            records.append((chip_key(value, owner), number, game_id, chip_row, chip_col))
+        
+        # Vervollständigt werden nur Zeile und Spalte des gelegten Plättchens
+        collected_now = {(chip_row, chip_col): owner for chip_row, chip_col, owner, _ in chips}
+        for axis, line, complete in ((AXIS_ROW, row, board.is_row_complete(row)),
+                                     (AXIS_COL, col, board.is_column_complete(col))):
+            if not complete:
+                continue
+            cells = [(line, index) for index in range(size)] if axis == AXIS_ROW else \
+                    [(index, line) for index in range(size)]
+            chip_mask = 0
+            scorer_mask = 0
+            for cell in cells:
+                owner = collected_now.get(cell)
+                if owner is not None:
+                    scorer_mask |= 1 << owner
+                if owner is not None or not board.is_chip_collected(*cell):
+                    value = board.get_chip_value(*cell)
+                    if value:
+                        chip_mask |= 1 << (value - 1)
+            flags = chip_mask | scorer_mask << 8
+            records.append((line_key(axis, seat), number, game_id, line, flags))
+            for value in range(1, chip_mask.bit_length() + 1):
+                if chip_mask >> (value - 1) & 1:
+                    records.append((line_key(axis, seat, value), number, game_id, line, flags))
+        
+        # Alle Fenster, die das neue Plättchen enthalten
+        for top in range(max(0, row - pattern_size + 1), min(row, size - pattern_size) + 1):
+            for left in range(max(0, col - pattern_size + 1), min(col, size - pattern_size) + 1):
+                window, tiles = _window(board, top, left, pattern_size)
+                if tiles >= MIN_PATTERN_TILES:
+                    records.append((pattern_key(window), number, game_id, top, left))
+    
+    return records, (size, len(replay.moves), game.player_count)
+
+
+def _index_chunk(jobs:list, pattern_size:int) -> list:
+    """Worker-Funktion: liest Wiederholungen und gibt ihre Einträge zurück"""
+    return [game_postings(Replay.load(path, cache_size=0), game_id, pattern_size) for game_id, path in jobs]
+
+
+def _read_run(path:str):
+    """Liest einen sortierten Lauf als Folge von Tupeln"""
+    with open(path, 'rb') as file:
+        while True:
+            data = file.read(RUN_ENTRY.size * 4096)
+            if not data:
+                return
+            yield from RUN_ENTRY.iter_unpack(data)
+
+
+def _to_bytes(values:array) -> bytes:
+    """Wandelt ein Array in Little-Endian-Bytes um"""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class IndexBuilder:
+    """
+    Baut einen Suchindex aus Wiederholungen
+    Einträge werden im Speicher gesammelt und in sortierten Läufen auf die
+    Platte geschrieben, finish mischt alle Läufe in die Indexdatei.
+    """
+    
+    def __init__(self, path:str, pattern_size:int = PATTERN_SIZE, run_size:int = DEFAULT_RUN_SIZE):
+        """
+        Initialisiert den Builder
+        
+        Args:
+            path: Zieldatei
+            pattern_size: Kantenlänge der Musterfenster
+            run_size: Einträge je sortiertem Lauf
+        """
+        self.path = path
+        self.pattern_size = pattern_size
+        self.run_size = run_size
+        self.games = []  # (Name, Spielfeldgröße, Züge, Spielerzahl)
+        self._records = []
+        self._runs = []
+        self._temp_dir = tempfile.mkdtemp(prefix='game_index_', dir=os.path.dirname(os.path.abspath(path)))
+    
+    def _add_records(self, records:list) -> None:
+        """Übernimmt Einträge und schreibt bei Bedarf einen Lauf"""
+        self._records.extend(records)
+        if len(self._records) >= self.run_size:
+            self._flush_run()
+    
+    def _flush_run(self) -> None:
+        """Sortiert die gesammelten Einträge und schreibt sie als Lauf"""
+        if not self._records:
+            return
+        self._records.sort()
+        path = os.path.join(self._temp_dir, f'run{len(self._runs)}.bin')
+        with open(path, 'wb') as file:
+            for start in range(0, len(self._records), 4096):
+                file.write(b''.join(RUN_ENTRY.pack(*record) for record in self._records[start:start + 4096]))
+        self._runs.append(path)
+        self._records = []
+    
+    def add_replay(self, replay:Replay, name:str) -> int:
+        """
+        Indiziert eine Wiederholung
+        
+        Args:
+            replay: Replay-Objekt
+            name: Name der Partie (z.B. Dateipfad)
+        
+        Returns:
+            int: Nummer der Partie im Index
+        """
+        game_id = len(self.games)
+        records, (size, moves, players) = game_postings(replay, game_id, self.pattern_size)
+        self.games.append((name, size, moves, players))
+        self._add_records(records)
+        return game_id
+    
+    def add_files(self, paths:list[str], workers:int = 1) -> int:
+        """
+        Indiziert Wiederholungsdateien, bei workers > 1 in mehreren Prozessen
+        
+        Args:
+            paths: Pfade der Dateien (Replay.save)
+            workers: Anzahl der Prozesse
+        
+        Returns:
+            int: Anzahl indizierter Partien
+        """
+        first = len(self.games)
+        jobs = [(first + index, path) for index, path in enumerate(paths)]
+        chunks = [jobs[start:start + CHUNK_GAMES] for start in range(0, len(jobs), CHUNK_GAMES)]
+        if workers == 1:
+            results = (_index_chunk(chunk, self.pattern_size) for chunk in chunks)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            results = self._worker_results(executor, chunks, PENDING_CHUNKS_PER_WORKER * workers)
+        
+        try:
+            for chunk, games in zip(chunks, results):
+                for (_, path), (records, (size, moves, players)) in zip(chunk, games):
+                    self.games.append((path, size, moves, players))
+                    self._add_records(records)
+        finally:
+            if workers != 1:
+                executor.shutdown(cancel_futures=True)
+        return len(paths)
+    
+    def _worker_results(self, executor:ProcessPoolExecutor, chunks:list[list], window:int):
+        """
+        Liefert die Ergebnisse der Aufträge in Reihenfolge
+        Höchstens window Aufträge sind gleichzeitig ausstehend; jeder weitere wird erst
+        nach Abholen eines Ergebnisses vergeben, und abgeholte Futures werden verworfen,
+        damit nie die Einträge aller Partien zugleich im Speicher liegen.
+        
+        Args:
+            executor: Prozesspool
+            chunks: Aufträge (Listen von (Partienummer, Pfad))
+            window: Höchstzahl ausstehender Aufträge
+        
+        Yields:
+            list: Ergebnis von _index_chunk je Auftrag
+        """
+        pending = deque()
+        remaining = iter(chunks)
+        for chunk in islice(remaining, window):
+            pending.append(executor.submit(collect_in_worker, _index_chunk, chunk, self.pattern_size))
+        while pending:
+            games, worker_metrics = pending.popleft().result()
+            REGISTRY.merge(worker_metrics)
+            for chunk in islice(remaining, 1):
+                pending.append(executor.submit(collect_in_worker, _index_chunk, chunk, self.pattern_size))
+            yield games
+    
+    def finish(self) -> int:
+        """
+        Mischt alle Läufe und schreibt die Indexdatei
+        
+        Returns:
+            int: Anzahl der Einträge
+        """
+        self._flush_run()
+        keys = array('Q')
+        starts = array('Q')
+        count = 0
+        try:
+            with open(self.path, 'wb') as file:
+                file.write(bytes(INDEX_HEADER.size))
+                buffer = []
+                previous = None
+                for key, move, game_id, a, b in heapq.merge(*(_read_run(path) for path in self._runs)):
+                    if key != previous:
+                        keys.append(key)
+                        starts.append(count)
+                        previous = key
+                    buffer.append(POSTING.pack(game_id, move, a, b))
+                    count += 1
+                    if len(buffer) >= 4096:
+                        file.write(b''.join(buffer))
+                        buffer = []
+                file.write(b''.join(buffer))
+                starts.append(count)
+                
+                directory_offset = file.tell()
+                file.write(_to_bytes(keys))
+                file.write(_to_bytes(starts))
+                
+                games_offset = file.tell()
+                names = [name.encode('utf-8') for name, _, _, _ in self.games]
+                name_offset = 0
+                for encoded, (_, size, moves, players) in zip(names, self.games):
+                    file.write(GAME_ENTRY.pack(name_offset, len(encoded), size, moves, players))
+                    name_offset += len(encoded)
+                names_offset = file.tell()
+                file.write(b''.join(names))
+                
+                file.seek(0)
+                file.write(INDEX_HEADER.pack(INDEX_MAGIC, self.pattern_size, len(self.games), len(keys), count,
+                                             directory_offset, games_offset, names_offset))
+        finally:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+        return count
+
+
+def build_index(paths:list[str], output:str, workers:int = 1, pattern_size:int = PATTERN_SIZE,
+                run_size:int = DEFAULT_RUN_SIZE) -> int:
+    """
+    Baut einen Suchindex aus Wiederholungsdateien
+    
+    Args:
+        paths: Pfade der Wiederholungen
+        output: Zieldatei
+        workers: Anzahl der Prozesse
+        pattern_size: Kantenlänge der Musterfenster
+        run_size: Einträge je sortiertem Lauf
+    
+    Returns:
+        int: Anzahl der Einträge
+    """
+    builder = IndexBuilder(output, pattern_size, run_size)
+    builder.add_files(paths, workers)
+    return builder.finish()
+
+
+class GameIndex:
+    """
+    Per mmap eingeblendeter Suchindex
+    Abfragen lesen nur das Verzeichnis (Binärsuche) und die Einträge der
+    passenden Schlüssel. Lässt sich an Worker-Prozesse übergeben; dort wird
+    die Datei neu geöffnet.
+    """
+    
+    def __init__(self, path:str):
+        """
+        Öffnet einen mit IndexBuilder geschriebenen Index
+        
+        Args:
+            path: Pfad der Datei
+        
+        Raises:
+            ValueError: Wenn die Datei kein Suchindex ist
+        """
+        self.path = path
+        self._open()
+    
+    def _open(self) -> None:
+        """Blendet die Datei ein und liest den Kopf"""
+        with open(self.path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.pattern_size, self.game_count, self.key_count, self.posting_count,
+         self._directory_offset, self._games_offset, self._names_offset) = INDEX_HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC:
+            self._map.close()
+            raise ValueError("Kein gültiger Suchindex")
+        self._starts_offset = self._directory_offset + KEY.size * self.key_count
+    
+    def __getstate__(self):
+        return {'path': self.path}
+    
+    def __setstate__(self, state):
+        self.path = state['path']
+        self._open()
+    
+    def __len__(self):
+        return self.game_count
+    
+    def close(self) -> None:
+        """Gibt die eingeblendete Datei frei"""
+        self._map.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def game_name(self, game_id:int) -> str:
+        """Gibt den Namen (Pfad) einer Partie zurück"""
+        offset, length, _, _, _ = GAME_ENTRY.unpack_from(self._map, self._games_offset + game_id * GAME_ENTRY.size)
+        start = self._names_offset + offset
+        return self._map[start:start + length].decode('utf-8')
+    
+    def game_info(self, game_id:int) -> tuple[int, int, int]:
+        """Gibt (Spielfeldgröße, Züge, Spielerzahl) einer Partie zurück"""
+        return GAME_ENTRY.unpack_from(self._map, self._games_offset + game_id * GAME_ENTRY.size)[2:]
+    
+    def _postings_range(self, key:int) -> tuple[int, int]:
+        """Sucht einen Schlüssel im Verzeichnis und gibt den Bereich seiner Einträge zurück"""
+        low, high = 0, self.key_count
+        while low < high:
+            middle = (low + high) // 2
+            if KEY.unpack_from(self._map, self._directory_offset + KEY.size * middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.key_count or KEY.unpack_from(self._map, self._directory_offset + KEY.size * low)[0] != key:
+            return 0, 0
+        start = KEY.unpack_from(self._map, self._starts_offset + KEY.size * low)[0]
+        stop = KEY.unpack_from(self._map, self._starts_offset + KEY.size * (low + 1))[0]
+        return start, stop
+    
+    def _move_bound(self, start:int, stop:int, move:int) -> int:
+        """Gibt den ersten Eintrag im Bereich mit Zugnummer >= move zurück"""
+        while start < stop:
+            middle = (start + stop) // 2
+            if POSTING.unpack_from(self._map, INDEX_HEADER.size + POSTING.size * middle)[1] < move:
+                start = middle + 1
+            else:
+                stop = middle
+        return start
+    
+    def postings(self, key:int, after:int | None = None, before:int | None = None):
+        """
+        Liefert die Einträge eines Schlüssels im Zugbereich, nach (Zug, Partie) sortiert
+        
+        Args:
+            key: Schlüssel (chip_key, line_key, pattern_key)
+            after: Nur Züge mit Nummer > after
+            before: Nur Züge mit Nummer < before
+        
+        Yields:
+            tuple: (Partie, Zug, a, b)
+        """
+        start, stop = self._postings_range(key)
+        if after is not None:
+            start = self._move_bound(start, stop, after + 1)
+        if before is not None:
+            stop = self._move_bound(start, stop, before)
+        begin = INDEX_HEADER.size + POSTING.size * start
+        yield from POSTING.iter_unpack(self._map[begin:INDEX_HEADER.size + POSTING.size * stop])
+    
+    def _keyed_postings(self, key:int, after:int | None, before:int | None):
+        """Liefert die Einträge eines Schlüssels als (Zug, Partie, a, b, Schlüssel)"""
+        for game_id, move, a, b in self.postings(key, after, before):
+            yield move, game_id, a, b, key
+    
+    def _merged(self, keys:list, after:int | None, before:int | None, limit:int | None):
+        """Mischt die Einträge mehrerer Schlüssel nach (Zug, Partie)"""
+        return islice(heapq.merge(*(self._keyed_postings(key, after, before) for key in keys)), limit)
+    
+    def chip_collections(self, value:int, seat:int | None = None, after:int | None = None,
+                         before:int | None = None, limit:int | None = None) -> list[ChipHit]:
+        """
+        Sucht eingesammelte Chips eines Werts
+        
+        Args:
+            value: Chipwert
+            seat: Spielerindex, der den Chip eingesammelt hat (None = alle)
+            after: Nur Züge mit Nummer > after
+            before: Nur Züge mit Nummer < before
+            limit: Höchstzahl der Treffer
+        
+        Returns:
+            list: ChipHit, nach (Zug, Partie) sortiert
+        """
+        seats = range(MAX_PLAYER_COUNT) if seat is None else (seat,)
+        keys = [chip_key(value, index) for index in seats]
+        return [ChipHit(game_id, move, key & 0xFF, value, a, b)
+                for move, game_id, a, b, key in self._merged(keys, after, before, limit)]
+    
+    def completed_lines(self, seat:int | None = None, axis:str | None = None, chip_value:int | None = None,
+                        after:int | None = None, before:int | None = None,
+                        limit:int | None = None) -> list[LineHit]:
+        """
+        Sucht vervollständigte Zeilen und Spalten
+        Beispiel: Spieler 2 hat vor Zug 20 eine Zeile mit einem 6er-Chip
+        vervollständigt: completed_lines(seat=2, axis='row', chip_value=6, before=20)
+        
+        Args:
+            seat: Spielerindex, der die Linie vervollständigt hat (None = alle)
+            axis: 'row', 'col' oder None (beide)
+            chip_value: Chipwert, der beim Vervollständigen auf der Linie lag (None = beliebig)
+            after: Nur Züge mit Nummer > after
+            before: Nur Züge mit Nummer < before
+            limit: Höchstzahl der Treffer
+        
+        Returns:
+            list: LineHit, nach (Zug, Partie) sortiert
+        
+        Raises:
+            ValueError: Bei unbekannter Richtung
+        """
+        if axis is not None and axis not in AXIS_CODES:
+            raise ValueError(f"Unbekannte Richtung '{axis}'")
+        axes = AXIS_CODES.values() if axis is None else (AXIS_CODES[axis],)
+        seats = range(MAX_PLAYER_COUNT) if seat is None else (seat,)
+        value = ANY_VALUE if chip_value is None else chip_value
+        keys = [line_key(code, index, value) for code in axes for index in seats]
+        names = {code: name for name, code in AXIS_CODES.items()}
+        hits = []
+        for move, game_id, line, flags, key in self._merged(keys, after, before, limit):
+            chip_mask, scorer_mask = flags & 0xFF, flags >> 8
+            hits.append(LineHit(game_id, move, key >> 8 & 0xFF, names[key >> 16 & 0xFF], line,
+                                tuple(v for v in range(1, MAX_CHIP_VALUE + 1) if chip_mask >> (v - 1) & 1),
+                                tuple(s for s in range(MAX_PLAYER_COUNT) if scorer_mask >> s & 1)))
+        return hits
+    
+    def patterns(self, cells, symmetric:bool = False, after:int | None = None, before:int | None = None,
+                 limit:int | None = None) -> list[PatternHit]:
+        """
+        Sucht Stellungen, in denen ein Plättchenmuster entstanden ist
+        Ein Treffer ist der Zug, nach dem ein Fenster genau so aussah
+        (Diamanten in Lage auf dem Spielfeld, leere Felder leer).
+        
+        Args:
+            cells: pattern_size Zeilen zu je pattern_size Feldern, je Feld
+                   4 Diamanten oder None (leer)
+            symmetric: Auch gedrehte und gespiegelte Muster finden
+            after: Nur Züge mit Nummer > after
+            before: Nur Züge mit Nummer < before
+            limit: Höchstzahl der Treffer
+        
+        Returns:
+            list: PatternHit, nach (Zug, Partie) sortiert
+        
+        Raises:
+            ValueError: Wenn das Muster nicht zur Mustergröße des Index passt
+        """
+        if len(cells) != self.pattern_size:
+            raise ValueError(f"Muster muss {self.pattern_size} × {self.pattern_size} Felder haben")
+        variants = [transform_pattern(cells, symmetry) for symmetry in range(SYMMETRY_COUNT)] if symmetric else [cells]
+        keys = sorted({pattern_key(pattern_bytes(variant)) for variant in variants})
+        return [PatternHit(game_id, move, a, b) for move, game_id, a, b, _ in self._merged(keys, after, before, limit)]
+    
+    @staticmethod
+    def games(hits) -> list[int]:
+        """Gibt die Partien einer Trefferliste aufsteigend und ohne Wiederholung zurück"""
+        return sorted({hit.game for hit in hits})
+
+
+def _print_hits(index:GameIndex, hits:list) -> None:
+    """Gibt Treffer mit Partienamen aus"""
+    for hit in hits:
+        print(index.game_name(hit.game), *hit[1:])
+    print(f"{len(hits)} Treffer in {len(GameIndex.games(hits))} Partien")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suchindex über aufgezeichnete Partien")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Index aus Wiederholungen bauen")
+    build.add_argument('paths', nargs='+')
+    build.add_argument('--output', default='games.idx')
+    build.add_argument('--workers', type=int, default=1)
+    build.add_argument('--pattern-size', type=int, default=PATTERN_SIZE)
+    lines = commands.add_parser('lines', help="Vervollständigte Linien suchen")
+    chips = commands.add_parser('chips', help="Eingesammelte Chips suchen")
+    for query in (lines, chips):
+        query.add_argument('index')
+        query.add_argument('--seat', type=int)
+        query.add_argument('--after', type=int)
+        query.add_argument('--before', type=int)
+        query.add_argument('--limit', type=int, default=50)
+    lines.add_argument('--axis', choices=sorted(AXIS_CODES))
+    lines.add_argument('--chip', type=int)
+    chips.add_argument('--value', type=int, required=True)
+    args = parser.parse_args()
+    
+    if args.command == 'build':
+        count = build_index(args.paths, args.output, args.workers, args.pattern_size)
+        print(f"{len(args.paths)} Partien, {count} Einträge -> {args.output}")
+    else:
+        with GameIndex(args.index) as index:
+            if args.command == 'lines':
+                found = index.completed_lines(args.seat, args.axis, args.chip, args.after, args.before, args.limit)
+            else:
+                found = index.chip_collections(args.value, args.seat, args.after, args.before, args.limit)
+            _print_hits(index, found)
@@ -0,0 +1,166 @@
+"""
+Zugvorschläge (Tipps) für menschliche Spieler
+Sobald ein Mensch am Zug ist, wird der beste Zug im Hintergrund berechnet,
+damit der Tipp beim Drücken der Tipp-Taste bereits vorliegt. Ergebnisse
+werden je Stellung zwischengespeichert; das Drehen des Plättchens ändert
+die Stellung dabei nicht.
+"""
+from collections import OrderedDict
+from typing import NamedTuple
+
+from ai import AsyncMoveProvider, MoveSearch
+from constants import GAME_STATE_PLAYING
+from game import Game
+from state_codec import encode_game
+from tile import Tile
+
+DEFAULT_CACHE_SIZE = 64
+
+
+class Hint(NamedTuple):
+    """
+    Ein Zugvorschlag: Zielfeld, Drehungen ab der Ausgangslage des Plättchens
+    und Slot des Plättchens in der Hand
+    """
+    row: int
+    col: int
+    rotation: int
+    tile: int = -1
+    
+    def tile_for(self, game:Game) -> Tile:
+        """
+        Erstellt eine Kopie des vorgeschlagenen Plättchens in der vorgeschlagenen Ausrichtung
+        
+        Args:
+            game: Game-Objekt
+        
+        Returns:
+            Tile: Neues Plättchen (nur zum Zeichnen)
+        """
+        slot = self.tile if self.tile >= 0 else game.selected_slot
+        source = game.get_current_player().hand.get(slot)
+        tile = Tile(list(source.diamonds))
+        tile.set_owner(source.owner)
+        # Das ausgewählte Plättchen ist eventuell schon gedreht
+        rotation = self.rotation - game.selected_rotation if slot == game.selected_slot else self.rotation
+        for _ in range(rotation % 4):
+            tile.rotate_clockwise()
+        return tile
+
+
+def position_key(game:Game) -> bytes:
+    """
+    Gibt den Schlüssel einer Stellung zurück, unabhängig von der aktuellen
+    Drehung des ausgewählten Plättchens
+    
+    Args:
+        game: Game-Objekt
+    
+    Returns:
+        bytes: Kodierte Stellung
+    """
+    tile = game.selected_tile
+    if tile is None or not game.selected_rotation:
+        return encode_game(game)
+    diamonds = tile.diamonds
+    for _ in range(game.selected_rotation):
+        tile.rotate_counter_clockwise()
+    try:
+        return encode_game(game)
+    finally:
+        tile.diamonds = diamonds
+
+
+class HintProvider:
+    """
+    Berechnet Tipps im Hintergrund und hält sie je Stellung vor
+    """
+    
+    def __init__(self, search:MoveSearch | None = None, use_processes:bool = False,
+                 cache_size:int = DEFAULT_CACHE_SIZE):
+        """
+        Initialisiert den Provider
+        
+        Args:
+            search: Zugsuche (Standard wie AsyncMoveProvider)
+            use_processes: Suche in einem eigenen Prozess statt einem Thread
+            cache_size: Anzahl zwischengespeicherter Tipps
+        """
+        self.provider = AsyncMoveProvider(search, use_processes)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # Stellungsschlüssel -> Hint
+        self._position = None  # (Zugnummer, ausgewähltes Plättchen) der bekannten Stellung
+        self._key = None
+        self._request = None
+        self._request_key = None
+    
+    def update(self, game:Game) -> None:
+        """
+        Startet bzw. fragt die Berechnung für die aktuelle Stellung ab
+        Wird pro Frame aufgerufen und blockiert nie.
+        
+        Args:
+            game: Game-Objekt
+        """
+        if (game.state != GAME_STATE_PLAYING or game.selected_tile is None
+                or not game.get_current_player().is_human):
+            self.cancel()
+            return
+        
+        # Schlüssel nur neu berechnen, wenn sich die Stellung geändert hat
+        if (self._position is None or self._position[0] != game.move_number
+                or self._position[1] is not game.selected_tile):
+            self._position = (game.move_number, game.selected_tile)
+            self._key = position_key(game)
+            if self._request is not None and self._request_key != self._key:
+                self.cancel()
+        
+        if self._key in self.cache:
+            return
+        
+        if self._request is None:
+            self._request = self.provider.request(game)
+            self._request_key = self._key
+            return
+        
+        if self._request.done:
+            move = self._request.poll()
+            self._request = None
+            if move is not None:
+                self._store(self._request_key, Hint(move.row, move.col, move.rotation % 4, move.tile))
+    
+    def _store(self, key:bytes, hint:Hint) -> None:
+        """Legt einen Tipp im LRU-Cache ab"""
+        self.cache[key] = hint
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+    
+    def hint(self, game:Game) -> Hint | None:
+        """
+        Gibt den Tipp für die aktuelle Stellung zurück
+        
+        Args:
+            game: Game-Objekt
+        
+        Returns:
+            Hint oder None (noch nicht berechnet)
+        """
+        if (self._position is None or self._position[0] != game.move_number
+                or self._position[1] is not game.selected_tile):
+            return None
+        hint = self.cache.get(self._key)
+        if hint is not None:
+            self.cache.move_to_end(self._key)
+        return hint
+    
+    def cancel(self) -> None:
+        """Bricht eine laufende Berechnung ab"""
+        if self._request is not None:
+            self._request.cancel()
+            self._request = None
+    
+    def shutdown(self) -> None:
+        """Beendet den Worker"""
+        self.cancel()
+        self.provider.shutdown()
@@ -0,0 +1,87 @@
+"""
+Prüft die Importzeit der Spiellogik-Module
+Jedes Modul wird in einem frischen Interpreter mit `-X importtime` geladen.
+Die Prüfung schlägt fehl, wenn das Zeitbudget überschritten wird oder ein
+Logikmodul PyGame bzw. den Renderer mitlädt.
+
+Aufruf:
+    python import_budget.py [--budget-ms 30]
+"""
+import argparse
+import subprocess
+import sys
+
+# Module, die Worker-Prozesse ohne Fenster benötigen
+LOGIC_MODULES = ['constants', 'rules', 'tile', 'point_chip', 'board', 'player', 'scoring', 'game',
+                 'endgame', 'symmetry', 'ai', 'hint', 'shared_state']
+
+# Module, die von der Spiellogik niemals geladen werden dürfen
+FORBIDDEN_MODULES = {'pygame', 'renderer', 'utils', 'main'}
+
+DEFAULT_BUDGET_MS = 30.0
+
+
+def measure_import(module:str) -> dict:
+    """
+    Misst die Importzeit eines Moduls in einem neuen Interpreter
+    
+    Args:
+        module: Name des Moduls
+    
+    Returns:
+        dict: {Modulname: kumulative Importzeit in Mikrosekunden}
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def check_budget(budget_ms:float = DEFAULT_BUDGET_MS) -> list[str]:
+    """
+    Prüft alle Logikmodule gegen das Zeitbudget
+    
+    Args:
+        budget_ms: Erlaubte kumulative Importzeit je Modul in Millisekunden
+    
+    Returns:
+        list: Gefundene Verstöße (leer wenn alles in Ordnung ist)
+    """
+    problems = []
+    for module in LOGIC_MODULES:
+        timings = measure_import(module)
+        forbidden = FORBIDDEN_MODULES.intersection(
+            name.split('.')[0] for name in timings
+        )
+        if forbidden:
+            problems.append(f"{module} lädt {', '.join(sorted(forbidden))}")
+        
+        elapsed_ms = timings.get(module, 0) / 1000
+        if elapsed_ms > budget_ms:
+            problems.append(f"{module}: {elapsed_ms:.1f} ms (Budget {budget_ms:.1f} ms)")
+    return problems
+
+
+def main() -> int:
+    """Kommandozeilen-Einstieg, gibt den Exit-Code zurück"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+    
+    problems = check_budget(args.budget_ms)
+    for problem in problems:
+        print(problem)
+    if not problems:
+        print(f"Alle Logikmodule innerhalb von {args.budget_ms:.1f} ms")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
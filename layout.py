@@ -0,0 +1,112 @@
+"""
+Auflösungsunabhängiges Layout der Oberfläche
+Alle Koordinaten sind im Basis-Entwurf angegeben (WINDOW_WIDTH × WINDOW_HEIGHT
+bei einem BOARD_SIZE-Spielfeld, CELL_SIZE pro Feld) und werden mit einem
+gemeinsamen Faktor auf die tatsächliche Fenstergröße skaliert; übriger Platz
+wird gleichmäßig verteilt (zentriert).
+
+Der Faktor wird auf SCALE_STEP abgerundet, damit beim Ziehen am Fensterrand
+nicht bei jedem Pixel neue Sprites entstehen. Bei 1200 × 900 und 8 × 8
+Feldern ist er genau 1 und alle Positionen entsprechen den Konstanten.
+
+Ohne PyGame nutzbar.
+"""
+import math
+
+from constants import *
+
+SIDEBAR_WIDTH = WINDOW_WIDTH - BOARD_OFFSET_X - BOARD_SIZE * CELL_SIZE  # Spielerinfo samt Rand
+SCALE_STEP = 0.05
+MIN_SCALE = 0.3
+
+
+class Layout:
+    """
+    Geometrie der Oberfläche für eine Fenstergröße und Spielfeldgröße
+    """
+    
+    def __init__(self, width:int = WINDOW_WIDTH, height:int = WINDOW_HEIGHT, board_size:int = BOARD_SIZE):
+        """
+        Berechnet Skalierung und Positionen
+        
+        Args:
+            width: Fensterbreite (Pixel)
+            height: Fensterhöhe (Pixel)
+            board_size: Größe des Spielfelds
+        """
+        self.width = width
+        self.height = height
+        self.board_size = board_size
+        # Größere Spielfelder vergrößern den Basis-Entwurf, kleinere bleiben bei der Fenstergröße
+        self.base_width = max(WINDOW_WIDTH, BOARD_OFFSET_X + board_size * CELL_SIZE + SIDEBAR_WIDTH)
+        self.base_height = max(WINDOW_HEIGHT, 2 * BOARD_OFFSET_Y + board_size * CELL_SIZE)
+        fit = min(width / self.base_width, height / self.base_height)
+        self.scale = max(MIN_SCALE, round(math.floor(round(fit / SCALE_STEP, 6)) * SCALE_STEP, 4))
+        
+        scale = self.scale
+        self.origin_x = (width - round(self.base_width * scale)) // 2
+        self.origin_y = (height - round(self.base_height * scale)) // 2
+        
+        # Größen (abhängig nur vom Faktor)
+        self.cell_size = round(CELL_SIZE * scale)
+        self.tile_inset = max(1, round((CELL_SIZE - TILE_SIZE) / 2 * scale))
+        self.tile_size = self.cell_size - 2 * self.tile_inset
+        self.tile_border_offset = TILE_BORDER_OFFSET * scale
+        self.diamond_radius = self.tile_size / 2 - self.tile_border_offset*2
+        self.diamond_sprite_size = int(self.diamond_radius) + 3  # Raute samt Umriss
+        self.chip_radius = round(CHIP_RADIUS * scale)
+        self.chip_offset = max(1, round(OFFSET * scale))
+        self.chip_sprite_size = 2 * (self.chip_radius + self.chip_offset) + 1  # Chip samt Schatten
+        self.panel_size = (self.px(280), self.px(60))
+        self.font_size = max(8, self.px(FONT_SIZE))
+        self.title_font_size = max(10, self.px(TITLE_FONT_SIZE))
+        
+        # Positionen
+        self.board_x, self.board_y = self.point(BOARD_OFFSET_X, BOARD_OFFSET_Y)
+        self.board_right = self.board_x + board_size * self.cell_size
+        self.sidebar_x = self.board_right + self.px(50)
+    
+    def px(self, value:float) -> int:
+        """Skaliert eine Länge des Basis-Entwurfs"""
+        return round(value * self.scale)
+    
+    def line(self, width:int) -> int:
+        """Skaliert eine Linienbreite (mindestens 1 Pixel)"""
+        return max(1, self.px(width))
+    
+    def point(self, x:float, y:float) -> tuple[int, int]:
+        """Rechnet einen Punkt des Basis-Entwurfs in Fensterpixel um"""
+        return round(self.origin_x + x * self.scale), round(self.origin_y + y * self.scale)
+    
+    def center(self, y:float) -> tuple[int, int]:
+        """Gibt den waagrecht zentrierten Punkt in Höhe y des Basis-Entwurfs zurück"""
+        return self.width // 2, round(self.origin_y + y * self.scale)
+    
+    def cell_origin(self, row:int, col:int) -> tuple[int, int]:
+        """Gibt die linke obere Ecke eines Felds in Pixeln zurück"""
+        return self.board_x + col * self.cell_size, self.board_y + row * self.cell_size
+    
+    def cell_at(self, position:tuple[int, int]) -> tuple[int, int]:
+        """
+        Rechnet eine Pixelposition in eine Spielfeldposition um
+        
+        Args:
+            position: (x, y) in Pixeln
+        
+        Returns:
+            tuple: (row, col), auch außerhalb des Spielfelds
+        """
+        x, y = position
+        return (y - self.board_y) // self.cell_size, (x - self.board_x) // self.cell_size
+    
+    def player_panel_origin(self, player_index:int) -> tuple[int, int]:
+        """Gibt die linke obere Ecke des Eintrags eines Spielers in der Spielerinfo zurück"""
+        return self.sidebar_x, self.board_y + self.px(50 + player_index * 70)
+    
+    def current_tile_label(self) -> tuple[int, int]:
+        """Gibt die Position der Überschrift über dem aktuellen Plättchen zurück"""
+        return self.sidebar_x, self.origin_y + self.px(500)
+    
+    def current_tile_origin(self) -> tuple[int, int]:
+        """Gibt die linke obere Ecke des aktuellen Plättchens in der Vorschau zurück"""
+        return self.board_right + self.px(100), self.origin_y + self.px(540)
@@ -1,23 +1,41 @@
 """
 Hauptdatei für Carat Brettspiel - PyGame Umsetzung
+
+Aufruf:
+    python main.py [--size 1280x720] [--resizable]
 """
-import pygame
+import argparse
+import os
 import sys
-from constants import *
-from renderer import Renderer
-from utils import start_menu, handle_events, update, render
+
+from constants import FPS, WINDOW_HEIGHT, WINDOW_WIDTH
+
 
 class CaratGame:
     """
     Hauptklasse für das Spiel
     """
     
-    def __init__(self):
-        """Initialisiert PyGame und das Spiel"""
+    def __init__(self, size:tuple[int, int] = (WINDOW_WIDTH, WINDOW_HEIGHT), resizable:bool = False):
+        """
+        Initialisiert PyGame und das Spiel
+        
+        Args:
+            size: Fenstergröße in Pixeln (die Darstellung wird passend skaliert)
+            resizable: Fenstergröße zur Laufzeit änderbar
+        """
+        # PyGame erst laden, wenn das Fenster tatsächlich gebraucht wird
+        import pygame
+        from ai import AsyncMoveProvider
+        from animation import Timeline
+        from hint import HintProvider
+        from opening_book import DEFAULT_BOOK_PATH, OpeningBook, OpeningBookSearch
+        from renderer import Renderer
+        
         pygame.init()
         
         # Fenster erstellen
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.screen = pygame.display.set_mode(size, pygame.RESIZABLE if resizable else 0)
         pygame.display.set_caption("Carat - Brettspiel")
         
         # Clock für FPS
@@ -26,19 +44,44 @@ class CaratGame:
         # Renderer
         self.renderer = Renderer(self.screen)
         
+        # KI-Züge in einem eigenen Prozess berechnen, mit Eröffnungsbuch falls vorhanden
+        search = None
+        if os.path.exists(DEFAULT_BOOK_PATH):
+            search = OpeningBookSearch(OpeningBook(DEFAULT_BOOK_PATH))
+        self.move_provider = AsyncMoveProvider(search, use_processes=True)
+        # Tipps für menschliche Spieler, ebenfalls außerhalb der Spielschleife
+        self.hint_provider = HintProvider(search, use_processes=True)
+        self.show_hint = False
+        self.free_choice = False  # Regel für neue Spiele, im Menü umschaltbar
+        
         # Spiel
         self.game = None
         self.running = True
         
+        # Aufzeichnung für die Wiederholung am Spielende
+        self.recorder = None
+        self.replay = None
+        self.replay_position = None
+        
         # Maus-State
         self.mouse_pos = (0, 0)
+        
+        # Animationen und Neuzeichnen nur bei Änderungen
+        self.timeline = Timeline()
+        self.animated_moves = 0  # Zugnummer, bis zu der Animationen angelegt wurden
+        self.drop_origin = None  # Ausgangsposition des zuletzt per Maus gelegten Plättchens
+        self.needs_redraw = True
+        self.drawn_hint = None  # Zuletzt gezeichneter Tipp
     
     
     def run(self):
         """Hauptspielschleife"""
+        import pygame
+        from utils import start_menu, handle_events, update, render
+        
         # Zeige Menü
         start_menu(self)
-
+        
         # Spielschleife
         while self.running and self.game:
             handle_events(self)
@@ -46,9 +89,28 @@ class CaratGame:
             render(self)
             self.clock.tick(FPS)
         
+        if self.game:
+            self.game.cancel_pending_move()
+        self.move_provider.shutdown()
+        self.hint_provider.shutdown()
         pygame.quit()
         sys.exit()
 
+def _window_size(text:str) -> tuple[int, int]:
+    """Liest eine Fenstergröße der Form BREITExHÖHE"""
+    try:
+        width, height = (int(part) for part in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ungültige Fenstergröße {text!r}, erwartet z.B. 1280x720")
+    return width, height
+
+
 if __name__ == "__main__":
-    game = CaratGame()
+    parser = argparse.ArgumentParser(description="Carat Brettspiel")
+    parser.add_argument('--size', type=_window_size, default=(WINDOW_WIDTH, WINDOW_HEIGHT),
+                        help="Fenstergröße, z.B. 1280x720 oder 3840x2160")
+    parser.add_argument('--resizable', action='store_true',
+                        help="Fenstergröße zur Laufzeit änderbar (Darstellung skaliert mit)")
+    args = parser.parse_args()
+    game = CaratGame(args.size, args.resizable)
     game.run()
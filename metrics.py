@@ -0,0 +1,359 @@
+"""
+Kennzahlen für den Betrieb vieler Spiele ohne Fenster
+Zähler und Histogramme werden pro Prozess ohne Sperren fortgeschrieben
+(einfache Additionen unter dem GIL; zwischen Threads kann unter Last selten
+ein Inkrement verloren gehen). Worker-Prozesse geben ihre Kennzahlen als
+Delta mit dem Ergebnis zurück (collect_in_worker), der Elternprozess führt
+sie mit merge zusammen.
+
+Gezählt werden nur tatsächlich gespielte Züge: Suchen führen ihre Probezüge
+in Game.probing aus, Wiederholungen setzen Game.record_metrics = False.
+Beendete Spiele zählt der Aufrufer (GAMES_COMPLETED.inc()), da die Suche
+Spielenden nur ausprobiert und wieder zurücknimmt.
+
+Zeiten werden in Nanosekunden gemessen und in Zweierpotenz-Buckets einsortiert
+(int.bit_length statt Suche). Die Zeitmessung im Zugpfad ist eine Stichprobe:
+nur jeder SAMPLE_INTERVAL-te Zug wird gemessen und mit diesem Faktor gewichtet.
+Auch das Zählen der Züge läuft über diesen Countdown (MOVE_CLOCK), damit der
+Aufwand unter 1 % der Zugrate bleibt.
+
+Ausgabe im Prometheus-Textformat über einen kleinen HTTP-Endpunkt
+(serve_prometheus) oder periodisch in eine Datei (MetricsFileWriter).
+"""
+import os
+
+# Stichprobe im Zugpfad: jeder 61. Zug. Eine Primzahl, damit bei fester
+# Partielänge (z.B. 32 Züge) nicht immer derselbe Zug gemessen wird.
+SAMPLE_INTERVAL = 61
+
+# Buckets: (2^(k-1), 2^k] ns für k = MIN_BUCKET_BITS .. MAX_BUCKET_BITS (ca. 1 µs bis 69 s)
+MIN_BUCKET_BITS = 10
+MAX_BUCKET_BITS = 36
+
+DEFAULT_FLUSH_INTERVAL = 10.0
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Counter:
+    """
+    Monoton steigender Zähler
+    """
+    
+    def __init__(self, name:str, help_text:str):
+        """
+        Initialisiert den Zähler
+        
+        Args:
+            name: Name im Prometheus-Format (z.B. carat_moves_applied_total)
+            help_text: Beschreibung für die Ausgabe
+        """
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+    
+    def inc(self, amount:int = 1) -> None:
+        """Erhöht den Zähler"""
+        self.value += amount
+
+
+class Histogram:
+    """
+    Histogramm für Dauern mit Zweierpotenz-Buckets in Nanosekunden
+    """
+    
+    def __init__(self, name:str, help_text:str):
+        """
+        Initialisiert das Histogramm
+        
+        Args:
+            name: Name im Prometheus-Format (z.B. carat_ai_think_seconds)
+            help_text: Beschreibung für die Ausgabe
+        """
+        self.name = name
+        self.help_text = help_text
+        self.counts = [0] * (MAX_BUCKET_BITS - MIN_BUCKET_BITS + 1)
+        self.sum_ns = 0
+        self.count = 0
+    
+    def observe_ns(self, duration_ns:int, weight:int = 1) -> None:
+        """
+        Trägt eine Dauer ein
+        
+        Args:
+            duration_ns: Dauer in Nanosekunden
+            weight: Gewicht (bei Stichproben das Stichprobenintervall)
+        """
+        bucket = duration_ns.bit_length() - MIN_BUCKET_BITS
+        if bucket < 0:
+            bucket = 0
+        elif bucket >= len(self.counts):
+            bucket = len(self.counts) - 1
+        self.counts[bucket] += weight
+        self.sum_ns += duration_ns * weight
+        self.count += weight
+
+
+class SampleClock:
+    """
+    Countdown für Stichproben im Zugpfad, der zugleich die Ereignisse zählt
+    Pro Ereignis kostet er nur ein Dekrement; der Zähler wird bei jeder
+    Stichprobe um die abgelaufenen Ereignisse erhöht, der Rest beim Auslesen (flush).
+    Das Dekrement ist nicht gesperrt: Zählen mehrere Threads gleichzeitig,
+    kann der Countdown an 0 vorbei laufen, daher der Vergleich mit <= 0.
+    
+    Verwendung:
+        clock.countdown -= 1
+        if clock.countdown <= 0:
+            clock.tick()  # Stichprobe messen
+    """
+    
+    def __init__(self, counter:Counter, interval:int = SAMPLE_INTERVAL):
+        """
+        Initialisiert die Uhr
+        
+        Args:
+            counter: Zähler der Ereignisse
+            interval: Jedes wievielte Ereignis gemessen wird
+        """
+        self.counter = counter
+        self.interval = interval
+        self.countdown = interval
+    
+    def tick(self) -> None:
+        """Startet das nächste Intervall (bei countdown <= 0)"""
+        self.counter.value += self.interval - self.countdown
+        self.countdown = self.interval
+    
+    def flush(self) -> None:
+        """Überträgt die Ereignisse des laufenden Intervalls in den Zähler"""
+        self.counter.value += self.interval - self.countdown
+        self.countdown = self.interval
+
+
+class MetricsRegistry:
+    """
+    Alle Kennzahlen eines Prozesses
+    """
+    
+    def __init__(self):
+        """Initialisiert eine leere Registry"""
+        self.counters = {}
+        self.histograms = {}
+        self.clocks = []
+    
+    def counter(self, name:str, help_text:str = '') -> Counter:
+        """Gibt den Zähler mit diesem Namen zurück und legt ihn bei Bedarf an"""
+        if name not in self.counters:
+            self.counters[name] = Counter(name, help_text)
+        return self.counters[name]
+    
+    def histogram(self, name:str, help_text:str = '') -> Histogram:
+        """Gibt das Histogramm mit diesem Namen zurück und legt es bei Bedarf an"""
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(name, help_text)
+        return self.histograms[name]
+    
+    def sample_clock(self, counter:Counter, interval:int = SAMPLE_INTERVAL) -> SampleClock:
+        """Legt eine Stichproben-Uhr an, die beim Auslesen mit übertragen wird"""
+        clock = SampleClock(counter, interval)
+        self.clocks.append(clock)
+        return clock
+    
+    def snapshot(self) -> dict:
+        """
+        Gibt den aktuellen Stand als einfache, picklebare Struktur zurück
+        
+        Returns:
+            dict: {'counters': {Name: Wert}, 'histograms': {Name: (Buckets, Summe ns, Anzahl)}}
+        """
+        for clock in self.clocks:
+            clock.flush()
+        return {
+            'counters': {name: counter.value for name, counter in self.counters.items()},
+            'histograms': {name: (list(histogram.counts), histogram.sum_ns, histogram.count)
+                           for name, histogram in self.histograms.items()},
+        }
+    
+    def reset(self) -> None:
+        """Setzt alle Kennzahlen auf 0 (die Objekte bleiben erhalten)"""
+        for clock in self.clocks:
+            clock.countdown = clock.interval
+        for counter in self.counters.values():
+            counter.value = 0
+        for histogram in self.histograms.values():
+            histogram.counts = [0] * len(histogram.counts)
+            histogram.sum_ns = 0
+            histogram.count = 0
+    
+    def drain(self) -> dict:
+        """
+        Gibt den Stand seit dem letzten Aufruf zurück und setzt ihn zurück
+        
+        Returns:
+            dict: Snapshot (siehe snapshot)
+        """
+        snapshot = self.snapshot()
+        self.reset()
+        return snapshot
+    
+    def merge(self, snapshot:dict) -> None:
+        """
+        Addiert einen Snapshot, z.B. das Delta eines Worker-Prozesses
+        
+        Args:
+            snapshot: Ergebnis von snapshot oder drain
+        """
+        for name, value in snapshot['counters'].items():
+            self.counter(name).value += value
+        for name, (counts, sum_ns, count) in snapshot['histograms'].items():
+            histogram = self.histogram(name)
+            histogram.counts = [own + other for own, other in zip(histogram.counts, counts)]
+            histogram.sum_ns += sum_ns
+            histogram.count += count
+    
+    def render_prometheus(self) -> str:
+        """
+        Gibt alle Kennzahlen im Prometheus-Textformat zurück
+        
+        Returns:
+            str: Text für einen Scrape bzw. eine Datei
+        """
+        lines = []
+        for clock in self.clocks:
+            clock.flush()
+        for counter in self.counters.values():
+            lines.append(f"# HELP {counter.name} {counter.help_text}")
+            lines.append(f"# TYPE {counter.name} counter")
+            lines.append(f"{counter.name} {counter.value}")
+        
+        for histogram in self.histograms.values():
+            lines.append(f"# HELP {histogram.name} {histogram.help_text}")
+            lines.append(f"# TYPE {histogram.name} histogram")
+            cumulative = 0
+            for index, count in enumerate(histogram.counts[:-1]):
+                cumulative += count
+                upper = (1 << (MIN_BUCKET_BITS + index)) / 1e9
+                lines.append(f'{histogram.name}_bucket{{le="{upper:.9g}"}} {cumulative}')
+            lines.append(f'{histogram.name}_bucket{{le="+Inf"}} {histogram.count}')
+            lines.append(f"{histogram.name}_sum {histogram.sum_ns / 1e9:.9g}")
+            lines.append(f"{histogram.name}_count {histogram.count}")
+        return '\n'.join(lines) + '\n'
+    
+    def write_file(self, path:str) -> None:
+        """
+        Schreibt die Prometheus-Ausgabe atomar in eine Datei
+        (z.B. für den Textfile-Collector des node_exporter)
+        
+        Args:
+            path: Zieldatei
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(self.render_prometheus())
+        os.replace(temp_path, path)
+
+
+# Kennzahlen des Prozesses
+REGISTRY = MetricsRegistry()
+MOVES_APPLIED = REGISTRY.counter('carat_moves_applied_total', 'Ausgeführte Züge')
+MOVE_CLOCK = REGISTRY.sample_clock(MOVES_APPLIED)
+GAMES_COMPLETED = REGISTRY.counter('carat_games_completed_total', 'Beendete Spiele')
+SCORE_LINES_SECONDS = REGISTRY.histogram(
+    'carat_score_lines_seconds', 'Dauer von check_and_score_lines (Stichprobe, gewichtet)')
+VALID_PLACEMENTS_SECONDS = REGISTRY.histogram(
+    'carat_valid_placements_seconds', 'Dauer von get_valid_placements (Stichprobe, gewichtet)')
+AI_THINK_SECONDS = REGISTRY.histogram('carat_ai_think_seconds', 'Bedenkzeit der KI je Zug')
+EVAL_POSITIONS = REGISTRY.counter('carat_eval_positions_total', 'Vom Bewertungsserver bewertete Stellungen')
+EVAL_BATCHES = REGISTRY.counter('carat_eval_batches_total', 'Gebündelte Bewertungsdurchläufe des Bewertungsservers')
+EVAL_BATCH_SECONDS = REGISTRY.histogram('carat_eval_batch_seconds', 'Dauer eines gebündelten Bewertungsdurchlaufs')
+
+
+def collect_in_worker(function, *args):
+    """
+    Führt eine Funktion in einem Worker-Prozess aus und gibt ihre Kennzahlen mit zurück
+    Der Stand wird vorher zurückgesetzt, damit geerbte (fork) oder frühere
+    Aufgaben desselben Workers nicht doppelt gezählt werden.
+    
+    Args:
+        function: Auszuführende Funktion (picklebar)
+        *args: Argumente der Funktion
+    
+    Returns:
+        tuple: (Ergebnis, Kennzahlen-Delta für REGISTRY.merge)
+    """
+    REGISTRY.reset()
+    result = function(*args)
+    return result, REGISTRY.drain()
+
+
+class MetricsFileWriter:
+    """
+    Schreibt die Kennzahlen periodisch in eine Datei (Hintergrund-Thread)
+    """
+    
+    def __init__(self, path:str, interval:float = DEFAULT_FLUSH_INTERVAL,
+                 registry:MetricsRegistry = REGISTRY):
+        """
+        Initialisiert den Writer
+        
+        Args:
+            path: Zieldatei
+            interval: Sekunden zwischen zwei Schreibvorgängen
+            registry: Auszugebende Registry
+        """
+        import threading
+        
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='carat-metrics', daemon=True)
+    
+    def start(self) -> None:
+        """Startet das periodische Schreiben"""
+        self._thread.start()
+    
+    def _run(self) -> None:
+        """Schreibt bis zum Stoppen in festen Abständen"""
+        while not self._stop.wait(self.interval):
+            self.registry.write_file(self.path)
+    
+    def stop(self) -> None:
+        """Stoppt den Writer und schreibt ein letztes Mal"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.registry.write_file(self.path)
+
+
+async def serve_prometheus(host:str = '127.0.0.1', port:int = 9100,
+                           registry:MetricsRegistry = REGISTRY):
+    """
+    Startet einen minimalen HTTP-Endpunkt, der jede Anfrage mit den Kennzahlen beantwortet
+    
+    Args:
+        host: Adresse
+        port: Port (0 = beliebiger freier Port)
+        registry: Auszugebende Registry
+    
+    Returns:
+        asyncio.AbstractServer
+    """
+    import asyncio
+    
+    async def handle(reader, writer):
+        # Anfragezeile und Header lesen, der Pfad spielt keine Rolle
+        while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+            pass
+        body = registry.render_prometheus().encode('utf-8')
+        writer.write(b'HTTP/1.1 200 OK\r\n'
+                     + f'Content-Type: {PROMETHEUS_CONTENT_TYPE}\r\n'.encode('ascii')
+                     + f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode('ascii')
+                     + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+    
+    return await asyncio.start_server(handle, host, port)
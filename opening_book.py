@@ -0,0 +1,348 @@
+"""
+Eröffnungsbuch aus Selbstspiel-Partien
+Für die ersten Züge werden viele Partien gegen sich selbst gespielt und je
+kanonischer Stellung (symmetry.canonical_placements) die Ergebnisse aller
+gespielten Züge gezählt. Der beste Zug je Stellung landet in einer
+Hashtabelle mit offener Adressierung, die beim Laden per mmap eingeblendet
+wird; eine Abfrage liest genau einen bis wenige Einträge.
+
+Aufruf:
+    python opening_book.py --games 2000 --plies 6 --workers 4 --output opening_book.bin
+"""
+import argparse
+import hashlib
+import mmap
+import random
+import struct
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from ai import EndgameSearch, GreedySearch, MoveSearch
+from constants import BOARD_SIZE
+from game import Game, Move
+from metrics import GAMES_COMPLETED, REGISTRY, collect_in_worker
+from symmetry import canonical_placements, inverse_symmetry, transform_cell, transform_diamonds
+
+DEFAULT_BOOK_PATH = 'opening_book.bin'
+DEFAULT_PLIES = 6
+
+BOOK_MAGIC = b'CBK1'
+# magic, slot_count, entry_count, board_size, player_count, plies
+BOOK_HEADER = struct.Struct('<4sIIHBB')
+# Schlüssel, Zeile, Spalte, Diamanten (4 Bit je Diamant), Partien, halbe Punkte
+BOOK_ENTRY = struct.Struct('<QBBHII')
+
+
+def position_key(game:Game) -> tuple[int, int]:
+    """
+    Berechnet den 64-Bit-Schlüssel der kanonischen Stellung
+    Besitzer werden relativ zum Spieler am Zug gezählt, das Plättchen auf der
+    Hand gehört zur Stellung.
+    
+    Args:
+        game: Game-Objekt
+    
+    Returns:
+        tuple: (Schlüssel, Symmetrie in die kanonische Form)
+    """
+    manager = game.player_manager
+    current = manager.current_player_index
+    placements = [
+        (row, col, tile.diamonds, (manager.get_player_index(tile.owner) - current) % game.player_count)
+        for row, col, tile in game.board.iter_tiles()
+    ]
+    hand = game.selected_tile.diamonds if game.selected_tile is not None else None
+    (tiles, hand_class), symmetry = canonical_placements(placements, game.board.size, hand)
+    
+    parts = [struct.pack('<HB', game.board.size, game.player_count)]
+    parts.extend(struct.pack('<HHB', cell, _pack(diamonds), owner) for cell, diamonds, owner in tiles)
+    parts.append(struct.pack('<H', _pack(hand_class) if hand_class else 0))
+    digest = hashlib.blake2b(b''.join(parts), digest_size=8).digest()
+    # 0 markiert freie Plätze in der Tabelle
+    return int.from_bytes(digest, 'little') or 1, symmetry
+
+
+def _pack(diamonds) -> int:
+    """Packt 4 Diamanten in 16 Bit"""
+    return diamonds[0] | diamonds[1] << 4 | diamonds[2] << 8 | diamonds[3] << 12
+
+
+def _unpack(packed:int) -> tuple:
+    """Entpackt mit _pack gepackte Diamanten"""
+    return packed & 15, packed >> 4 & 15, packed >> 8 & 15, packed >> 12 & 15
+
+
+def _outcome_points(game:Game) -> list[int]:
+    """Halbe Punkte je Spieler: 2 für den alleinigen Sieger, 1 bei geteiltem Sieg"""
+    scores = [player.score for player in game.player_manager.players]
+    best = max(scores)
+    winners = scores.count(best)
+    return [(2 if winners == 1 else 1) if score == best else 0 for score in scores]
+
+
+def play_games(games:int, plies:int = DEFAULT_PLIES, seed:int | None = None,
+               board_size:int = BOARD_SIZE, player_count:int = 2,
+               exploration:float = 0.3) -> dict:
+    """
+    Spielt Selbstspiel-Partien und zählt die Eröffnungszüge
+    
+    Args:
+        games: Anzahl der Partien
+        plies: Anzahl der Züge je Partie, die gezählt werden
+        seed: Seed für Plättchen und Zugauswahl
+        board_size: Größe des Spielfelds
+        player_count: Anzahl der Spieler
+        exploration: Anteil zufälliger Züge in der Eröffnung
+    
+    Returns:
+        dict: {Schlüssel: {(row, col, Diamanten): [Partien, halbe Punkte]}}
+    """
+    rng = random.Random(seed)
+    search = EndgameSearch(GreedySearch(rng.getrandbits(32)))
+    stats = {}
+    
+    for _ in range(games):
+        # Eigener Generator für Plättchen und Chips der Partie (globales random bleibt unberührt)
+        game = Game(player_count, board_size, rng=random.Random(rng.getrandbits(64)))
+        game.start_game()
+        opening = []  # (Schlüssel, kanonischer Zug, Spielerindex)
+        
+        while not game.game_over:
+            if game.move_number < plies:
+                key, symmetry = position_key(game)
+                if rng.random() < exploration:
+                    row, col = rng.choice(game.valid_positions)
+                    move = Move(row, col, rng.randrange(4))
+                else:
+                    move = search.choose_move(game)
+                player_index = game.player_manager.current_player_index
+                tile = game.selected_tile
+                if move is None or not game.apply_move(move):
+                    break
+                cell = transform_cell(symmetry, board_size, move.row, move.col)
+                opening.append((key, cell + (_pack(transform_diamonds(symmetry, tile.diamonds)),),
+                                player_index))
+            else:
+                move = search.choose_move(game)
+                if move is None or not game.apply_move(move):
+                    break
+        
+        if game.game_over:
+            GAMES_COMPLETED.inc()
+        points = _outcome_points(game)
+        for key, book_move, player_index in opening:
+            entry = stats.setdefault(key, {}).setdefault(book_move, [0, 0])
+            entry[0] += 1
+            entry[1] += points[player_index]
+    return stats
+
+
+def merge_stats(target:dict, other:dict) -> dict:
+    """Addiert die Zählungen zweier play_games-Ergebnisse in target"""
+    for key, moves in other.items():
+        target_moves = target.setdefault(key, {})
+        for book_move, (count, points) in moves.items():
+            entry = target_moves.setdefault(book_move, [0, 0])
+            entry[0] += count
+            entry[1] += points
+    return target
+
+
+def write_book(stats:dict, path:str, board_size:int = BOARD_SIZE, player_count:int = 2,
+               plies:int = DEFAULT_PLIES, min_games:int = 2) -> int:
+    """
+    Schreibt den besten Zug je Stellung als Hashtabelle in eine Datei
+    
+    Args:
+        stats: Zählungen aus play_games/merge_stats
+        path: Zieldatei
+        board_size: Größe des Spielfelds
+        player_count: Anzahl der Spieler
+        plies: Anzahl der Züge, für die das Buch gilt
+        min_games: Mindestanzahl Partien je Zug
+    
+    Returns:
+        int: Anzahl gespeicherter Stellungen
+    """
+    entries = []
+    for key, moves in stats.items():
+        candidates = [(points / count, count, book_move) for book_move, (count, points) in moves.items()
+                      if count >= min_games]
+        if candidates:
+            _, _, book_move = max(candidates)
+            count, points = moves[book_move]
+            entries.append((key, book_move, count, points))
+    
+    # Füllgrad höchstens 1/2, Anzahl der Plätze als Zweierpotenz
+    slot_count = 1
+    while slot_count < 2 * len(entries):
+        slot_count <<= 1
+    table = bytearray(slot_count * BOOK_ENTRY.size)
+    for key, (row, col, diamonds), count, points in entries:
+        slot = key & (slot_count - 1)
+        while int.from_bytes(table[slot * BOOK_ENTRY.size:slot * BOOK_ENTRY.size + 8], 'little'):
+            slot = (slot + 1) & (slot_count - 1)
+        BOOK_ENTRY.pack_into(table, slot * BOOK_ENTRY.size, key, row, col, diamonds, count, points)
+    
+    with open(path, 'wb') as file:
+        file.write(BOOK_HEADER.pack(BOOK_MAGIC, slot_count, len(entries), board_size, player_count, plies))
+        file.write(table)
+    return len(entries)
+
+
+class OpeningBook:
+    """
+    Per mmap eingeblendetes Eröffnungsbuch
+    Lässt sich an Worker-Prozesse übergeben; dort wird die Datei neu geöffnet.
+    """
+    
+    def __init__(self, path:str):
+        """
+        Öffnet ein mit write_book geschriebenes Buch
+        
+        Args:
+            path: Pfad der Datei
+        
+        Raises:
+            ValueError: Wenn die Datei kein Eröffnungsbuch ist
+        """
+        self.path = path
+        self._open()
+    
+    def _open(self) -> None:
+        """Blendet die Datei ein und liest den Kopf"""
+        with open(self.path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.slot_count, self.entry_count, self.board_size, self.player_count, self.plies = \
+            BOOK_HEADER.unpack_from(self._map, 0)
+        if magic != BOOK_MAGIC:
+            self._map.close()
+            raise ValueError("Kein gültiges Eröffnungsbuch")
+    
+    def __getstate__(self):
+        return {'path': self.path}
+    
+    def __setstate__(self, state):
+        self.path = state['path']
+        self._open()
+    
+    def __len__(self):
+        return self.entry_count
+    
+    def close(self) -> None:
+        """Gibt die eingeblendete Datei frei"""
+        self._map.close()
+    
+    def _find(self, key:int):
+        """Sucht einen Schlüssel per linearer Sondierung"""
+        mask = self.slot_count - 1
+        slot = key & mask
+        while True:
+            entry = BOOK_ENTRY.unpack_from(self._map, BOOK_HEADER.size + slot * BOOK_ENTRY.size)
+            if entry[0] == key:
+                return entry
+            if entry[0] == 0:
+                return None
+            slot = (slot + 1) & mask
+    
+    def lookup(self, game:Game) -> Move | None:
+        """
+        Sucht den Buchzug für die aktuelle Stellung
+        Das Buch gilt nur für die Standardregel ohne freie Plättchenwahl.
+        
+        Args:
+            game: Game-Objekt
+        
+        Returns:
+            Move oder None (Stellung nicht im Buch)
+        """
+        if (game.board.size != self.board_size or game.player_count != self.player_count
+                or game.move_number >= self.plies or game.selected_tile is None or not self.slot_count
+                or game.free_choice or not game.rules.is_standard):
+            return None
+        key, symmetry = position_key(game)
+        entry = self._find(key)
+        if entry is None:
+            return None
+        
+        # Zug aus der kanonischen Form zurück in die Stellung abbilden
+        _, row, col, diamonds, _, _ = entry
+        inverse = inverse_symmetry(symmetry)
+        row, col = transform_cell(inverse, self.board_size, row, col)
+        target = transform_diamonds(inverse, _unpack(diamonds))
+        current = tuple(game.selected_tile.diamonds)
+        for rotation in range(4):
+            if current == target:
+                if game.board.can_place_tile(row, col):
+                    # Move zählt Drehungen ab der Ausrichtung bei Auswahl
+                    return Move(row, col, (rotation + game.selected_rotation) % 4, game.selected_slot)
+                return None
+            current = (current[3], current[0], current[1], current[2])
+        return None
+
+
+class OpeningBookSearch(MoveSearch):
+    """
+    Spielt Buchzüge, solange die Stellung im Buch steht, danach eine andere Suche
+    """
+    
+    def __init__(self, book:OpeningBook, fallback:MoveSearch | None = None):
+        """
+        Initialisiert die Suche
+        
+        Args:
+            book: Eröffnungsbuch
+            fallback: Suche außerhalb des Buchs (Standard: EndgameSearch)
+        """
+        self.book = book
+        self.fallback = fallback if fallback is not None else EndgameSearch()
+    
+    def choose_move(self, game:Game, cancel_event:threading.Event | None = None) -> Move | None:
+        """Wählt den Buchzug oder den Zug der Ersatzsuche"""
+        move = self.book.lookup(game)
+        if move is not None:
+            return move
+        return self.fallback.choose_move(game, cancel_event)
+
+
+def build_book(games:int, path:str = DEFAULT_BOOK_PATH, plies:int = DEFAULT_PLIES,
+               workers:int = 1, seed:int | None = None, board_size:int = BOARD_SIZE,
+               player_count:int = 2, min_games:int = 2) -> int:
+    """
+    Spielt Partien (optional auf mehrere Prozesse verteilt) und schreibt das Buch
+    
+    Returns:
+        int: Anzahl gespeicherter Stellungen
+    """
+    rng = random.Random(seed)
+    chunks = [games // workers + (1 if index < games % workers else 0) for index in range(workers)]
+    seeds = [rng.getrandbits(64) for _ in chunks]
+    stats = {}
+    if workers == 1:
+        stats = play_games(games, plies, seeds[0], board_size, player_count)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(collect_in_worker, play_games, count, plies, chunk_seed,
+                                       board_size, player_count)
+                       for count, chunk_seed in zip(chunks, seeds)]
+            for future in futures:
+                chunk_stats, worker_metrics = future.result()
+                merge_stats(stats, chunk_stats)
+                REGISTRY.merge(worker_metrics)
+    return write_book(stats, path, board_size, player_count, plies, min_games)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Eröffnungsbuch aus Selbstspiel erstellen")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--plies', type=int, default=DEFAULT_PLIES)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--players', type=int, default=2)
+    parser.add_argument('--size', type=int, default=BOARD_SIZE)
+    parser.add_argument('--min-games', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default=DEFAULT_BOOK_PATH)
+    args = parser.parse_args()
+    stored = build_book(args.games, args.output, args.plies, args.workers, args.seed,
+                        args.size, args.players, args.min_games)
+    print(f"{stored} Stellungen in {args.output}")
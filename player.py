@@ -1,10 +1,122 @@
 """
 Player-Klasse für Spielerverwaltung
 """
-from point_chip import PointChip
+from constants import PLAYER_COLOR_ORDER
+from rules import STANDARD_RULES, RuleSet
 from tile import Tile
 
 
+class Hand:
+    """
+    Plättchen-Hand mit festen Plätzen (Slots)
+    Jedes Plättchen behält seinen Platz, solange es auf der Hand ist; der
+    Platz dient als Handle. Entfernen und Zurücklegen sind O(1), die
+    Reihenfolge entspricht der Reihenfolge des Austeilens.
+    """
+    
+    def __init__(self):
+        """Initialisiert eine leere Hand"""
+        self.slots = []  # Slot -> Tile oder None
+        self._slot_of = {}  # id(Tile) -> Slot
+        self._count = 0
+        self._first = 0  # Kein belegter Slot vor diesem Index
+    
+    def add(self, tile:Tile) -> int:
+        """
+        Legt ein Plättchen auf einen neuen Platz
+        
+        Args:
+            tile: Tile-Objekt
+        
+        Returns:
+            int: Slot des Plättchens
+        """
+        slot = len(self.slots)
+        self.slots.append(tile)
+        self._slot_of[id(tile)] = slot
+        self._count += 1
+        return slot
+    
+    def remove(self, slot:int) -> Tile:
+        """
+        Nimmt das Plättchen von einem Platz
+        
+        Args:
+            slot: Slot des Plättchens
+        
+        Returns:
+            Tile: Das entfernte Plättchen
+        
+        Raises:
+            KeyError: Wenn der Platz leer ist
+        """
+        tile = self.slots[slot] if 0 <= slot < len(self.slots) else None
+        if tile is None:
+            raise KeyError(f"Platz {slot} ist leer")
+        self.slots[slot] = None
+        del self._slot_of[id(tile)]
+        self._count -= 1
+        return tile
+    
+    def restore(self, slot:int, tile:Tile) -> None:
+        """
+        Legt ein Plättchen auf einen bestimmten (leeren) Platz zurück
+        
+        Args:
+            slot: Slot des Plättchens
+            tile: Tile-Objekt
+        """
+        if slot >= len(self.slots):
+            self.slots.extend([None] * (slot + 1 - len(self.slots)))
+        self.slots[slot] = tile
+        self._slot_of[id(tile)] = slot
+        self._count += 1
+        if slot < self._first:
+            self._first = slot
+    
+    def get(self, slot:int) -> Tile | None:
+        """Gibt das Plättchen auf einem Platz zurück (None = leer)"""
+        return self.slots[slot] if 0 <= slot < len(self.slots) else None
+    
+    def slot_of(self, tile:Tile) -> int | None:
+        """Gibt den Platz eines Plättchens zurück (None = nicht auf der Hand)"""
+        return self._slot_of.get(id(tile))
+    
+    def first_slot(self) -> int | None:
+        """Gibt den ersten belegten Platz zurück (None = Hand leer)"""
+        slots = self.slots
+        while self._first < len(slots) and slots[self._first] is None:
+            self._first += 1
+        return self._first if self._first < len(slots) else None
+    
+    def items(self):
+        """Liefert (Slot, Tile) für alle Plättchen auf der Hand"""
+        for slot in range(self._first, len(self.slots)):
+            tile = self.slots[slot]
+            if tile is not None:
+                yield slot, tile
+    
+    def __iter__(self):
+        for _, tile in self.items():
+            yield tile
+    
+    def __len__(self):
+        return self._count
+    
+    def __bool__(self):
+        return self._count > 0
+    
+    def __getstate__(self):
+        # id()-Schlüssel gelten nur im eigenen Prozess bzw. für die eigenen Objekte
+        return {'slots': self.slots, 'first': self._first}
+    
+    def __setstate__(self, state):
+        self.slots = state['slots']
+        self._first = state['first']
+        self._slot_of = {id(tile): slot for slot, tile in enumerate(self.slots) if tile is not None}
+        self._count = len(self._slot_of)
+
+
 class Player:
     """
     Repräsentiert einen Spieler im Spiel
@@ -23,18 +135,26 @@ class Player:
         self.color = color
         self.is_human = is_human
         self.score = 0
-        self.tiles = []  # Plättchen des Spielers
-        self.collected_chips = []  # Eingesammelte Punktechips
+        self.hand = Hand()  # Plättchen des Spielers
+        self.collected_chips = []  # Eingesammelte Punktechips als (row, col, value)
+    
+    @property
+    def tiles(self) -> list[Tile]:
+        """Plättchen auf der Hand in der Reihenfolge ihrer Plätze"""
+        return list(self.hand)
     
-    def add_tile(self, tile:Tile) -> None:
+    def add_tile(self, tile:Tile) -> int:
         """
         Fügt dem Spieler ein Plättchen hinzu
         
         Args:
             tile: Tile-Objekt
+        
+        Returns:
+            int: Slot des Plättchens in der Hand
         """
         tile.set_owner(self.color)
-        self.tiles.append(tile)
+        return self.hand.add(tile)
     
     def remove_tile(self, tile):
         """
@@ -43,23 +163,62 @@ class Player:
         Args:
             tile: Tile-Objekt
         """
-        if tile in self.tiles:
-            self.tiles.remove(tile)
+        slot = self.hand.slot_of(tile)
+        if slot is not None:
+            self.hand.remove(slot)
+    
+    def restore_tile(self, slot:int, tile:Tile) -> None:
+        """
+        Legt ein Plättchen auf seinen früheren Platz in der Hand zurück
+        
+        Args:
+            slot: Slot des Plättchens
+            tile: Tile-Objekt
+        """
+        self.hand.restore(slot, tile)
     
     def get_tile_count(self):
         """Gibt die Anzahl der Plättchen des Spielers zurück"""
-        return len(self.tiles)
+        return len(self.hand)
     
-    def collect_chip(self, chip:PointChip) -> None:
+    def collect_chip(self, row:int, col:int, value:int) -> None:
         """
-        Sammelt einen Punktechip ein
+        Schreibt einen eingesammelten Punktechip gut
+        Einziger Weg, auf dem sich der Punktestand eines Spielers erhöht.
+        Den Chip auf dem Spielfeld markiert der Aufrufer (Board.collect_chip).
         
         Args:
-            chip: PointChip-Objekt
+            row: Zeile des Chips
+            col: Spalte des Chips
+            value: Punktwert des Chips
         """
-        chip.collect(self.color)
-        self.collected_chips.append(chip)
-        self.score += chip.value
+        self.collected_chips.append((row, col, value))
+        self.score += value
+    
+    def return_last_chip(self) -> tuple[int, int, int]:
+        """
+        Gibt den zuletzt eingesammelten Chip zurück und zieht seine Punkte ab
+        Wird beim Zurücknehmen von Zügen verwendet.
+        
+        Returns:
+            tuple: (row, col, value) des zurückgegebenen Chips
+        """
+        row, col, value = self.collected_chips.pop()
+        self.score -= value
+        return row, col, value
+    
+    def get_collected_chips(self, board) -> list:
+        """
+        Gibt die eingesammelten Chips als Sichten auf das Spielfeld zurück
+        Erzeugt die PointChipView-Objekte erst bei Bedarf (z.B. für die Anzeige).
+        
+        Args:
+            board: Spielfeld der Partie
+        
+        Returns:
+            list: PointChipView-Objekte in Sammelreihenfolge
+        """
+        return [board.get_chip(row, col) for row, col, _ in self.collected_chips]
     
     def get_score(self):
         """Gibt die aktuelle Punktzahl zurück"""
@@ -67,7 +226,7 @@ class Player:
     
     def has_tiles(self):
         """Prüft, ob der Spieler noch Plättchen hat"""
-        return len(self.tiles) > 0
+        return bool(self.hand)
     
     def get_current_tile(self):
         """
@@ -76,12 +235,11 @@ class Player:
         Returns:
             Tile oder None
         """
-        if self.tiles:
-            return self.tiles[0]
-        return None
+        slot = self.hand.first_slot()
+        return self.hand.slots[slot] if slot is not None else None
     
     def __repr__(self):
-        return f"Player(name={self.name}, color={self.color}, score={self.score}, tiles={len(self.tiles)})"
+        return f"Player(name={self.name}, color={self.color}, score={self.score}, tiles={len(self.hand)})"
 
 
 class PlayerManager:
@@ -89,29 +247,66 @@ class PlayerManager:
     Verwaltet mehrere Spieler und deren Reihenfolge
     """
     
-    def __init__(self, player_count:int =2):
+    def __init__(self, player_count:int =2, rules:RuleSet = STANDARD_RULES):
         """
         Initialisiert den PlayerManager
         
         Args:
-            player_count: Anzahl der Spieler (2-4)
+            player_count: Anzahl der Spieler (Standard 2-4, je nach Regelsatz bis 6)
+            rules: Regelsatz (erlaubte Spielerzahlen)
         """
-        if player_count < 2 or player_count > 4:
-            raise ValueError("Spielerzahl muss zwischen 2 und 4 liegen")
+        if player_count < rules.min_players or player_count > rules.max_players:
+            raise ValueError(f"Spielerzahl muss zwischen {rules.min_players} und {rules.max_players} liegen")
         
         self.player_count = player_count
         self.players = []
+        self.color_index = {}  # Spielerfarbe -> Spielerindex
         self.current_player_index = 0
         self._setup_players()
     
     def _setup_players(self):
         """Erstellt die Spieler basierend auf der Spielerzahl"""
-        colors = ['red', 'blue', 'green', 'yellow']
-        names = ['Spieler 1', 'Spieler 2', 'Spieler 3', 'Spieler 4']
-        
         for i in range(self.player_count):
-            player = Player(names[i], colors[i], is_human=True)
+            player = Player(f'Spieler {i + 1}', PLAYER_COLOR_ORDER[i], is_human=True)
             self.players.append(player)
+            self.color_index[player.color] = i
+    
+    def get_player_index(self, color) -> int:
+        """
+        Gibt den Index des Spielers mit der angegebenen Farbe zurück
+        
+        Args:
+            color: Spielerfarbe
+        
+        Returns:
+            int: Spielerindex oder -1
+        """
+        return self.color_index.get(color, -1)
+    
+    def get_player_by_color(self, color):
+        """
+        Gibt den Spieler mit der angegebenen Farbe zurück
+        
+        Args:
+            color: Spielerfarbe
+        
+        Returns:
+            Player oder None
+        """
+        index = self.color_index.get(color)
+        return self.players[index] if index is not None else None
+    
+    def award_chip(self, player_index:int, row:int, col:int, value:int) -> None:
+        """
+        Schreibt einen Punktechip dem Spieler mit dem angegebenen Index gut
+        
+        Args:
+            player_index: Index des Spielers
+            row: Zeile des Chips
+            col: Spalte des Chips
+            value: Punktwert des Chips
+        """
+        self.players[player_index].collect_chip(row, col, value)
     
     def get_current_player(self):
         """Gibt den aktuellen Spieler zurück"""
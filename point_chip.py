@@ -3,8 +3,9 @@ PointChip-Klasse für Punktechips auf dem Spielfeld
 """
 import random
 
-import constants
-from constants import CHIP_VALUES
+from constants import CHIP_VALUES, PLAYER_COLOR_INDEX, PLAYER_COLOR_ORDER
+
+_MASK_64 = (1 << 64) - 1
 
 
 class PointChip:
@@ -60,25 +61,105 @@ class PointChip:
         return chips
     
     @staticmethod
-    def place_chips_on_board(board_size:int = constants.BOARD_SIZE):
+    def generate_chip_values(count:int, distribution=CHIP_VALUES, rng:random.Random | None = None) -> list[int]:
         """
-        Erstellt und platziert Chips auf einem Spielfeld
+        Erzeugt gemischte Chipwerte für eine beliebige Anzahl von Feldern
+        Die Verteilung wird so oft wiederholt wie nötig, damit auch
+        Spielfelder größer als 8x8 vollständig belegt werden
         
         Args:
-            board_size: Größe des Spielfelds (Standard: 7x7)
+            count: Anzahl der benötigten Chipwerte
+            distribution: Chipwerte eines Satzes (Standard: CHIP_VALUES)
+            rng: Zufallsgenerator zum Mischen (None = Modul random)
         
         Returns:
-            dict: Dictionary mit (row, col) als Key und PointChip als Value
+            list: Liste von Chipwerten (1-6)
         """
-        chips = PointChip.create_chip_set()
-        chip_positions = {}
+        repeats = -(-count // len(distribution))
+        values = list(distribution) * repeats
+        (rng or random).shuffle(values)
+        return values[:count]
+    
+    @staticmethod
+    def chip_value_at(seed:int, row:int, col:int, distribution=CHIP_VALUES) -> int:
+        """
+        Leitet den Chipwert eines Feldes deterministisch aus einem Seed ab
+        Wird von dünn besetzten Spielfeldern genutzt, die Chips erst bei
+        Bedarf erzeugen. Die Werte folgen der übergebenen Verteilung.
+        
+        Args:
+            seed: Seed des Spielfelds
+            row: Zeile
+            col: Spalte
+            distribution: Chipwerte eines Satzes (Standard: CHIP_VALUES)
         
-        chip_index = 0
-        for row in range(board_size):
-            for col in range(board_size):
-                if chip_index < len(chips):
-                    chips[chip_index].set_position(row, col)
-                    chip_positions[(row, col)] = chips[chip_index]
-                    chip_index += 1
+        Returns:
+            int: Chipwert (1-6)
+        """
+        h = (seed * 0x9E3779B97F4A7C15 + row * 0xBF58476D1CE4E5B9
+             + col * 0x94D049BB133111EB) & _MASK_64
+        h ^= h >> 31
+        h = (h * 0xBF58476D1CE4E5B9) & _MASK_64
+        h ^= h >> 29
+        return distribution[h % len(distribution)]
+
+
+class PointChipView:
+    """
+    Schlanke Sicht auf einen Punktechip im Chipspeicher eines Spielfelds
+    Bietet die Schnittstelle von PointChip für bestehende Aufrufer, der
+    Zustand selbst liegt in den flachen Arrays des Boards.
+    """
+    __slots__ = ('board', 'position')
+    
+    def __init__(self, board, row:int, col:int):
+        """
+        Initialisiert die Sicht
+        
+        Args:
+            board: Board-Objekt mit Chipspeicher
+            row: Zeile
+            col: Spalte
+        """
+        self.board = board
+        self.position = (row, col)
+    
+    @property
+    def value(self) -> int:
+        """Punktwert des Chips"""
+        return self.board.get_chip_value(*self.position)
+    
+    @property
+    def collected(self) -> bool:
+        """Ob der Chip bereits eingesammelt wurde"""
+        return self.board.is_chip_collected(*self.position)
+    
+    @property
+    def collected_by(self):
+        """Farbe des Spielers, der den Chip eingesammelt hat, oder None"""
+        owner = self.board.get_chip_owner(*self.position)
+        return PLAYER_COLOR_ORDER[owner] if owner >= 0 else None
+    
+    def collect(self, player_color):
+        """
+        Sammelt den Chip für einen Spieler ein
         
-        return chip_positions
+        Args:
+            player_color: Farbe des Spielers
+        """
+        self.board.collect_chip(*self.position, PLAYER_COLOR_INDEX[player_color])
+    
+    def is_collected(self):
+        """Prüft, ob der Chip bereits eingesammelt wurde"""
+        return self.collected
+    
+    def __eq__(self, other):
+        return (isinstance(other, PointChipView) and self.board is other.board
+                and self.position == other.position)
+    
+    def __hash__(self):
+        return hash((id(self.board), self.position))
+    
+    def __repr__(self):
+        status = f"collected by {self.collected_by}" if self.collected else "available"
+        return f"PointChip(value={self.value}, pos={self.position}, {status})"
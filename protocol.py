@@ -0,0 +1,202 @@
+"""
+Netzwerkprotokoll für Carat
+Nachrichten sind kompakte JSON-Objekte, eine pro Zeile. Ein Client erhält
+beim Beitritt einmal den vollständigen Zustand (Keyframe) und danach nur
+noch Deltas: platziertes Plättchen, eingesammelte Chips, Punkteänderungen.
+"""
+import json
+
+from board import SparseBoard
+from game import Game
+from rules import STANDARD_RULES, RuleSet
+
+# Nachrichtentypen
+MSG_CREATE = 'create'
+MSG_CREATED = 'created'
+MSG_JOIN = 'join'
+MSG_WATCH = 'watch'
+MSG_MOVE = 'move'
+MSG_KEYFRAME = 'keyframe'
+MSG_DELTA = 'delta'
+MSG_ERROR = 'error'
+
+
+def encode_message(message:dict) -> bytes:
+    """
+    Kodiert eine Nachricht als JSON-Zeile
+    
+    Args:
+        message: Nachricht als Dictionary
+    
+    Returns:
+        bytes: UTF-8-kodierte Zeile inklusive Zeilenumbruch
+    """
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+
+def decode_message(line:bytes) -> dict:
+    """
+    Dekodiert eine JSON-Zeile
+    
+    Args:
+        line: Empfangene Zeile
+    
+    Returns:
+        dict: Nachricht
+    
+    Raises:
+        ValueError: Wenn die Zeile kein JSON-Objekt enthält
+    """
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("Nachricht muss ein JSON-Objekt sein")
+    return message
+
+
+def game_keyframe(game:Game, table_id:int, seat:int | None = None) -> dict:
+    """
+    Erstellt den vollständigen Zustand eines Tisches
+    
+    Args:
+        game: Game-Objekt
+        table_id: ID des Tisches
+        seat: Sitzplatz des Empfängers; nur dessen Hand wird mitgesendet
+    
+    Returns:
+        dict: Keyframe-Nachricht
+    """
+    board = game.board
+    players = game.player_manager.players
+    message = {
+        'type': MSG_KEYFRAME,
+        'table': table_id,
+        'move': game.move_number,
+        'size': board.size,
+        'tiles': [
+            [row, col, tile.diamonds, game.player_manager.get_player_index(tile.owner)]
+            for row, col, tile in board.iter_tiles()
+        ],
+        'scores': [player.score for player in players],
+        'hand_sizes': [player.get_tile_count() for player in players],
+        'current': game.player_manager.current_player_index,
+        'over': game.game_over,
+        'free_choice': game.free_choice,
+    }
+    if not game.rules.is_standard:
+        message['rules'] = game.rules.to_dict()
+    if isinstance(board, SparseBoard):
+        message['chip_seed'] = board.chip_seed
+        message['collected'] = [[row, col, owner] for (row, col), owner in board.chip_owners.items()]
+    else:
+        message['chips'] = list(board.chip_values)
+        message['collected'] = [
+            [index // board.size, index % board.size, owner]
+            for index, owner in enumerate(board.chip_owner) if owner >= 0
+        ]
+    if seat is not None:
+        message['seat'] = seat
+        # Mit leeren Plätzen (None), damit Slots in Zügen gültig bleiben
+        message['hand'] = [tile.diamonds if tile is not None else None for tile in players[seat].hand.slots]
+    return message
+
+
+def move_delta(game:Game, table_id:int, row:int, col:int, player_index:int) -> dict:
+    """
+    Erstellt das Delta für einen gerade ausgeführten Zug
+    
+    Args:
+        game: Game-Objekt nach dem Zug
+        table_id: ID des Tisches
+        row: Zeile des platzierten Plättchens
+        col: Spalte des platzierten Plättchens
+        player_index: Index des Spielers, der gezogen hat
+    
+    Returns:
+        dict: Delta-Nachricht
+    """
+    tile = game.board.get_tile(row, col)
+    scoring = game.last_scoring or {'chips': []}
+    score_changes = {}
+    for _, _, owner, value in scoring['chips']:
+        score_changes[owner] = score_changes.get(owner, 0) + value
+    
+    message = {
+        'type': MSG_DELTA,
+        'table': table_id,
+        'move': game.move_number,
+        'tile': [row, col, tile.diamonds, player_index],
+        'slot': game.move_history[-1].tile,
+        'chips': [[chip_row, chip_col, owner] for chip_row, chip_col, owner, _ in scoring['chips']],
+        'scores': [[owner, points] for owner, points in score_changes.items()],
+        'current': game.player_manager.current_player_index,
+    }
+    if game.game_over:
+        message['over'] = True
+        message['winner'] = game.winner.color if game.winner else None
+    return message
+
+
+class RemoteTableState:
+    """
+    Client-seitiger Spiegel eines Tisches
+    Wird aus einem Keyframe aufgebaut und danach nur durch Deltas fortgeschrieben.
+    """
+    
+    def __init__(self, keyframe:dict):
+        """
+        Initialisiert den Spiegel aus einem Keyframe
+        
+        Args:
+            keyframe: Keyframe-Nachricht
+        """
+        self.table_id = keyframe['table']
+        self.size = keyframe['size']
+        self.move_number = keyframe['move']
+        self.chip_values = keyframe.get('chips')  # Dichtes Spielfeld
+        self.chip_seed = keyframe.get('chip_seed')  # Dünn besetztes Spielfeld
+        self.tiles = {(row, col): (diamonds, owner) for row, col, diamonds, owner in keyframe['tiles']}
+        self.collected = {(row, col): owner for row, col, owner in keyframe['collected']}
+        self.scores = list(keyframe['scores'])
+        self.hand_sizes = list(keyframe['hand_sizes'])
+        self.current = keyframe['current']
+        self.over = keyframe['over']
+        self.winner = None
+        self.free_choice = keyframe.get('free_choice', False)
+        self.rules = RuleSet.from_dict(keyframe['rules']) if 'rules' in keyframe else STANDARD_RULES
+        self.seat = keyframe.get('seat')
+        # Plätze der eigenen Hand (None = leer)
+        self.hand = [list(diamonds) if diamonds is not None else None for diamonds in keyframe.get('hand', [])]
+    
+    def apply_delta(self, delta:dict) -> None:
+        """
+        Schreibt den Spiegel mit einem Delta fort
+        
+        Args:
+            delta: Delta-Nachricht
+        
+        Raises:
+            ValueError: Wenn das Delta nicht zum nächsten Zug passt
+        """
+        if delta['move'] != self.move_number + 1:
+            raise ValueError(f"Delta für Zug {delta['move']} passt nicht zu Zug {self.move_number}")
+        
+        row, col, diamonds, player_index = delta['tile']
+        self.tiles[(row, col)] = (diamonds, player_index)
+        self.hand_sizes[player_index] -= 1
+        if player_index == self.seat:
+            slot = delta.get('slot', -1)
+            if not 0 <= slot < len(self.hand):
+                slot = next((index for index, diamonds in enumerate(self.hand) if diamonds is not None), -1)
+            if slot >= 0:
+                self.hand[slot] = None
+        
+        for chip_row, chip_col, owner in delta['chips']:
+            self.collected[(chip_row, chip_col)] = owner
+        for owner, points in delta['scores']:
+            self.scores[owner] += points
+        
+        self.current = delta['current']
+        self.move_number = delta['move']
+        if delta.get('over'):
+            self.over = True
+            self.winner = delta.get('winner')
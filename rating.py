@@ -0,0 +1,268 @@
+"""
+Inkrementelle Spielstärke-Bewertung für Turniere und Selbstspiel
+Jede Bot-Konfiguration hat eine Normalverteilung der Spielstärke (mu, sigma).
+Ein Spielergebnis mit beliebig vielen Spielern aktualisiert nur die
+Beteiligten (Weng-Lin, Bradley-Terry mit allen Paaren; eine geschlossene
+Näherung im Stil von TrueSkill). Gleichstände zählen als halber Sieg.
+
+Die Rangliste sortiert nach der vorsichtigen Wertung mu - 3 sigma und wird
+bei jedem Ergebnis per Binärsuche fortgeschrieben, Abfragen lesen nur die
+gewünschten Einträge.
+
+Dateiformat:
+    Kopf (RATING_HEADER), dann je Konfiguration RATING_ENTRY und der Name (UTF-8)
+
+Aufruf:
+    python rating.py ratings.bin [--top 20]
+"""
+import argparse
+import math
+import os
+import struct
+from bisect import bisect_left, insort
+from typing import NamedTuple
+
+from game import Game
+
+DEFAULT_MU = 25.0
+DEFAULT_SIGMA = DEFAULT_MU / 3
+DEFAULT_BETA = DEFAULT_SIGMA / 2  # Streuung einer einzelnen Partie
+DEFAULT_TAU = DEFAULT_SIGMA / 100  # Zusätzliche Unsicherheit je Partie (Formschwankung)
+CONSERVATIVE_FACTOR = 3
+MIN_VARIANCE_FACTOR = 1e-4  # Untergrenze für die Schrumpfung von sigma² je Partie
+
+RATING_MAGIC = b'CRR1'
+# magic, mu, sigma, beta, tau, Anzahl Konfigurationen, Anzahl Partien
+RATING_HEADER = struct.Struct('<4sddddIQ')
+# mu, sigma, Partien, Länge des Namens
+RATING_ENTRY = struct.Struct('<ddIH')
+
+
+class Rating(NamedTuple):
+    """
+    Spielstärke einer Konfiguration
+    """
+    mu: float
+    sigma: float
+    games: int = 0
+    
+    @property
+    def conservative(self) -> float:
+        """Vorsichtige Wertung: mit hoher Wahrscheinlichkeit mindestens so stark"""
+        return self.mu - CONSERVATIVE_FACTOR * self.sigma
+
+
+def ranks_from_scores(scores) -> list[int]:
+    """
+    Wandelt Punktestände in Platzierungen um (0 = bester, gleiche Punkte = gleicher Platz)
+    
+    Args:
+        scores: Punktestände
+    
+    Returns:
+        list: Platz je Spieler
+    """
+    ordered = sorted(scores, reverse=True)
+    return [ordered.index(score) for score in scores]
+
+
+class RatingTable:
+    """
+    Wertungen aller Konfigurationen mit fortlaufend sortierter Rangliste
+    """
+    
+    def __init__(self, mu:float = DEFAULT_MU, sigma:float = DEFAULT_SIGMA,
+                 beta:float = DEFAULT_BETA, tau:float = DEFAULT_TAU):
+        """
+        Initialisiert eine leere Tabelle
+        
+        Args:
+            mu: Anfangswert der Spielstärke
+            sigma: Anfangsunsicherheit
+            beta: Streuung des Ergebnisses einer Partie
+            tau: Zusätzliche Unsicherheit vor jeder Partie (hält lange Läufe beweglich)
+        """
+        self.mu = mu
+        self.sigma = sigma
+        self.beta = beta
+        self.tau = tau
+        self.games = 0
+        self.ratings = {}  # Name -> Rating
+        self._order = []  # Sortiert: (-vorsichtige Wertung, Name)
+    
+    def __len__(self):
+        return len(self.ratings)
+    
+    def __contains__(self, name:str) -> bool:
+        return name in self.ratings
+    
+    def rating(self, name:str) -> Rating:
+        """Gibt die Wertung einer Konfiguration zurück (Anfangswert, falls unbekannt)"""
+        return self.ratings.get(name) or Rating(self.mu, self.sigma)
+    
+    def _store(self, name:str, rating:Rating) -> None:
+        """Setzt eine Wertung und schreibt die Rangliste fort"""
+        old = self.ratings.get(name)
+        if old is not None:
+            del self._order[bisect_left(self._order, (-old.conservative, name))]
+        self.ratings[name] = rating
+        insort(self._order, (-rating.conservative, name))
+    
+    def record(self, names:list[str], ranks:list[int]) -> None:
+        """
+        Verarbeitet das Ergebnis einer Partie
+        
+        Args:
+            names: Konfiguration je Spieler (verschieden)
+            ranks: Platz je Spieler (0 = bester, gleicher Platz = Gleichstand)
+        
+        Raises:
+            ValueError: Bei weniger als zwei Spielern oder doppelten Namen
+        """
+        if len(names) < 2 or len(set(names)) != len(names) or len(ranks) != len(names):
+            raise ValueError("Ein Ergebnis braucht mindestens zwei verschiedene Konfigurationen")
+        
+        ratings = [self.rating(name) for name in names]
+        variances = [rating.sigma ** 2 + self.tau ** 2 for rating in ratings]
+        two_beta_squared = 2 * self.beta ** 2
+        
+        updated = []
+        for i, rating in enumerate(ratings):
+            omega = 0.0
+            delta = 0.0
+            for q, other in enumerate(ratings):
+                if q == i:
+                    continue
+                c = math.sqrt(variances[i] + variances[q] + two_beta_squared)
+                p = 1 / (1 + math.exp((other.mu - rating.mu) / c))  # Erwartete Siegchance
+                outcome = 1.0 if ranks[i] < ranks[q] else 0.5 if ranks[i] == ranks[q] else 0.0
+                omega += variances[i] / c * (outcome - p)
+                delta += math.sqrt(variances[i]) / c * variances[i] / c ** 2 * p * (1 - p)
+            variance = variances[i] * max(1 - delta, MIN_VARIANCE_FACTOR)
+            updated.append(Rating(rating.mu + omega, math.sqrt(variance), rating.games + 1))
+        
+        for name, rating in zip(names, updated):
+            self._store(name, rating)
+        self.games += 1
+    
+    def record_scores(self, names:list[str], scores:list) -> None:
+        """
+        Verarbeitet eine Partie anhand der Endpunktzahlen
+        
+        Args:
+            names: Konfiguration je Spieler
+            scores: Punkte je Spieler
+        """
+        self.record(names, ranks_from_scores(scores))
+    
+    def record_game(self, game:Game, names:list[str]) -> None:
+        """
+        Verarbeitet ein beendetes Spiel
+        Haben mehrere Spieler die höchste Punktzahl (get_winner gibt None),
+        teilen sie sich den ersten Platz.
+        
+        Args:
+            game: Beendetes Game-Objekt
+            names: Konfiguration je Spielerindex
+        """
+        self.record_scores(names, [player.score for player in game.player_manager.players])
+    
+    def consume(self, results) -> int:
+        """
+        Verarbeitet einen Strom von Ergebnissen
+        
+        Args:
+            results: Iterierbar über (Namen, Punkte)
+        
+        Returns:
+            int: Anzahl verarbeiteter Partien
+        """
+        count = 0
+        for names, scores in results:
+            self.record_scores(names, scores)
+            count += 1
+        return count
+    
+    def rank(self, name:str) -> int | None:
+        """
+        Gibt den Ranglistenplatz einer Konfiguration zurück
+        
+        Returns:
+            int: Platz (0 = bester) oder None, wenn unbekannt
+        """
+        rating = self.ratings.get(name)
+        if rating is None:
+            return None
+        return bisect_left(self._order, (-rating.conservative, name))
+    
+    def leaderboard(self, count:int | None = None, start:int = 0) -> list[tuple[str, Rating]]:
+        """
+        Gibt einen Ausschnitt der Rangliste zurück
+        
+        Args:
+            count: Anzahl der Einträge (None = alle ab start)
+            start: Erster Platz
+        
+        Returns:
+            list: (Name, Rating), beste zuerst
+        """
+        stop = None if count is None else start + count
+        return [(name, self.ratings[name]) for _, name in self._order[start:stop]]
+    
+    def to_bytes(self) -> bytes:
+        """Serialisiert die Tabelle"""
+        parts = [RATING_HEADER.pack(RATING_MAGIC, self.mu, self.sigma, self.beta, self.tau,
+                                    len(self.ratings), self.games)]
+        for name, rating in self.ratings.items():
+            encoded = name.encode('utf-8')
+            parts.append(RATING_ENTRY.pack(rating.mu, rating.sigma, rating.games, len(encoded)))
+            parts.append(encoded)
+        return b''.join(parts)
+    
+    @staticmethod
+    def from_bytes(data:bytes) -> 'RatingTable':
+        """
+        Stellt eine mit to_bytes serialisierte Tabelle wieder her
+        
+        Raises:
+            ValueError: Wenn die Daten keine Wertungstabelle enthalten
+        """
+        magic, mu, sigma, beta, tau, count, games = RATING_HEADER.unpack_from(data, 0)
+        if magic != RATING_MAGIC:
+            raise ValueError("Keine gültigen Wertungs-Daten")
+        table = RatingTable(mu, sigma, beta, tau)
+        table.games = games
+        offset = RATING_HEADER.size
+        for _ in range(count):
+            entry_mu, entry_sigma, entry_games, length = RATING_ENTRY.unpack_from(data, offset)
+            offset += RATING_ENTRY.size
+            name = bytes(data[offset:offset + length]).decode('utf-8')
+            offset += length
+            table.ratings[name] = Rating(entry_mu, entry_sigma, entry_games)
+        table._order = sorted((-rating.conservative, name) for name, rating in table.ratings.items())
+        return table
+    
+    def save(self, path:str) -> None:
+        """Speichert die Tabelle atomar, auch während eines laufenden Turniers"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(self.to_bytes())
+        os.replace(temp_path, path)
+    
+    @staticmethod
+    def load(path:str) -> 'RatingTable':
+        """Lädt eine Tabelle aus einer Datei"""
+        with open(path, 'rb') as file:
+            return RatingTable.from_bytes(file.read())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rangliste einer Wertungstabelle anzeigen")
+    parser.add_argument('path')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+    table = RatingTable.load(args.path)
+    print(f"{len(table)} Konfigurationen, {table.games} Partien")
+    for place, (name, rating) in enumerate(table.leaderboard(args.top), 1):
+        print(f"{place:4d}. {name:30s} {rating.conservative:7.2f}  "
+              f"(mu {rating.mu:.2f}, sigma {rating.sigma:.2f}, {rating.games} Partien)")
@@ -1,13 +1,38 @@
 """
 Renderer-Klasse für die grafische Darstellung
+Alle Positionen und Größen kommen aus dem Layout (layout.py). Schriften,
+Texturatlas und abgeleitete Sprites gelten für genau einen Skalierungsfaktor
+und werden nur neu erzeugt, wenn sich dieser ändert.
 """
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import pygame
 
-from board import Board
 from constants import *
-from game import Game
-from point_chip import PointChip
-from tile import Tile
+from layout import Layout
+from theme import DEFAULT_THEME, DIAMOND_CORNERS, THEMES, TextureAtlas, Theme, diamond_offsets
+
+TEXT_CACHE_SIZE = 512  # Höchstzahl zwischengespeicherter Texte, danach wird geleert
+
+if TYPE_CHECKING:
+    # Nur für Typprüfung, damit der Renderer keine Spiellogik lädt
+    from board import Board
+    from game import Game
+    from point_chip import PointChip
+    from tile import Tile
+
+
+def _run_length_encoded(sprite:pygame.Surface) -> pygame.Surface:
+    """
+    Schaltet die Lauflängenkodierung einer Fläche ein (deutlich schnelleres Blitten)
+    Nur für Flächen, die danach nicht mehr verändert werden und nur ganz deckende
+    oder ganz durchsichtige Pixel haben; halbtransparente Pixel (Plättchen,
+    geglättete Schrift) würden leicht anders gemischt.
+    """
+    sprite.set_alpha(255, pygame.RLEACCEL)
+    return sprite
 
 
 class Renderer:
@@ -15,16 +40,175 @@ class Renderer:
     Verwaltet die grafische Darstellung des Spiels
     """
     
-    def __init__(self, screen):
+    def __init__(self, screen, theme:Theme | None = None, layout:Layout | None = None):
         """
         Initialisiert den Renderer
         
         Args:
             screen: PyGame-Screen-Objekt
+            theme: Theme-Objekt (Standard: THEMES[DEFAULT_THEME])
+            layout: Layout-Objekt (Standard: passend zur Größe von screen)
+        """
+        self.screen = screen
+        self.theme = theme or THEMES[DEFAULT_THEME]
+        # Aus dem Atlas abgeleitete Sprites, damit Frames nur noch blitten
+        self._tile_sprites = {}  # (Diamanten, Besitzer) -> Surface
+        self._chip_sprites = {}  # (Wert, Größe in %) -> Surface
+        self._highlight_sprites = {}  # (Breite, Höhe) -> Surface
+        self._fill_sprites = {}  # (Breite, Höhe, Farbe, Alpha) -> Surface
+        self._text_sprites = {}  # (Text, Farbe, Titel) -> Surface
+        self.layout = None
+        self.set_layout(layout or Layout(*screen.get_size()))
+    
+    def set_layout(self, layout:Layout) -> None:
+        """
+        Übernimmt ein neues Layout
+        Schriften, Atlas und Sprites werden nur bei geändertem Skalierungsfaktor
+        neu erzeugt; sonst verschieben sich lediglich die Positionen.
+        
+        Args:
+            layout: Layout-Objekt
+        """
+        rescale = self.layout is None or layout.scale != self.layout.scale
+        self.layout = layout
+        if rescale:
+            self.font = pygame.font.Font(None, layout.font_size)
+            self.title_font = pygame.font.Font(None, layout.title_font_size)
+            self._diamond_offsets = diamond_offsets(layout)
+            self._text_sprites.clear()
+            self.set_theme(self.theme)
+        self._fill_sprites.clear()
+    
+    def resize(self, screen, board_size:int | None = None) -> None:
+        """
+        Passt den Renderer an eine neue Fenstergröße an
+        
+        Args:
+            screen: PyGame-Screen-Objekt (neue Größe)
+            board_size: Größe des Spielfelds (Standard: unverändert)
         """
         self.screen = screen
-        self.font = pygame.font.Font(None, FONT_SIZE)
-        self.title_font = pygame.font.Font(None, TITLE_FONT_SIZE)
+        if board_size is None:
+            board_size = self.layout.board_size
+        self.set_layout(Layout(*screen.get_size(), board_size))
+    
+    def set_theme(self, theme:Theme) -> None:
+        """
+        Wechselt das Thema
+        Neu aufgebaut wird nur der Texturatlas; die daraus abgeleiteten Sprites
+        werden verworfen und beim nächsten Zeichnen wieder zusammengesetzt.
+        
+        Args:
+            theme: Theme-Objekt
+        """
+        self.theme = theme
+        self.atlas = TextureAtlas(theme, self.font, self.layout)
+        self._tile_sprites.clear()
+        self._chip_sprites.clear()
+        self._highlight_sprites.clear()
+        self._fill_sprites.clear()
+        self._text_sprites.clear()
+    
+    def cell_origin(self, row:int, col:int) -> tuple[int, int]:
+        """Gibt die linke obere Ecke eines Felds in Pixeln zurück"""
+        return self.layout.cell_origin(row, col)
+    
+    def player_panel_origin(self, player_index:int) -> tuple[int, int]:
+        """Gibt die linke obere Ecke des Eintrags eines Spielers in der Spielerinfo zurück"""
+        return self.layout.player_panel_origin(player_index)
+    
+    def current_tile_origin(self) -> tuple[int, int]:
+        """Gibt die linke obere Ecke des aktuellen Plättchens in der Vorschau zurück"""
+        return self.layout.current_tile_origin()
+    
+    def text_sprite(self, text:str, color, title:bool = False) -> pygame.Surface:
+        """
+        Gibt einen gerenderten Text zurück (je Text, Farbe und Schrift einmal gerendert)
+        
+        Args:
+            text: Text
+            color: RGB-Farbe
+            title: Titelschrift statt normaler Schrift
+        
+        Returns:
+            pygame.Surface
+        """
+        key = (text, color, title)
+        sprite = self._text_sprites.get(key)
+        if sprite is None:
+            if len(self._text_sprites) >= TEXT_CACHE_SIZE:
+                # Wechselnde Punktestände sollen den Speicher nicht füllen
+                self._text_sprites.clear()
+            font = self.title_font if title else self.font
+            sprite = font.render(text, True, color)
+            self._text_sprites[key] = sprite
+        return sprite
+    
+    def fill_sprite(self, width:int, height:int, color, alpha:int) -> pygame.Surface:
+        """Gibt eine halbtransparente einfarbige Fläche zurück (je Größe und Farbe einmal angelegt)"""
+        key = (width, height, color, alpha)
+        sprite = self._fill_sprites.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((width, height))
+            sprite.set_alpha(alpha)
+            sprite.fill(color)
+            self._fill_sprites[key] = sprite
+        return sprite
+    
+    def tile_sprite(self, tile:Tile) -> pygame.Surface:
+        """
+        Gibt das Bild eines Plättchens zurück
+        Je Ausrichtung und Besitzer wird es einmal aus Hintergrund und vier
+        Diamanten des Atlas zusammengesetzt.
+        
+        Args:
+            tile: Tile-Objekt
+        
+        Returns:
+            pygame.Surface: Plättchengröße des Layouts, mit Transparenz
+        """
+        key = (tuple(tile.diamonds), tile.owner)
+        sprite = self._tile_sprites.get(key)
+        if sprite is None:
+            atlas = self.atlas
+            sprite = atlas.sprite(('face', tile.owner)).copy()
+            for corner, value, offset in zip(DIAMOND_CORNERS, tile.diamonds, self._diamond_offsets):
+                atlas.blit(sprite, ('diamond', value, corner), offset)
+            self._tile_sprites[key] = sprite
+        return sprite
+    
+    def chip_sprite(self, value:int, percent:int = 100) -> pygame.Surface:
+        """
+        Gibt das Bild eines Punktechips zurück
+        
+        Args:
+            value: Chipwert
+            percent: Größe in Prozent (verkleinerte Fassungen werden einmal skaliert)
+        
+        Returns:
+            pygame.Surface: Chip samt Schatten, Mittelpunkt in der Mitte
+        """
+        key = (value, percent)
+        sprite = self._chip_sprites.get(key)
+        if sprite is None:
+            full = self.atlas.sprite(('chip', value))
+            if percent == 100:
+                # Chips sind ganz deckend oder ganz durchsichtig: verlustfrei lauflängenkodiert
+                sprite = _run_length_encoded(full.copy())
+            else:
+                size = max(1, full.get_width() * percent // 100)
+                sprite = pygame.transform.smoothscale(full, (size, size))
+            self._chip_sprites[key] = sprite
+        return sprite
+    
+    def highlight_sprite(self, width:int, height:int) -> pygame.Surface:
+        """Gibt eine einfarbige Fläche zum Hervorheben zurück (je Größe einmal angelegt)"""
+        sprite = self._highlight_sprites.get((width, height))
+        if sprite is None:
+            sprite = pygame.Surface((width, height))
+            sprite.fill(self.theme.highlight)
+            self._highlight_sprites[(width, height)] = sprite
+        return sprite
     
     def draw_board(self, board):
         """
@@ -33,160 +217,68 @@ class Renderer:
         Args:
             board: Board-Objekt
         """
+        cell_size = self.layout.cell_size
         for row in range(board.size):
             for col in range(board.size):
-                x = BOARD_OFFSET_X + col * CELL_SIZE
-                y = BOARD_OFFSET_Y + row * CELL_SIZE
+                x, y = self.cell_origin(row, col)
                 
                 # Zeichne Zelle
-                pygame.draw.rect(self.screen, LIGHT_GRAY, (x, y, CELL_SIZE, CELL_SIZE), 1)
+                pygame.draw.rect(self.screen, self.theme.grid, (x, y, cell_size, cell_size), 1)
                 
                 # Zeichne Punktechip (wenn vorhanden)
-                chip = board.get_chip(row, col)
-                if chip and not chip.is_collected():
-                    self._draw_chip(chip, x + CELL_SIZE // 2, y + CELL_SIZE // 2)
+                value = board.get_chip_value(row, col)
+                if value and not board.is_chip_collected(row, col):
+                    self.draw_chip_value(value, x + cell_size // 2, y + cell_size // 2)
     
-    def draw_tiles(self, board:Board) -> None:
+    def draw_tiles(self, board:Board, hidden=()) -> None:
         """
         Zeichnet alle platzierten Plättchen auf dem Spielfeld
         
         Args:
             board: Board-Objekt
+            hidden: Felder, die ausgelassen werden (z.B. während einer Animation)
         """
-        for row in range(board.size):
-            for col in range(board.size):
-                tile = board.get_tile(row, col)
-                if tile:
-                    x = BOARD_OFFSET_X + col * CELL_SIZE + 2
-                    y = BOARD_OFFSET_Y + row * CELL_SIZE + 2
-                    self._draw_tile(tile, x, y)
+        inset = self.layout.tile_inset
+        for row, col, tile in board.iter_tiles():
+            if (row, col) in hidden:
+                continue
+            x, y = self.cell_origin(row, col)
+            self._draw_tile(tile, x + inset, y + inset)
     
     def _draw_tile(self, tile:Tile, x:int, y:int) -> None:
         """
-        Zeichnet ein einzelnes Plättchen
+        Zeichnet ein einzelnes Plättchen (aus dem Sprite-Zwischenspeicher)
         
         Args:
             tile: Tile-Objekt
             x: X-Position (Pixel)
             y: Y-Position (Pixel)
         """
-        # Hintergrund des Plättchens (Spielerfarbe)
-        if tile.owner:
-            bg_color = PLAYER_COLORS[tile.owner]
-            # Leicht transparent machen
-            s = pygame.Surface((TILE_SIZE, TILE_SIZE))
-            s.set_alpha(100)
-            s.fill(bg_color)
-            self.screen.blit(s, (x, y))
-        
-        # Rahmen
-        pygame.draw.rect(self.screen, BLACK, (x, y, TILE_SIZE, TILE_SIZE), 2)
-        
-        # Zeichne die 4 Diamanten an den Positionen
-        # oben links
-        self._draw_diamond(
-            x + TILE_BORDER_OFFSET,
-            y + TILE_BORDER_OFFSET,
-            tile.get_color('top'),
-            'oben_links'
-        )
-
-        # Oben Rechts
-        self._draw_diamond(
-            x + TILE_SIZE - DIAMOND_RADIUS - TILE_BORDER_OFFSET*2,
-            y + TILE_BORDER_OFFSET,
-            tile.get_color('right'),
-            'oben_rechts'
-        )
-
-        # Unten Rechts
-        self._draw_diamond(
-            x + TILE_SIZE - DIAMOND_RADIUS - TILE_BORDER_OFFSET*2,
-            y + TILE_SIZE // 2,
-            tile.get_color('bottom'),
-            'unten_rechts'
-        )
-
-        # Unten Links
-        self._draw_diamond(
-            x + TILE_BORDER_OFFSET,
-            y + TILE_SIZE // 2,
-            tile.get_color('left'),
-            'unten_links'
-        )
+        self.screen.blit(self.tile_sprite(tile), (x, y))
     
-    def _draw_diamond(self, x:int, y:int, color, direction:str='oben_links'):
+    def _draw_chip(self, chip:PointChip, x:int, y:int) -> None:
         """
-        Zeichnet einen Diamanten (Raute)
+        Zeichnet einen Punktechip
         
         Args:
+            chip: PointChip-Objekt
             x: X-Position (Pixel)
             y: Y-Position (Pixel)
-            color: RGB-Farbe
-        points = [
-            (x, y - DIAMOND_RADIUS),      # Oben
-            (x + DIAMOND_RADIUS, y),      # Rechts
-            (x, y + DIAMOND_RADIUS),      # Unten
-            (x - DIAMOND_RADIUS, y)       # Links
-        ]
         """
-
-        d = DIAMOND_RADIUS / 5
-        if direction == 'oben_links':
-            points = [
-                (x, y-d+DIAMOND_RADIUS),
-                (x, y+DIAMOND_RADIUS),
-                (x+DIAMOND_RADIUS, y+DIAMOND_RADIUS),
-                (x+DIAMOND_RADIUS, y),
-                (x+DIAMOND_RADIUS-d, y)
-            ]
-        elif direction == 'oben_rechts':
-            points = [
-                (x, y),
-                (x+d, y),
-                (x+DIAMOND_RADIUS, y+DIAMOND_RADIUS-d),
-                (x+DIAMOND_RADIUS, y+DIAMOND_RADIUS),
-                (x, y+DIAMOND_RADIUS)
-            ]
-        elif direction == 'unten_rechts':
-            points = [
-                (x, y),
-                (x+DIAMOND_RADIUS, y),
-                (x+DIAMOND_RADIUS, y+d),
-                (x+d, y+DIAMOND_RADIUS),
-                (x, y+DIAMOND_RADIUS)
-            ]
-        elif direction == 'unten_links':
-            points = [
-                (x, y),
-                (x+DIAMOND_RADIUS, y),
-                (x+DIAMOND_RADIUS, y+DIAMOND_RADIUS),
-                (x+DIAMOND_RADIUS-d, y+DIAMOND_RADIUS),
-                (x, y+d)
-            ]
-        else:
-            raise ValueError(f"Invalid direction: {direction}")
-        pygame.draw.polygon(self.screen, color, points)
-        pygame.draw.polygon(self.screen, BLACK, points, 2)
+        self.draw_chip_value(chip.value, x, y)
     
-    def _draw_chip(self, chip:PointChip, x:int, y:int) -> None:
+    def draw_chip_value(self, value:int, x:int, y:int, percent:int = 100) -> None:
         """
-        Zeichnet einen Punktechip
+        Zeichnet einen Punktechip mit gegebenem Wert (aus dem Sprite-Zwischenspeicher)
         
         Args:
-            chip: PointChip-Objekt
-            x: X-Position (Pixel)
-            y: Y-Position (Pixel)
+            value: Chipwert
+            x: X-Position des Mittelpunkts (Pixel)
+            y: Y-Position des Mittelpunkts (Pixel)
+            percent: Größe in Prozent
         """
-        # Kreis
-        pygame.draw.circle(self.screen, BLACK, (x+OFFSET, y+OFFSET), CHIP_RADIUS)
-        pygame.draw.circle(self.screen, DARK_GRAY, (x, y), CHIP_RADIUS)
-        pygame.draw.circle(self.screen, LIGHT_GRAY, (x, y), CHIP_RADIUS, 4)
-        
-        # Wert
-        text = self.font.render(str(chip.value), True, WHITE)
-        text_rect = text.get_rect(center=(x, y))
-        self.screen.blit(text, text_rect)
+        sprite = self.chip_sprite(value, percent)
+        self.screen.blit(sprite, sprite.get_rect(center=(x, y)))
     
     def draw_valid_positions(self, valid_positions):
         """
@@ -195,12 +287,32 @@ class Renderer:
         Args:
             valid_positions: Liste von (row, col) Tupeln
         """
+        cell_size = self.layout.cell_size
+        width = self.layout.line(3)
         for row, col in valid_positions:
-            x = BOARD_OFFSET_X + col * CELL_SIZE
-            y = BOARD_OFFSET_Y + row * CELL_SIZE
+            x, y = self.cell_origin(row, col)
             
             # Grüner Rahmen
-            pygame.draw.rect(self.screen, (0, 255, 0), (x, y, CELL_SIZE, CELL_SIZE), 3)
+            pygame.draw.rect(self.screen, self.theme.valid, (x, y, cell_size, cell_size), width)
+    
+    def draw_hint(self, row:int, col:int, tile:Tile) -> None:
+        """
+        Hebt den vorgeschlagenen Zug hervor (über den gültigen Positionen)
+        
+        Args:
+            row: Zeile des vorgeschlagenen Felds
+            col: Spalte des vorgeschlagenen Felds
+            tile: Plättchen in der vorgeschlagenen Ausrichtung
+        """
+        layout = self.layout
+        x, y = self.cell_origin(row, col)
+        inset = layout.tile_inset
+        
+        # Plättchen halbtransparent in der richtigen Ausrichtung, dazu gelber Rahmen
+        s = self.fill_sprite(layout.tile_size, layout.tile_size, self.theme.tile_back, 120)
+        self.screen.blit(s, (x + inset, y + inset))
+        self._draw_tile(tile, x + inset, y + inset)
+        pygame.draw.rect(self.screen, self.theme.hint, (x, y, layout.cell_size, layout.cell_size), layout.line(5))
     
     def draw_preview_tile(self, tile:Tile, mouse_pos:tuple[int, int]):
         """
@@ -210,19 +322,14 @@ class Renderer:
             tile: Tile-Objekt
             mouse_pos: (x, y) Mausposition
         """
+        tile_size = self.layout.tile_size
         x, y = mouse_pos
-        x -= TILE_SIZE // 2
-        y -= TILE_SIZE // 2
+        x -= tile_size // 2
+        y -= tile_size // 2
         
-        # Semi-transparent
-        s = pygame.Surface((TILE_SIZE, TILE_SIZE))
-        s.set_alpha(150)
-        
-        # Zeichne Plättchen auf Surface
-        if tile.owner:
-            s.fill(PLAYER_COLORS[tile.owner])
-        else:
-            s.fill(WHITE)
+        # Semi-transparent in Spielerfarbe
+        color = self.theme.player_colors[tile.owner] if tile.owner else self.theme.tile_back
+        s = self.fill_sprite(tile_size, tile_size, color, 150)
         
         self.screen.blit(s, (x, y))
         self._draw_tile(tile, x, y)
@@ -234,38 +341,41 @@ class Renderer:
         Args:
             game: Game-Objekt
         """
-        info_x = BOARD_OFFSET_X + BOARD_SIZE * CELL_SIZE + 50
-        info_y = BOARD_OFFSET_Y
+        layout = self.layout
+        px = layout.px
+        info_x, info_y = self.player_panel_origin(0)
         
         # Überschrift
-        title = self.title_font.render("Spieler", True, BLACK)
-        self.screen.blit(title, (info_x, info_y))
-        info_y += 50
+        theme = self.theme
+        title = self.text_sprite("Spieler", theme.text, title=True)
+        self.screen.blit(title, (info_x, info_y - px(50)))
         
         # Spielerinformationen
-        for player in game.player_manager.players:
+        for index, player in enumerate(game.player_manager.players):
+            info_x, info_y = self.player_panel_origin(index)
             is_current = player == game.get_current_player()
             
+            # Hintergrund des Eintrags
+            self.atlas.blit(self.screen, ('panel', is_current), (info_x - px(10), info_y - px(8)))
+            
             # Spielerfarbe
-            pygame.draw.circle(self.screen, PLAYER_COLORS[player.color], 
-                             (info_x + 20, info_y + 15), 15)
+            pygame.draw.circle(self.screen, theme.player_colors[player.color], 
+                             (info_x + px(20), info_y + px(15)), px(15))
             
             # Name und Punktzahl
             text = f"{player.name}: {player.score} Punkte"
             if is_current:
                 text += " ◄"
-                color = (0, 150, 0)
+                color = theme.current_text
             else:
-                color = BLACK
+                color = theme.text
             
-            player_text = self.font.render(text, True, color)
-            self.screen.blit(player_text, (info_x + 45, info_y))
+            player_text = self.text_sprite(text, color)
+            self.screen.blit(player_text, (info_x + px(45), info_y))
             
             # Verbleibende Plättchen
-            tiles_text = self.font.render(f"Plättchen: {player.get_tile_count()}", True, BLACK)
-            self.screen.blit(tiles_text, (info_x + 45, info_y + 25))
-            
-            info_y += 70
+            tiles_text = self.text_sprite(f"Plättchen: {player.get_tile_count()}", theme.text)
+            self.screen.blit(tiles_text, (info_x + px(45), info_y + px(25)))
     
     def draw_current_tile(self, tile:Tile) -> None:
         """
@@ -274,23 +384,26 @@ class Renderer:
         Args:
             tile: Tile-Objekt
         """
-        preview_x = BOARD_OFFSET_X + BOARD_SIZE * CELL_SIZE + 50
-        preview_y = 500
+        layout = self.layout
+        px = layout.px
+        preview_x, preview_y = layout.current_tile_label()
         
         # Überschrift
-        title = self.font.render("Aktuelles Plättchen:", True, BLACK)
+        title = self.text_sprite("Aktuelles Plättchen:", self.theme.text)
         self.screen.blit(title, (preview_x, preview_y))
         
         # Plättchen
-        tile_x = preview_x + 50
-        tile_y = preview_y + 40
+        tile_x, tile_y = self.current_tile_origin()
         self._draw_tile(tile, tile_x, tile_y)
         
         # Hinweis
-        hint = self.font.render("R: Drehen →", True, DARK_GRAY)
-        self.screen.blit(hint, (preview_x, tile_y + TILE_SIZE + 20))
-        hint2 = self.font.render("E: Drehen ←", True, DARK_GRAY)
-        self.screen.blit(hint2, (preview_x, tile_y + TILE_SIZE + 45))
+        below = tile_y + layout.tile_size
+        hint = self.text_sprite("R: Drehen →", self.theme.muted_text)
+        self.screen.blit(hint, (preview_x, below + px(20)))
+        hint2 = self.text_sprite("E: Drehen ←", self.theme.muted_text)
+        self.screen.blit(hint2, (preview_x, below + px(45)))
+        hint3 = self.text_sprite("H: Tipp", self.theme.muted_text)
+        self.screen.blit(hint3, (preview_x, below + px(70)))
     
     def draw_game_over(self, game:Game) -> None:
         """
@@ -299,15 +412,15 @@ class Renderer:
         Args:
             game: Game-Objekt
         """
+        layout = self.layout
+        
         # Semi-transparenter Overlay
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill(BLACK)
+        overlay = self.fill_sprite(layout.width, layout.height, BLACK, 200)
         self.screen.blit(overlay, (0, 0))
         
         # Titel
-        title = self.title_font.render("Spiel beendet!", True, WHITE)
-        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 150))
+        title = self.text_sprite("Spiel beendet!", WHITE, title=True)
+        title_rect = title.get_rect(center=layout.center(150))
         self.screen.blit(title, title_rect)
         
         # Rangliste
@@ -316,15 +429,15 @@ class Renderer:
         
         for i, player in enumerate(leaderboard):
             rank_text = f"{i+1}. {player.name}: {player.score} Punkte"
-            color = PLAYER_COLORS[player.color]
+            color = self.theme.player_colors[player.color]
             
-            text = self.font.render(rank_text, True, color)
-            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, y))
+            text = self.text_sprite(rank_text, color)
+            text_rect = text.get_rect(center=layout.center(y))
             self.screen.blit(text, text_rect)
             
             y += 40
         
         # Neustart-Hinweis
-        hint = self.font.render("Drücke SPACE für ein neues Spiel", True, WHITE)
-        hint_rect = hint.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 100))
+        hint = self.text_sprite("Drücke SPACE für ein neues Spiel", WHITE)
+        hint_rect = hint.get_rect(center=layout.center(layout.base_height - 100))
         self.screen.blit(hint, hint_rect)
@@ -0,0 +1,198 @@
+"""
+Wiederholungen mit periodischen Keyframes für wahlfreien Zugriff
+Eine Wiederholung speichert den Anfangszustand, alle Züge und alle K Züge
+einen kompakten Keyframe. Das Springen zu Zug N stellt den nächstgelegenen
+Keyframe (oder eine zwischengespeicherte Stellung) wieder her und spielt nur
+die restlichen Züge nach.
+"""
+import struct
+from collections import OrderedDict
+
+from game import Game, Move
+from state_codec import decode_game, encode_game
+
+DEFAULT_KEYFRAME_INTERVAL = 8
+DEFAULT_CACHE_SIZE = 32
+
+FILE_MAGIC = b'CRP2'
+# magic, keyframe_interval, move_count, keyframe_count
+FILE_HEADER = struct.Struct('<4sHII')
+MOVE_ENTRY = struct.Struct('<HHBb')  # row, col, rotation, Slot des Plättchens
+# Ältere Wiederholungen ohne Slot (immer das erste Plättchen der Hand)
+LEGACY_FILE_MAGIC = b'CRP1'
+LEGACY_MOVE_ENTRY = struct.Struct('<HHB')
+KEYFRAME_ENTRY = struct.Struct('<II')  # Zugnummer, Länge
+
+
+class Replay:
+    """
+    Aufgezeichnetes Spiel mit Keyframes und LRU-Cache für Sprünge
+    Zurückgegebene Stellungen stammen aus dem Cache und dürfen nicht verändert
+    werden; für Änderungen Game.snapshot() verwenden.
+    """
+    
+    def __init__(self, initial_state:bytes, moves:list[Move],
+                 keyframe_interval:int = DEFAULT_KEYFRAME_INTERVAL,
+                 keyframes:dict | None = None, cache_size:int = DEFAULT_CACHE_SIZE):
+        """
+        Initialisiert die Wiederholung
+        
+        Args:
+            initial_state: Kodierter Anfangszustand (state_codec.encode_game)
+            moves: Liste aller Züge
+            keyframe_interval: Abstand K der Keyframes in Zügen
+            keyframes: Vorhandene Keyframes {Zugnummer: bytes}; None = neu berechnen
+            cache_size: Anzahl zwischengespeicherter Stellungen
+        """
+        if keyframe_interval < 1:
+            raise ValueError("Keyframe-Abstand muss mindestens 1 sein")
+        self.moves = list(moves)
+        self.keyframe_interval = keyframe_interval
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # Zugnummer -> Game
+        if keyframes is None:
+            keyframes = self._build_keyframes(initial_state)
+        self.keyframes = keyframes
+        self.keyframes[0] = initial_state
+    
+    def __len__(self):
+        return len(self.moves)
+    
+    def _build_keyframes(self, initial_state:bytes) -> dict:
+        """Spielt die Züge einmal nach und legt alle K Züge einen Keyframe an"""
+        keyframes = {}
+        game = decode_game(initial_state)
+        game.record_metrics = False  # Nachgespielte Züge nicht erneut zählen
+        for number, move in enumerate(self.moves, start=1):
+            if not game.apply_move(move):
+                raise ValueError(f"Zug {number} ist ungültig: {move}")
+            if number % self.keyframe_interval == 0:
+                keyframes[number] = encode_game(game)
+        return keyframes
+    
+    def seek(self, move_number:int) -> Game:
+        """
+        Gibt die Stellung nach einer bestimmten Anzahl von Zügen zurück
+        
+        Args:
+            move_number: Anzahl gespielter Züge (0 bis len(self))
+        
+        Returns:
+            Game: Stellung (nur lesend verwenden)
+        """
+        if not 0 <= move_number <= len(self.moves):
+            raise IndexError(f"Zug {move_number} liegt außerhalb der Wiederholung")
+        
+        game = self._cache.get(move_number)
+        if game is not None:
+            self._cache.move_to_end(move_number)
+            return game
+        
+        # Nächstgelegener Startpunkt: Keyframe oder zwischengespeicherte Stellung
+        start = move_number - move_number % self.keyframe_interval
+        cached = max((number for number in self._cache if start < number < move_number), default=None)
+        if cached is not None:
+            start = cached
+            game = self._cache[cached].snapshot()
+        else:
+            game = decode_game(self.keyframes[start])
+            game.record_metrics = False  # Nachgespielte Züge nicht erneut zählen
+        
+        for move in self.moves[start:move_number]:
+            game.apply_move(move)
+        
+        self._cache[move_number] = game
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return game
+    
+    def to_bytes(self) -> bytes:
+        """
+        Kodiert die Wiederholung inklusive Keyframes
+        
+        Returns:
+            bytes: Kodierte Wiederholung
+        """
+        numbers = sorted(self.keyframes)
+        parts = [FILE_HEADER.pack(FILE_MAGIC, self.keyframe_interval, len(self.moves), len(numbers))]
+        parts.extend(MOVE_ENTRY.pack(move.row, move.col, move.rotation, move.tile) for move in self.moves)
+        parts.extend(KEYFRAME_ENTRY.pack(number, len(self.keyframes[number])) for number in numbers)
+        parts.extend(self.keyframes[number] for number in numbers)
+        return b''.join(parts)
+    
+    @staticmethod
+    def from_bytes(data:bytes, cache_size:int = DEFAULT_CACHE_SIZE) -> 'Replay':
+        """
+        Stellt eine mit to_bytes kodierte Wiederholung wieder her
+        
+        Args:
+            data: Kodierte Wiederholung
+            cache_size: Anzahl zwischengespeicherter Stellungen
+        
+        Returns:
+            Replay
+        """
+        magic, interval, move_count, keyframe_count = FILE_HEADER.unpack_from(data, 0)
+        if magic not in (FILE_MAGIC, LEGACY_FILE_MAGIC):
+            raise ValueError("Keine gültige Wiederholung")
+        offset = FILE_HEADER.size
+        
+        move_entry = MOVE_ENTRY if magic == FILE_MAGIC else LEGACY_MOVE_ENTRY
+        moves = []
+        for _ in range(move_count):
+            moves.append(Move(*move_entry.unpack_from(data, offset)))
+            offset += move_entry.size
+        
+        entries = []
+        for _ in range(keyframe_count):
+            entries.append(KEYFRAME_ENTRY.unpack_from(data, offset))
+            offset += KEYFRAME_ENTRY.size
+        
+        keyframes = {}
+        for number, length in entries:
+            keyframes[number] = bytes(data[offset:offset + length])
+            offset += length
+        
+        return Replay(keyframes[0], moves, interval, keyframes, cache_size)
+    
+    def save(self, path:str) -> None:
+        """Speichert die Wiederholung in einer Datei"""
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+    
+    @staticmethod
+    def load(path:str, cache_size:int = DEFAULT_CACHE_SIZE) -> 'Replay':
+        """Lädt eine Wiederholung aus einer Datei"""
+        with open(path, 'rb') as file:
+            return Replay.from_bytes(file.read(), cache_size)
+
+
+class ReplayRecorder:
+    """
+    Zeichnet ein laufendes Spiel auf
+    Speichert beim Anlegen den Anfangszustand und liest die Züge später aus
+    Game.move_history.
+    """
+    
+    def __init__(self, game:Game, keyframe_interval:int = DEFAULT_KEYFRAME_INTERVAL):
+        """
+        Beginnt die Aufzeichnung (am besten direkt nach Game.start_game)
+        
+        Args:
+            game: Game-Objekt
+            keyframe_interval: Abstand K der Keyframes in Zügen
+        """
+        self.game = game
+        self.keyframe_interval = keyframe_interval
+        self.initial_state = encode_game(game)
+        self.first_move = len(game.move_history)
+    
+    def replay(self, cache_size:int = DEFAULT_CACHE_SIZE) -> Replay:
+        """
+        Erstellt die Wiederholung der bisher gespielten Züge
+        
+        Returns:
+            Replay
+        """
+        moves = self.game.move_history[self.first_move:]
+        return Replay(self.initial_state, moves, self.keyframe_interval, cache_size=cache_size)
@@ -0,0 +1,147 @@
+"""
+Regelsätze und Regelvarianten
+Ein RuleSet beschreibt, welche Felder als benachbart gelten, wie Linien
+gewertet werden, wie die Punktechips verteilt sind und wie viele Spieler
+mitspielen dürfen. Spielfeld, Wertung und Spielerverwaltung wählen ihre
+Implementierung einmal beim Anlegen (Nachbarversätze, Farbmasken-Funktion,
+Chipwerte); in den heißen Pfaden wird nicht nach Regeln verzweigt.
+
+Ohne PyGame nutzbar.
+"""
+from functools import lru_cache
+from typing import NamedTuple
+
+from constants import CHIP_VALUES, PLAYER_COLOR_ORDER
+
+# Nachbarschaft für das Anlegen von Plättchen
+ADJACENCY_CORNER = 'corner'  # Gemeinsame Ecke (diagonal benachbart)
+ADJACENCY_EDGE = 'edge'  # Gemeinsame Kante (waagrecht oder senkrecht benachbart)
+
+NEIGHBOR_OFFSETS = {
+    ADJACENCY_CORNER: ((-1, -1), (-1, 1), (1, -1), (1, 1)),
+    ADJACENCY_EDGE: ((-1, 0), (0, -1), (0, 1), (1, 0)),
+}
+
+# Wertung vollständiger Linien
+SCORING_DOMINANCE = 'dominance'  # Alle Farben mit der höchsten Anzahl werten
+SCORING_MAJORITY = 'majority'  # Nur eine alleinige Mehrheitsfarbe wertet, Gleichstand wertet nichts
+
+SCORING_RULES = (SCORING_DOMINANCE, SCORING_MAJORITY)
+
+MAX_CHIP_VALUE = max(CHIP_VALUES)
+MAX_PLAYER_COUNT = len(PLAYER_COLOR_ORDER)
+
+# Anzahl Chips je Wert 1 bis MAX_CHIP_VALUE
+STANDARD_CHIP_COUNTS = tuple(CHIP_VALUES.count(value) for value in range(1, MAX_CHIP_VALUE + 1))
+
+
+@lru_cache(maxsize=None)
+def _expand_chip_counts(chip_counts:tuple) -> tuple:
+    """Wandelt Anzahlen je Wert in aufsteigende Chipwerte um (einmal je Verteilung)"""
+    return tuple(value for value, count in enumerate(chip_counts, 1) for _ in range(count))
+
+
+class RuleSet(NamedTuple):
+    """
+    Unveränderlicher Regelsatz eines Spiels
+    """
+    adjacency: str = ADJACENCY_CORNER
+    scoring: str = SCORING_DOMINANCE
+    chip_counts: tuple = STANDARD_CHIP_COUNTS  # Anzahl Chips je Wert 1 bis MAX_CHIP_VALUE
+    min_players: int = 2
+    max_players: int = 4
+    
+    @property
+    def neighbor_offsets(self) -> tuple:
+        """Versätze (d_row, d_col) der Felder, an die angelegt werden darf"""
+        return NEIGHBOR_OFFSETS[self.adjacency]
+    
+    @property
+    def chip_values(self) -> tuple:
+        """Chipwerte in der Verteilung des Regelsatzes, aufsteigend (wie CHIP_VALUES)"""
+        return _expand_chip_counts(self.chip_counts)
+    
+    @property
+    def is_standard(self) -> bool:
+        """Ob der Regelsatz den Standardregeln entspricht"""
+        return self == STANDARD_RULES
+    
+    def validate(self) -> 'RuleSet':
+        """
+        Prüft den Regelsatz
+        
+        Returns:
+            RuleSet: Der Regelsatz selbst (für Verkettung)
+        
+        Raises:
+            ValueError: Bei unbekannten Regeln oder ungültigen Zahlen
+        """
+        if self.adjacency not in NEIGHBOR_OFFSETS:
+            raise ValueError(f"Unbekannte Nachbarschaft '{self.adjacency}'")
+        if self.scoring not in SCORING_RULES:
+            raise ValueError(f"Unbekannte Wertung '{self.scoring}'")
+        if (len(self.chip_counts) != MAX_CHIP_VALUE or min(self.chip_counts) < 0
+                or not sum(self.chip_counts)):
+            raise ValueError(f"Chipverteilung braucht {MAX_CHIP_VALUE} Anzahlen, mindestens ein Chip")
+        if not 2 <= self.min_players <= self.max_players <= MAX_PLAYER_COUNT:
+            raise ValueError(f"Spielerzahlen müssen zwischen 2 und {MAX_PLAYER_COUNT} liegen")
+        return self
+    
+    def to_dict(self) -> dict:
+        """Gibt den Regelsatz als JSON-taugliches Dictionary zurück"""
+        return {'adjacency': self.adjacency, 'scoring': self.scoring, 'chip_counts': list(self.chip_counts),
+                'min_players': self.min_players, 'max_players': self.max_players}
+    
+    @staticmethod
+    def from_dict(data:dict) -> 'RuleSet':
+        """
+        Erstellt einen Regelsatz aus einem Dictionary (fehlende Einträge = Standard)
+        
+        Raises:
+            ValueError: Bei unbekannten Einträgen oder ungültigen Regeln
+        """
+        unknown = set(data) - set(RuleSet._fields)
+        if unknown:
+            raise ValueError(f"Unbekannte Regeln: {', '.join(sorted(unknown))}")
+        values = dict(data)
+        if 'chip_counts' in values:
+            values['chip_counts'] = tuple(values['chip_counts'])
+        return RuleSet(**values).validate()
+
+
+STANDARD_RULES = RuleSet()
+
+# Benannte Varianten für Tests, Turniere und den Server
+RULE_SETS = {
+    'standard': STANDARD_RULES,
+    'kanten': RuleSet(adjacency=ADJACENCY_EDGE),
+    'mehrheit': RuleSet(scoring=SCORING_MAJORITY),
+    'hohe_chips': RuleSet(chip_counts=(4, 6, 8, 12, 16, 18)),
+    'grosse_runde': RuleSet(min_players=2, max_players=MAX_PLAYER_COUNT),
+}
+
+
+def parse_rules(value) -> RuleSet:
+    """
+    Liest einen Regelsatz aus einem Namen aus RULE_SETS oder einem Dictionary
+    
+    Args:
+        value: None (Standardregeln), Name oder Dictionary (siehe RuleSet.to_dict)
+    
+    Returns:
+        RuleSet
+    
+    Raises:
+        ValueError: Bei unbekannten Namen oder ungültigen Regeln
+    """
+    if value is None:
+        return STANDARD_RULES
+    if isinstance(value, RuleSet):
+        return value.validate()
+    if isinstance(value, str):
+        if value not in RULE_SETS:
+            raise ValueError(f"Unbekannter Regelsatz '{value}'")
+        return RULE_SETS[value]
+    if isinstance(value, dict):
+        return RuleSet.from_dict(value)
+    raise ValueError("Regelsatz muss ein Name oder ein Dictionary sein")
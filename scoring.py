@@ -1,6 +1,102 @@
 """
 Wertungssystem für Carat
 """
+from functools import lru_cache
+
+from constants import DIAMOND_COLORS
+from rules import SCORING_DOMINANCE, SCORING_MAJORITY, STANDARD_RULES, RuleSet
+from tile import BOTTOM, LEFT, RIGHT, TOP
+
+# Ein Feld trägt zu einer Linie genau ein Diamantenpaar bei (oben/unten bzw.
+# links/rechts). Bei 4 Farben gibt es 16 Paarzustände je Feld.
+COLOR_COUNT = len(DIAMOND_COLORS)
+PAIR_STATES = COLOR_COUNT * COLOR_COUNT
+PAIR_BITS = (PAIR_STATES - 1).bit_length()
+
+# Farbmaske je Paarzustand: Bit (Farbe - 1) ist gesetzt, wenn die Farbe vorkommt
+PAIR_COLOR_MASK = tuple(
+    (1 << (state // COLOR_COUNT)) | (1 << (state % COLOR_COUNT))
+    for state in range(PAIR_STATES)
+)
+
+# Obergrenze für gespeicherte Liniensignaturen (große Spielfelder)
+LINE_CACHE_SIZE = 1 << 16
+
+
+def pair_state(first:int, second:int) -> int:
+    """
+    Packt ein Diamantenpaar in einen Paarzustand (0 bis PAIR_STATES - 1)
+    
+    Args:
+        first: Diamantwert oben bzw. links
+        second: Diamantwert unten bzw. rechts
+    
+    Returns:
+        int: Paarzustand
+    """
+    return (first - 1) * COLOR_COUNT + (second - 1)
+
+
+def _color_counts(signature:int, length:int) -> list[int]:
+    """Zählt die Diamanten je Farbe in einer Liniensignatur"""
+    counts = [0] * COLOR_COUNT
+    state_mask = (1 << PAIR_BITS) - 1
+    for _ in range(length):
+        state = signature & state_mask
+        counts[state // COLOR_COUNT] += 1
+        counts[state % COLOR_COUNT] += 1
+        signature >>= PAIR_BITS
+    return counts
+
+
+@lru_cache(maxsize=LINE_CACHE_SIZE)
+def dominant_color_mask(signature:int, length:int) -> int:
+    """
+    Ermittelt die dominanten Farben einer Linie aus ihrer Signatur
+    Die Signatur enthält die Paarzustände aller Felder, je PAIR_BITS Bits.
+    Ergebnisse werden begrenzt zwischengespeichert.
+    
+    Args:
+        signature: Gepackte Liniensignatur
+        length: Anzahl der Felder in der Signatur
+    
+    Returns:
+        int: Farbmaske, Bit (Farbe - 1) gesetzt für jede dominante Farbe
+    """
+    counts = _color_counts(signature, length)
+    max_count = max(counts)
+    mask = 0
+    for color, count in enumerate(counts):
+        if count == max_count:
+            mask |= 1 << color
+    return mask
+
+
+@lru_cache(maxsize=LINE_CACHE_SIZE)
+def majority_color_mask(signature:int, length:int) -> int:
+    """
+    Ermittelt die alleinige Mehrheitsfarbe einer Linie (Variante ohne Gleichstand)
+    Teilen sich mehrere Farben die höchste Anzahl, wertet keine Farbe.
+    
+    Args:
+        signature: Gepackte Liniensignatur
+        length: Anzahl der Felder in der Signatur
+    
+    Returns:
+        int: Farbmaske mit höchstens einem gesetzten Bit (0 = keine Wertung)
+    """
+    counts = _color_counts(signature, length)
+    max_count = max(counts)
+    if counts.count(max_count) > 1:
+        return 0
+    return 1 << counts.index(max_count)
+
+
+# Farbmasken-Funktion je Wertungsregel
+LINE_MASKS = {
+    SCORING_DOMINANCE: dominant_color_mask,
+    SCORING_MAJORITY: majority_color_mask,
+}
 
 
 class ScoringSystem:
@@ -8,16 +104,19 @@ class ScoringSystem:
     Verwaltet die Punkteberechnung bei vollständigen Reihen/Spalten
     """
     
-    def __init__(self, board, player_manager):
+    def __init__(self, board, player_manager, rules:RuleSet = STANDARD_RULES):
         """
         Initialisiert das Wertungssystem
         
         Args:
             board: Board-Objekt
             player_manager: PlayerManager-Objekt
+            rules: Regelsatz (Wertung vollständiger Linien)
         """
         self.board = board
         self.player_manager = player_manager
+        self.collected = []  # Eingesammelte Chips der letzten Wertung
+        self.line_mask = LINE_MASKS[rules.scoring]  # Einmal gewählt, keine Verzweigung je Linie
     
     def check_and_score_lines(self):
         """
@@ -25,12 +124,14 @@ class ScoringSystem:
         
         Returns:
             dict: Informationen über die Wertung
-                  {'scored': bool, 'rows': [], 'cols': [], 'points': {player_color: points}}
+                  {'scored': bool, 'rows': [], 'cols': [], 'points': {player_color: points},
+                   'chips': [(row, col, player_index, value)]}
         """
         completed = self.board.get_completed_lines()
+        self.collected = []
         
         if not completed['rows'] and not completed['cols']:
-            return {'scored': False, 'rows': [], 'cols': [], 'points': {}}
+            return {'scored': False, 'rows': [], 'cols': [], 'points': {}, 'chips': []}
         
         points_awarded = {}
         
@@ -46,21 +147,19 @@ class ScoringSystem:
             for player_color, points in col_points.items():
                 points_awarded[player_color] = points_awarded.get(player_color, 0) + points
         
-        # Vergebe Punkte an Spieler
-        for player in self.player_manager.players:
-            if player.color in points_awarded:
-                player.score += points_awarded[player.color]
-        
+        # Punkte wurden bereits beim Einsammeln der Chips gutgeschrieben
         return {
             'scored': True,
             'rows': completed['rows'],
             'cols': completed['cols'],
-            'points': points_awarded
+            'points': points_awarded,
+            'chips': self.collected
         }
     
     def _score_row(self, row):
         """
         Berechnet Punkte für eine vollständige Zeile
+        Zur Zeile tragen die Diamanten oben und unten jedes Plättchens bei.
         
         Args:
             row: Zeilen-Index
@@ -68,53 +167,21 @@ class ScoringSystem:
         Returns:
             dict: {player_color: points}
         """
-        color_counts = {}
-        
-        # Zähle Diamanten jeder Farbe in der Zeile
+        cells = []
+        signature = 0
         for col in range(self.board.size):
             tile = self.board.get_tile(row, col)
             if tile:
-                # Zähle die Diamanten die zur Zeile beitragen (oben und unten)
-                top_value = tile.get_diamond('top')
-                bottom_value = tile.get_diamond('bottom')
-                
-                color_counts[top_value] = color_counts.get(top_value, 0) + 1
-                color_counts[bottom_value] = color_counts.get(bottom_value, 0) + 1
-        
-        # Ermittle die dominante Farbe (höchste Anzahl)
-        if not color_counts:
-            return {}
-        
-        max_count = max(color_counts.values())
-        dominant_colors = [color for color, count in color_counts.items() if count == max_count]
+                state = pair_state(tile.diamonds[TOP], tile.diamonds[BOTTOM])
+                signature = signature << PAIR_BITS | state
+                cells.append((row, col, tile, state))
         
-        # Bei Gleichstand: alle beteiligten Spieler bekommen Punkte
-        points = {}
-        for col in range(self.board.size):
-            tile = self.board.get_tile(row, col)
-            if tile and tile.owner:
-                # Prüfe ob dieser Tile zur dominanten Farbe beiträgt
-                top_value = tile.get_diamond('top')
-                bottom_value = tile.get_diamond('bottom')
-                
-                if top_value in dominant_colors or bottom_value in dominant_colors:
-                    # Sammle Chip ein wenn vorhanden und nicht bereits gesammelt
-                    chip = self.board.get_chip(row, col)
-                    if chip and not chip.is_collected():
-                        if tile.owner not in points:
-                            points[tile.owner] = 0
-                        points[tile.owner] += chip.value
-                        
-                        # Markiere Chip als gesammelt
-                        player = self._get_player_by_color(tile.owner)
-                        if player:
-                            player.collect_chip(chip)
-        
-        return points
+        return self._collect_line(cells, signature)
     
     def _score_column(self, col):
         """
         Berechnet Punkte für eine vollständige Spalte
+        Zur Spalte tragen die Diamanten links und rechts jedes Plättchens bei.
         
         Args:
             col: Spalten-Index
@@ -122,44 +189,52 @@ class ScoringSystem:
         Returns:
             dict: {player_color: points}
         """
-        color_counts = {}
-        
-        # Zähle Diamanten jeder Farbe in der Spalte
+        cells = []
+        signature = 0
         for row in range(self.board.size):
             tile = self.board.get_tile(row, col)
             if tile:
-                # Zähle die Diamanten die zur Spalte beitragen (links und rechts)
-                left_value = tile.get_diamond('left')
-                right_value = tile.get_diamond('right')
-                
-                color_counts[left_value] = color_counts.get(left_value, 0) + 1
-                color_counts[right_value] = color_counts.get(right_value, 0) + 1
-        
-        # Ermittle die dominante Farbe
-        if not color_counts:
+                state = pair_state(tile.diamonds[LEFT], tile.diamonds[RIGHT])
+                signature = signature << PAIR_BITS | state
+                cells.append((row, col, tile, state))
+        
+        return self._collect_line(cells, signature)
+    
+    def _collect_line(self, cells, signature):
+        """
+        Sammelt die Chips einer Linie für alle Plättchen ein, die zur
+        dominanten Farbe beitragen. Welche Farben bei Gleichstand zählen,
+        legt die Farbmasken-Funktion des Regelsatzes fest (Standard: alle).
+        
+        Args:
+            cells: Liste von (row, col, Tile, Paarzustand) der Linie
+            signature: Gepackte Liniensignatur aus den Paarzuständen
+        
+        Returns:
+            dict: {player_color: points}
+        """
+        if not cells:
             return {}
         
-        max_count = max(color_counts.values())
-        dominant_colors = [color for color, count in color_counts.items() if count == max_count]
+        dominant_mask = self.line_mask(signature, len(cells))
+        if not dominant_mask:
+            return {}
         
-        # Vergebe Punkte
+        color_index = self.player_manager.color_index
         points = {}
-        for row in range(self.board.size):
-            tile = self.board.get_tile(row, col)
-            if tile and tile.owner:
-                left_value = tile.get_diamond('left')
-                right_value = tile.get_diamond('right')
-                
-                if left_value in dominant_colors or right_value in dominant_colors:
-                    chip = self.board.get_chip(row, col)
-                    if chip and not chip.is_collected():
-                        if tile.owner not in points:
-                            points[tile.owner] = 0
-                        points[tile.owner] += chip.value
-                        
-                        player = self._get_player_by_color(tile.owner)
-                        if player:
-                            player.collect_chip(chip)
+        for row, col, tile, state in cells:
+            if tile.owner and PAIR_COLOR_MASK[state] & dominant_mask:
+                # Sammle Chip ein wenn vorhanden und nicht bereits gesammelt
+                value = self.board.get_chip_value(row, col)
+                if value and not self.board.is_chip_collected(row, col):
+                    points[tile.owner] = points.get(tile.owner, 0) + value
+                    
+                    # Markiere Chip als gesammelt und schreibe Punkte gut
+                    player_index = color_index.get(tile.owner)
+                    if player_index is not None:
+                        self.board.collect_chip(row, col, player_index)
+                        self.player_manager.award_chip(player_index, row, col, value)
+                        self.collected.append((row, col, player_index, value))
         
         return points
     
@@ -173,7 +248,4 @@ class ScoringSystem:
         Returns:
             Player oder None
         """
-        for player in self.player_manager.players:
-            if player.color == color:
-                return player
-        return None
+        return self.player_manager.get_player_by_color(color)
@@ -0,0 +1,431 @@
+"""
+Asyncio-Server für Netzwerk-Mehrspieler
+Ein Prozess verwaltet beliebig viele Tische auf einer Event-Loop. Jeder Tisch
+besitzt die maßgebliche Game-Instanz; Clients senden nur Züge und erhalten
+Deltas statt des vollständigen Spielfelds. Läuft der Sendepuffer eines
+Spielers voll, erhält er wie ein Zuschauer keine Deltas mehr, sondern nach dem
+Leeren einen frischen Keyframe seines Sitzplatzes.
+
+Aufruf:
+    python server.py --host 127.0.0.1 --port 8765 [--metrics-port 9100] [--metrics-file carat.prom]
+"""
+import argparse
+import asyncio
+
+from constants import BOARD_SIZE
+from game import Game, Move
+from metrics import DEFAULT_FLUSH_INTERVAL, GAMES_COMPLETED, MetricsFileWriter, serve_prometheus
+from rules import STANDARD_RULES, RuleSet, parse_rules
+from protocol import (MSG_CREATE, MSG_CREATED, MSG_DELTA, MSG_ERROR, MSG_JOIN, MSG_KEYFRAME,
+                      MSG_MOVE, MSG_WATCH, RemoteTableState, decode_message, encode_message,
+                      game_keyframe, move_delta)
+from spectator import HIGH_WATER, LOW_WATER, SpectatorChannel
+
+DEFAULT_MAX_BOARD_SIZE = 32  # Größtes Spielfeld, das ein Client anlegen darf
+
+
+def _require_int(value, name:str, low:int, high:int) -> int:
+    """
+    Prüft eine ganze Zahl aus einer Client-Nachricht
+    
+    Raises:
+        ValueError: Wenn der Wert keine ganze Zahl ist oder außerhalb von low..high liegt
+    """
+    if not isinstance(value, int) or isinstance(value, bool) or not low <= value <= high:
+        raise ValueError(f"{name} muss eine ganze Zahl von {low} bis {high} sein")
+    return value
+
+
+class Table:
+    """
+    Ein Spieltisch mit maßgeblichem Spielzustand und verbundenen Clients
+    """
+    
+    def __init__(self, table_id:int, player_count:int = 2, board_size:int = BOARD_SIZE,
+                 free_choice:bool = False, rules:RuleSet = STANDARD_RULES):
+        """
+        Initialisiert den Tisch und startet das Spiel
+        
+        Args:
+            table_id: ID des Tisches
+            player_count: Anzahl der Spieler (2-4, je nach Regelsatz mehr)
+            board_size: Größe des Spielfelds
+            free_choice: Freie Wahl des Plättchens aus der Hand
+            rules: Regelsatz des Spiels
+        """
+        self.table_id = table_id
+        self.game = Game(player_count, board_size, free_choice=free_choice, rules=rules)
+        self.game.start_game()
+        self.writers = set()  # Verbundene Clients (StreamWriter)
+        self.seats = {}  # Sitzplatz -> StreamWriter des Clients, der ihn belegt
+        self.lagging = set()  # Clients, die auf einen Keyframe warten (Sendepuffer voll)
+        self.resyncs = 0  # Anzahl gesendeter Resync-Keyframes an Spieler
+        self.spectators = SpectatorChannel(self)
+    
+    def take_seat(self, seat:int, writer) -> None:
+        """
+        Setzt einen Client auf einen Sitzplatz
+        
+        Args:
+            seat: Sitzplatz
+            writer: StreamWriter des Clients
+        
+        Raises:
+            ValueError: Wenn der Sitzplatz ungültig oder von einem anderen Client belegt ist
+        """
+        _require_int(seat, "Sitzplatz", 0, self.game.player_count - 1)
+        holder = self.seats.get(seat)
+        if holder is not None and holder is not writer:
+            raise ValueError(f"Sitzplatz {seat} ist bereits belegt")
+        self.seats[seat] = writer
+        self.writers.add(writer)
+    
+    def leave(self, seat:int, writer) -> None:
+        """Gibt den Sitzplatz eines Clients frei (nur, wenn er ihn noch belegt)"""
+        if self.seats.get(seat) is writer:
+            del self.seats[seat]
+        if writer not in self.seats.values():
+            self.writers.discard(writer)
+            self.lagging.discard(writer)
+    
+    def play(self, seat:int, move:Move) -> dict:
+        """
+        Führt einen Zug für einen Sitzplatz aus
+        
+        Args:
+            seat: Sitzplatz des ziehenden Clients
+            move: Move-Objekt
+        
+        Returns:
+            dict: Delta-Nachricht
+        
+        Raises:
+            ValueError: Wenn der Zug nicht erlaubt ist
+        """
+        game = self.game
+        if game.game_over:
+            raise ValueError("Spiel ist bereits beendet")
+        if seat != game.player_manager.current_player_index:
+            raise ValueError("Spieler ist nicht am Zug")
+        if not game.apply_move(move):
+            raise ValueError("Ungültiger Zug")
+        return move_delta(game, self.table_id, move.row, move.col, seat)
+    
+    def broadcast(self, data:bytes) -> None:
+        """
+        Sendet bereits kodierte Daten an alle Spieler und Zuschauer des Tisches
+        Spieler, deren Sendepuffer über HIGH_WATER liegt, erhalten wie Zuschauer
+        keine Deltas mehr, sondern unter LOW_WATER einen Keyframe (catch_up).
+        
+        Args:
+            data: Kodierte Nachricht
+        """
+        for writer in self.writers:
+            if writer.is_closing():
+                continue
+            if writer in self.lagging:
+                self.catch_up(writer)
+            elif writer.transport.get_write_buffer_size() > HIGH_WATER:
+                # Zu langsam: Deltas verwerfen statt unbegrenzt zu puffern
+                self.lagging.add(writer)
+            else:
+                writer.write(data)
+        self.spectators.publish(data)
+    
+    def catch_up(self, writer, force:bool = False) -> None:
+        """
+        Sendet einem zurückgefallenen Spieler den Keyframe seines Sitzplatzes,
+        sobald sein Sendepuffer weitgehend geleert ist
+        
+        Args:
+            writer: StreamWriter des Clients
+            force: Keyframe unabhängig vom Füllstand senden (z.B. zum Spielende)
+        """
+        if writer not in self.lagging:
+            return
+        if not force and writer.transport.get_write_buffer_size() > LOW_WATER:
+            return
+        for seat, holder in self.seats.items():
+            if holder is writer:
+                writer.write(encode_message(game_keyframe(self.game, self.table_id, seat)))
+                self.lagging.discard(writer)
+                self.resyncs += 1
+                return
+
+
+class CaratServer:
+    """
+    Verwaltet alle Tische und Client-Verbindungen eines Prozesses
+    """
+    
+    def __init__(self, max_board_size:int = DEFAULT_MAX_BOARD_SIZE):
+        """
+        Initialisiert den Server ohne Tische
+        
+        Args:
+            max_board_size: Größtes Spielfeld, das ein Tisch haben darf
+        """
+        self.tables = {}
+        self.max_board_size = max_board_size
+        self._next_table_id = 1
+    
+    def create_table(self, player_count:int = 2, board_size:int = BOARD_SIZE,
+                     free_choice:bool = False, rules:RuleSet = STANDARD_RULES) -> Table:
+        """
+        Erstellt einen neuen Tisch
+        
+        Args:
+            player_count: Anzahl der Spieler (2-4, je nach Regelsatz mehr)
+            board_size: Größe des Spielfelds
+            free_choice: Freie Wahl des Plättchens aus der Hand
+            rules: Regelsatz des Spiels
+        
+        Returns:
+            Table: Der neue Tisch
+        
+        Raises:
+            ValueError: Bei ungültiger Spielerzahl oder Spielfeldgröße
+        """
+        _require_int(board_size, "Spielfeldgröße", 1, self.max_board_size)
+        _require_int(player_count, "Spielerzahl", rules.min_players, rules.max_players)
+        table = Table(self._next_table_id, player_count, board_size, free_choice, rules)
+        self.tables[table.table_id] = table
+        self._next_table_id += 1
+        return table
+    
+    async def serve(self, host:str = '127.0.0.1', port:int = 8765) -> asyncio.AbstractServer:
+        """
+        Startet den TCP-Server
+        
+        Args:
+            host: Adresse
+            port: Port (0 = beliebiger freier Port)
+        
+        Returns:
+            asyncio.AbstractServer
+        """
+        return await asyncio.start_server(self.handle_connection, host, port)
+    
+    async def handle_connection(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter):
+        """
+        Bearbeitet eine Client-Verbindung bis zu ihrem Ende
+        Eine Verbindung kann an mehreren Tischen sitzen.
+        
+        Args:
+            reader: StreamReader der Verbindung
+            writer: StreamWriter der Verbindung
+        """
+        seats = {}  # table_id -> Sitzplatz dieser Verbindung
+        watching = set()  # table_ids, an denen die Verbindung zuschaut
+        try:
+            while line := await reader.readline():
+                try:
+                    reply = self.handle_message(decode_message(line), writer, seats, watching)
+                except (ValueError, KeyError, TypeError) as error:
+                    reply = {'type': MSG_ERROR, 'message': str(error)}
+                if reply is not None:
+                    writer.write(encode_message(reply))
+                await writer.drain()
+                # Nach dem Leeren des Puffers verpasste Deltas per Keyframe nachholen
+                for table_id in seats:
+                    table = self.tables.get(table_id)
+                    if table is not None and writer in table.lagging:
+                        table.catch_up(writer)
+        except ConnectionError:
+            pass
+        finally:
+            for table_id, seat in seats.items():
+                table = self.tables.get(table_id)
+                if table is not None:
+                    table.leave(seat, writer)
+            for table_id in watching:
+                table = self.tables.get(table_id)
+                if table is not None:
+                    table.spectators.unsubscribe(writer)
+            writer.close()
+    
+    def handle_message(self, message:dict, writer, seats:dict, watching:set) -> dict | None:
+        """
+        Verarbeitet eine einzelne Client-Nachricht
+        
+        Args:
+            message: Dekodierte Nachricht
+            writer: StreamWriter des Absenders
+            seats: Sitzplätze des Absenders (table_id -> Sitzplatz)
+            watching: Tische, an denen der Absender zuschaut
+        
+        Returns:
+            dict: Antwort an den Absender oder None
+        
+        Raises:
+            ValueError: Bei ungültigen Nachrichten oder Zügen
+        """
+        kind = message['type']
+        
+        if kind == MSG_CREATE:
+            table = self.create_table(message.get('players', 2), message.get('size', BOARD_SIZE),
+                                      bool(message.get('free_choice', False)), parse_rules(message.get('rules')))
+            return {'type': MSG_CREATED, 'table': table.table_id}
+        
+        table = self.tables.get(message['table'])
+        if table is None:
+            raise ValueError(f"Unbekannter Tisch {message['table']}")
+        
+        if kind == MSG_JOIN:
+            seat = message['seat']
+            table.take_seat(seat, writer)
+            previous = seats.get(table.table_id)
+            if previous is not None and previous != seat:
+                table.leave(previous, writer)
+            seats[table.table_id] = seat
+            return game_keyframe(table.game, table.table_id, seat)
+        
+        if kind == MSG_WATCH:
+            # Der Kanal sendet den Keyframe selbst
+            watching.add(table.table_id)
+            table.spectators.subscribe(writer)
+            return None
+        
+        if kind == MSG_MOVE:
+            if table.table_id not in seats:
+                raise ValueError("Client sitzt nicht an diesem Tisch")
+            move = Move(message['row'], message['col'], message.get('rotation', 0), message.get('tile', -1))
+            delta = table.play(seats[table.table_id], move)
+            # Einmal kodieren, an alle Clients des Tisches senden
+            table.broadcast(encode_message(delta))
+            if table.game.game_over:
+                # Zurückgefallene Spieler erhalten den Endstand, bevor der Tisch verschwindet
+                for lagging in list(table.lagging):
+                    table.catch_up(lagging, force=True)
+                GAMES_COMPLETED.inc()
+                del self.tables[table.table_id]
+            return None
+        
+        raise ValueError(f"Unbekannter Nachrichtentyp {kind}")
+
+
+class LocalClient:
+    """
+    Einfacher Client, z.B. für Tests und Lastmessungen gegen einen lokalen Server
+    Hält für jeden Tisch einen RemoteTableState, der nur aus Deltas fortgeschrieben wird.
+    """
+    
+    def __init__(self):
+        """Initialisiert den Client ohne Verbindung"""
+        self.reader = None
+        self.writer = None
+        self.tables = {}  # table_id -> RemoteTableState
+    
+    async def connect(self, host:str = '127.0.0.1', port:int = 8765) -> None:
+        """Verbindet den Client mit einem Server"""
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+    
+    async def close(self) -> None:
+        """Schließt die Verbindung"""
+        self.writer.close()
+        await self.writer.wait_closed()
+    
+    async def send(self, message:dict) -> None:
+        """Sendet eine Nachricht an den Server"""
+        self.writer.write(encode_message(message))
+        await self.writer.drain()
+    
+    async def receive(self) -> dict:
+        """
+        Empfängt die nächste Nachricht und aktualisiert den Tisch-Spiegel
+        
+        Returns:
+            dict: Empfangene Nachricht
+        
+        Raises:
+            ConnectionError: Wenn der Server die Verbindung geschlossen hat
+        """
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Verbindung vom Server geschlossen")
+        message = decode_message(line)
+        if message['type'] == MSG_KEYFRAME:
+            self.tables[message['table']] = RemoteTableState(message)
+        elif message['type'] == MSG_DELTA:
+            self.tables[message['table']].apply_delta(message)
+        return message
+    
+    async def create_table(self, player_count:int = 2, rules:str | dict | None = None) -> int:
+        """
+        Erstellt einen Tisch auf dem Server
+        
+        Args:
+            player_count: Anzahl der Spieler
+            rules: Name eines Regelsatzes aus RULE_SETS oder RuleSet.to_dict() (None = Standard)
+        
+        Returns:
+            int: ID des Tisches
+        """
+        message = {'type': MSG_CREATE, 'players': player_count}
+        if rules is not None:
+            message['rules'] = rules
+        await self.send(message)
+        reply = await self.receive()
+        return reply['table']
+    
+    async def join(self, table_id:int, seat:int) -> RemoteTableState:
+        """
+        Setzt den Client an einen Tisch
+        
+        Returns:
+            RemoteTableState: Spiegel des Tisches
+        """
+        await self.send({'type': MSG_JOIN, 'table': table_id, 'seat': seat})
+        await self.receive()
+        return self.tables[table_id]
+    
+    async def watch(self, table_id:int) -> RemoteTableState:
+        """
+        Meldet den Client als Zuschauer eines Tisches an
+        
+        Returns:
+            RemoteTableState: Spiegel des Tisches
+        """
+        await self.send({'type': MSG_WATCH, 'table': table_id})
+        await self.receive()
+        return self.tables[table_id]
+    
+    async def move(self, table_id:int, row:int, col:int, rotation:int = 0, tile:int = -1) -> None:
+        """Sendet einen Zug an den Server (tile: Slot des Plättchens, -1 = ausgewähltes)"""
+        await self.send({'type': MSG_MOVE, 'table': table_id, 'row': row, 'col': col,
+                         'rotation': rotation, 'tile': tile})
+
+
+async def _main(host:str, port:int, metrics_port:int | None = None,
+                metrics_file:str | None = None, metrics_interval:float = DEFAULT_FLUSH_INTERVAL,
+                max_board_size:int = DEFAULT_MAX_BOARD_SIZE) -> None:
+    """Startet den Server (optional mit Kennzahlen-Ausgabe) und läuft bis zum Abbruch"""
+    server = await CaratServer(max_board_size).serve(host, port)
+    if metrics_port is not None:
+        await serve_prometheus(host, metrics_port)
+    writer = None
+    if metrics_file is not None:
+        writer = MetricsFileWriter(metrics_file, metrics_interval)
+        writer.start()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if writer is not None:
+            writer.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carat Netzwerk-Server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="Port für Kennzahlen im Prometheus-Format")
+    parser.add_argument('--metrics-file', default=None,
+                        help="Datei, in die die Kennzahlen periodisch geschrieben werden")
+    parser.add_argument('--metrics-interval', type=float, default=DEFAULT_FLUSH_INTERVAL)
+    parser.add_argument('--max-board-size', type=int, default=DEFAULT_MAX_BOARD_SIZE,
+                        help="Größtes Spielfeld, das Clients anlegen dürfen")
+    args = parser.parse_args()
+    asyncio.run(_main(args.host, args.port, args.metrics_port, args.metrics_file,
+                      args.metrics_interval, args.max_board_size))
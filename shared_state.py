@@ -0,0 +1,597 @@
+"""
+Flache Spielstände im gemeinsamen Speicher für Analysen mit mehreren Prozessen
+Ein SharedStateBatch legt viele Stellungen gleicher Größe in einem Block
+multiprocessing.shared_memory ab. Jede Stellung ist ein Datensatz fester
+Länge im Format von state_codec (dichtes Spielfeld, feste Handgröße).
+Worker öffnen den Block über seinen Namen und lesen die Stellungen über
+BoardView und StateView direkt aus dem Speicher; gepickelt wird nur der Name.
+Wer Züge ausprobieren will, stellt mit StateView.to_game() ein eigenes Game her.
+
+Aufbau des Blocks:
+    Kopf (BATCH_HEADER)
+    capacity Plätze zu je record_size Bytes samt Platz für einen Regelsatz (encode_game),
+    jeweils gefolgt von 4 Diamanten je Feld (BoardView.cell_diamonds ohne Kopie)
+
+multiprocessing.shared_memory und concurrent.futures werden erst beim Anlegen
+bzw. Öffnen eines Blocks geladen, damit der Import in Workern billig bleibt.
+"""
+import struct
+
+from ai import MoveSearch
+from board import BoardCells, SparseBoard
+from constants import PLAYER_COLOR_ORDER
+from game import Game, Move
+from metrics import REGISTRY, collect_in_worker
+from point_chip import PointChipView
+from rules import STANDARD_RULES, RuleSet
+from state_codec import (FLAG_FREE_CHOICE, FLAG_GAME_OVER, FLAG_SPARSE, HEADER, MAGIC, PLAYER_ENTRY, RULES_ENTRY,
+                         STATE_NAMES, decode_game, decode_rules, encode_game, unpack_diamonds)
+from tile import Tile
+
+# Untere und obere Hälfte jedes Bytes der gepackten Diamanten (pack_diamonds)
+_LOW_NIBBLES = bytes(value & 15 for value in range(256))
+_HIGH_NIBBLES = bytes(value >> 4 for value in range(256))
+
+BATCH_MAGIC = b'CRS1'
+
+# magic, board_size, player_count, hand_capacity, capacity, count
+BATCH_HEADER = struct.Struct('<4sHBBII')
+
+
+def record_size(board_size:int, player_count:int, hand_capacity:int, with_rules:bool = False) -> int:
+    """
+    Gibt die Länge eines kodierten Spielstands mit dichtem Spielfeld zurück
+    
+    Args:
+        board_size: Größe des Spielfelds
+        player_count: Anzahl der Spieler
+        hand_capacity: Plätze je Hand
+        with_rules: Ob der Spielstand einen Regelsatz enthält (abweichend vom Standard)
+    
+    Returns:
+        int: Länge in Bytes
+    """
+    cells = board_size * board_size
+    rules_size = RULES_ENTRY.size if with_rules else 0
+    return HEADER.size + rules_size + 5 * cells + player_count * (PLAYER_ENTRY.size + 2 * hand_capacity)
+
+
+class BoardView:
+    """
+    Nur lesende Sicht auf das Spielfeld eines kodierten Spielstands
+    Bietet die lesende Schnittstelle von Board (Plättchen, Chips, Linien,
+    gültige Felder) sowie die flachen Puffer cell_owners, chip_values und
+    chip_owner, ohne den Spielstand zu kopieren. Plättchen werden bei
+    get_tile/iter_tiles erst bei Bedarf als Tile erzeugt.
+    """
+    
+    def __init__(self, data:memoryview, board_size:int, placed_tiles_count:int,
+                 rules:RuleSet = STANDARD_RULES, offset:int = HEADER.size, diamonds:memoryview | None = None):
+        """
+        Initialisiert die Sicht
+        
+        Args:
+            data: Datensatz des Spielstands (Bytes, z.B. aus dem gemeinsamen Speicher)
+            board_size: Größe des Spielfelds
+            placed_tiles_count: Anzahl platzierter Plättchen
+            rules: Regelsatz des Spielstands (Nachbarschaft für gültige Felder)
+            offset: Beginn des Spielfelds im Datensatz (hinter Kopf und Regelsatz)
+            diamonds: 4 Diamanten je Feld, z.B. aus einem Platz des SharedStateBatch
+                      (None = bei Bedarf aus den gepackten Diamanten entpacken)
+        """
+        cells = board_size * board_size
+        self.size = board_size
+        self.placed_tiles_count = placed_tiles_count
+        self.rules = rules
+        self.neighbor_offsets = rules.neighbor_offsets
+        # Ebenen wie in state_codec: Plättchen (H), Besitzer (b), Chipwerte (B), Chipbesitzer (b)
+        self._packed = data[offset:offset + 2 * cells]
+        self.cell_owners = data[offset + 2 * cells:offset + 3 * cells].cast('b')
+        self.chip_values = data[offset + 3 * cells:offset + 4 * cells]
+        self.chip_owner = data[offset + 4 * cells:offset + 5 * cells].cast('b')
+        self._diamonds = diamonds
+        self._lines = None
+        self._frontier = None
+    
+    def release(self) -> None:
+        """Gibt die Puffer frei, damit der gemeinsame Speicher geschlossen werden kann"""
+        for buffer in (self._packed, self.cell_owners, self.chip_values, self.chip_owner):
+            buffer.release()
+        if self._diamonds is not None:
+            self._diamonds.release()
+    
+    def _packed_at(self, index:int) -> int:
+        """Gibt die gepackten Diamanten eines Felds zurück (0 = leer)"""
+        packed = self._packed
+        return packed[2 * index] | packed[2 * index + 1] << 8
+    
+    @property
+    def cell_diamonds(self) -> memoryview | bytes:
+        """
+        4 Diamanten je Feld (0 = leer) wie Board.cell_diamonds
+        Aus einem SharedStateBatch ein Ausschnitt des gemeinsamen Speichers,
+        sonst aus den gepackten Diamanten entpackt (ohne Schleife je Feld).
+        """
+        if self._diamonds is not None:
+            return self._diamonds
+        # Gepackt als Little-Endian 'H': Byte 0 = oben | rechts << 4, Byte 1 = unten | links << 4
+        packed = bytes(self._packed)
+        diamonds = bytearray(2 * len(packed))
+        diamonds[0::2] = packed.translate(_LOW_NIBBLES)
+        diamonds[1::2] = packed.translate(_HIGH_NIBBLES)
+        return bytes(diamonds)
+    
+    def is_valid_position(self, row, col):
+        """Prüft, ob eine Position auf dem Spielfeld gültig ist"""
+        return 0 <= row < self.size and 0 <= col < self.size
+    
+    def is_empty(self, row, col):
+        """Prüft, ob eine Position leer ist"""
+        return self.is_valid_position(row, col) and not self._packed_at(row * self.size + col)
+    
+    def get_tile(self, row:int, col:int) -> Tile | None:
+        """
+        Gibt das Plättchen an einer Position zurück
+        Das Tile ist eine Kopie; Änderungen wirken nicht auf den Spielstand.
+        
+        Args:
+            row: Zeile
+            col: Spalte
+        
+        Returns:
+            Tile oder None
+        """
+        if not self.is_valid_position(row, col):
+            return None
+        index = row * self.size + col
+        value = self._packed_at(index)
+        if not value:
+            return None
+        tile = Tile(unpack_diamonds(value))
+        tile.set_owner(PLAYER_COLOR_ORDER[self.cell_owners[index]])
+        tile.set_position(row, col)
+        return tile
+    
+    def iter_tiles(self):
+        """
+        Liefert alle platzierten Plättchen
+        
+        Yields:
+            tuple: (row, col, Tile)
+        """
+        for index in range(self.size * self.size):
+            if self._packed_at(index):
+                row, col = divmod(index, self.size)
+                yield row, col, self.get_tile(row, col)
+    
+    def get_chip(self, row:int, col:int) -> PointChipView | None:
+        """Gibt eine Sicht auf den Punktechip an einer Position zurück"""
+        if self.get_chip_value(row, col):
+            return PointChipView(self, row, col)
+        return None
+    
+    def get_chip_value(self, row:int, col:int) -> int:
+        """Gibt den Wert des Punktechips an einer Position zurück (0 = kein Chip)"""
+        if self.is_valid_position(row, col):
+            return self.chip_values[row * self.size + col]
+        return 0
+    
+    def is_chip_collected(self, row:int, col:int) -> bool:
+        """Prüft, ob der Chip an einer Position bereits eingesammelt wurde"""
+        return self.chip_owner[row * self.size + col] >= 0
+    
+    def get_chip_owner(self, row:int, col:int) -> int:
+        """Gibt den Spielerindex zurück, der den Chip eingesammelt hat (-1 = niemand)"""
+        return self.chip_owner[row * self.size + col]
+    
+    def _line_counts(self) -> tuple[list, list]:
+        """Zählt Plättchen je Zeile und Spalte (einmal pro Sicht)"""
+        if self._lines is None:
+            rows = [0] * self.size
+            cols = [0] * self.size
+            for index in range(self.size * self.size):
+                if self._packed_at(index):
+                    rows[index // self.size] += 1
+                    cols[index % self.size] += 1
+            self._lines = rows, cols
+        return self._lines
+    
+    @property
+    def row_counts(self) -> list:
+        """Plättchen je Zeile"""
+        return self._line_counts()[0]
+    
+    @property
+    def col_counts(self) -> list:
+        """Plättchen je Spalte"""
+        return self._line_counts()[1]
+    
+    @property
+    def completed_rows(self) -> list:
+        """Vollständige Zeilen (aufsteigend)"""
+        return [row for row, count in enumerate(self.row_counts) if count == self.size]
+    
+    @property
+    def completed_cols(self) -> list:
+        """Vollständige Spalten (aufsteigend)"""
+        return [col for col, count in enumerate(self.col_counts) if count == self.size]
+    
+    def is_row_complete(self, row:int) -> bool:
+        """Prüft, ob eine Zeile vollständig mit Plättchen gefüllt ist"""
+        return self.row_counts[row] == self.size
+    
+    def is_column_complete(self, col:int) -> bool:
+        """Prüft, ob eine Spalte vollständig mit Plättchen gefüllt ist"""
+        return self.col_counts[col] == self.size
+    
+    def get_completed_lines(self):
+        """
+        Gibt alle vollständigen Zeilen und Spalten zurück
+        
+        Returns:
+            dict: {'rows': [row_indices], 'cols': [col_indices]}
+        """
+        return {'rows': self.completed_rows, 'cols': self.completed_cols}
+    
+    @property
+    def frontier(self) -> set:
+        """Leere Felder, die an ein Plättchen angrenzen"""
+        if self._frontier is None:
+            frontier = set()
+            for row, col, _ in self.iter_tiles():
+                for d_row, d_col in self.neighbor_offsets:
+                    if self.is_empty(row + d_row, col + d_col):
+                        frontier.add((row + d_row, col + d_col))
+            self._frontier = frontier
+        return self._frontier
+    
+    def can_place_tile(self, row, col):
+        """Prüft, ob ein Plättchen an dieser Position platziert werden kann"""
+        if self.placed_tiles_count == 0:
+            return self.is_empty(row, col)
+        return (row, col) in self.frontier
+    
+    def get_valid_placements(self):
+        """
+        Gibt alle gültigen Positionen zurück
+        
+        Returns:
+            Sequence: (row, col) Tupel (BoardCells vor dem ersten Plättchen)
+        """
+        if self.placed_tiles_count == 0:
+            return BoardCells(self.size)
+        return sorted(self.frontier)
+    
+    def has_valid_placement(self) -> bool:
+        """Prüft, ob noch eine gültige Position existiert"""
+        if self.placed_tiles_count == 0:
+            return self.size > 0
+        return bool(self.frontier)
+    
+    def __repr__(self):
+        return f"BoardView(size={self.size}, placed_tiles={self.placed_tiles_count})"
+
+
+class StateView:
+    """
+    Nur lesende Sicht auf einen kodierten Spielstand
+    """
+    
+    def __init__(self, data:memoryview, diamonds:memoryview | None = None):
+        """
+        Initialisiert die Sicht
+        
+        Args:
+            data: Datensatz des Spielstands (encode_game mit dichtem Spielfeld)
+            diamonds: Ungepackte Diamanten des Spielfelds (siehe BoardView)
+        
+        Raises:
+            ValueError: Wenn die Daten keinen Spielstand enthalten
+            TypeError: Für dünn besetzte Spielfelder
+        """
+        (magic, flags, size, player_count, current, state, hand_capacity, selected,
+         move_number, tile_count, _, _) = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("Keine gültigen Spielstand-Daten")
+        if flags & FLAG_SPARSE:
+            raise TypeError("Sichten unterstützen nur dichte Spielfelder")
+        self.data = data
+        self.player_count = player_count
+        self.current_player_index = current
+        self.state = STATE_NAMES[state]
+        self.move_number = move_number
+        self.game_over = bool(flags & FLAG_GAME_OVER)
+        self.free_choice = bool(flags & FLAG_FREE_CHOICE)
+        self.rules, offset = decode_rules(data, flags)
+        self.hand_capacity = hand_capacity
+        self.selected_slot = selected
+        self.board = BoardView(data, size, tile_count, self.rules, offset, diamonds)
+        self._players_offset = offset + 5 * size * size
+    
+    def _player_offset(self, player_index:int) -> int:
+        """Gibt den Offset des Spielereintrags zurück"""
+        if not 0 <= player_index < self.player_count:
+            raise IndexError(f"Ungültiger Spielerindex {player_index}")
+        return self._players_offset + player_index * (PLAYER_ENTRY.size + 2 * self.hand_capacity)
+    
+    def score(self, player_index:int) -> int:
+        """Gibt den Punktestand eines Spielers zurück"""
+        return PLAYER_ENTRY.unpack_from(self.data, self._player_offset(player_index))[0]
+    
+    @property
+    def scores(self) -> list[int]:
+        """Punktestände aller Spieler"""
+        return [self.score(index) for index in range(self.player_count)]
+    
+    def hand(self, player_index:int) -> list:
+        """
+        Gibt die Hand eines Spielers mit ihren Plätzen zurück
+        
+        Args:
+            player_index: Index des Spielers
+        
+        Returns:
+            list: Diamanten je Platz oder None für leere Plätze
+        """
+        offset = self._player_offset(player_index)
+        slot_count = PLAYER_ENTRY.unpack_from(self.data, offset)[1]
+        offset += PLAYER_ENTRY.size
+        hand = []
+        for slot in range(slot_count):
+            value = self.data[offset + 2 * slot] | self.data[offset + 2 * slot + 1] << 8
+            hand.append(unpack_diamonds(value) if value else None)
+        return hand
+    
+    def hand_size(self, player_index:int) -> int:
+        """Gibt die Anzahl der Plättchen auf der Hand eines Spielers zurück"""
+        return sum(diamonds is not None for diamonds in self.hand(player_index))
+    
+    def to_game(self) -> Game:
+        """
+        Stellt ein eigenständiges Game her, z.B. um Züge auszuprobieren
+        
+        Returns:
+            Game: Spiel mit diesem Spielstand
+        """
+        return decode_game(self.data)
+    
+    def release(self) -> None:
+        """Gibt die Puffer frei, damit der gemeinsame Speicher geschlossen werden kann"""
+        self.board.release()
+        self.data.release()
+    
+    def __repr__(self):
+        return (f"StateView(move={self.move_number}, current={self.current_player_index}, "
+                f"scores={self.scores})")
+
+
+class SharedStateBatch:
+    """
+    Stellungen gleicher Größe in einem Block gemeinsamen Speichers
+    Der erzeugende Prozess schreibt die Stellungen mit add, Worker öffnen den
+    Block mit attach (oder bekommen das Objekt übergeben, gepickelt wird nur
+    der Name) und lesen sie über view. Der Erzeuger gibt den Block mit
+    close und unlink frei, sobald alle Worker fertig sind.
+    """
+    
+    def __init__(self, memory, owner:bool):
+        """
+        Initialisiert den Stapel auf einem vorhandenen Block
+        
+        Args:
+            memory: multiprocessing.shared_memory.SharedMemory mit Kopf (BATCH_HEADER)
+            owner: Ob dieser Prozess den Block erzeugt hat
+        
+        Raises:
+            ValueError: Wenn der Block keinen Stapel enthält
+        """
+        magic, board_size, player_count, hand_capacity, capacity, _ = BATCH_HEADER.unpack_from(memory.buf, 0)
+        if magic != BATCH_MAGIC:
+            raise ValueError("Keine gültigen Stapel-Daten")
+        self.memory = memory
+        self.owner = owner
+        self.board_size = board_size
+        self.player_count = player_count
+        self.hand_capacity = hand_capacity
+        self.capacity = capacity
+        # Jeder Platz bietet Raum für einen Regelsatz, damit Varianten in denselben Stapel passen
+        self.record_size = record_size(board_size, player_count, hand_capacity, with_rules=True)
+        self.slot_size = self.record_size + 4 * board_size * board_size  # Datensatz und ungepackte Diamanten
+    
+    @classmethod
+    def create(cls, board_size:int, player_count:int, capacity:int, hand_capacity:int,
+               name:str | None = None) -> 'SharedStateBatch':
+        """
+        Legt einen leeren Stapel in neuem gemeinsamem Speicher an
+        
+        Args:
+            board_size: Größe des Spielfelds
+            player_count: Anzahl der Spieler
+            capacity: Höchstzahl der Stellungen
+            hand_capacity: Plätze je Hand
+            name: Name des Blocks (None = zufällig)
+        
+        Returns:
+            SharedStateBatch
+        """
+        from multiprocessing import shared_memory
+        slot_size = record_size(board_size, player_count, hand_capacity, with_rules=True) + 4 * board_size * board_size
+        size = BATCH_HEADER.size + capacity * slot_size
+        memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        BATCH_HEADER.pack_into(memory.buf, 0, BATCH_MAGIC, board_size, player_count,
+                               hand_capacity, capacity, 0)
+        return cls(memory, owner=True)
+    
+    @classmethod
+    def from_games(cls, games:list[Game]) -> 'SharedStateBatch':
+        """
+        Legt einen Stapel an und schreibt alle Stellungen hinein
+        
+        Args:
+            games: Liste von Game-Objekten gleicher Brettgröße und Spielerzahl
+        
+        Returns:
+            SharedStateBatch
+        """
+        first = games[0]
+        hand_capacity = max(len(player.hand.slots) for game in games for player in game.player_manager.players)
+        batch = cls.create(first.board.size, first.player_count, len(games), hand_capacity)
+        for game in games:
+            batch.add(game)
+        return batch
+    
+    @classmethod
+    def attach(cls, name:str) -> 'SharedStateBatch':
+        """
+        Öffnet einen vorhandenen Stapel über seinen Namen
+        
+        Args:
+            name: Name des Blocks
+        
+        Returns:
+            SharedStateBatch
+        """
+        from multiprocessing import shared_memory
+        try:
+            # Ab Python 3.13: der Block gehört dem Erzeuger, nicht diesem Prozess
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            memory = shared_memory.SharedMemory(name=name)
+        return cls(memory, owner=False)
+    
+    @property
+    def name(self) -> str:
+        """Name des gemeinsamen Speichers"""
+        return self.memory.name
+    
+    def __len__(self):
+        return BATCH_HEADER.unpack_from(self.memory.buf, 0)[5]
+    
+    def __reduce__(self):
+        # Nur der Name wird übertragen, der Empfänger öffnet den Block selbst
+        return SharedStateBatch.attach, (self.name,)
+    
+    def add(self, game:Game) -> int:
+        """
+        Kodiert eine Stellung in den Stapel
+        
+        Args:
+            game: Game-Objekt (dichtes Spielfeld passender Größe)
+        
+        Returns:
+            int: Index der Stellung
+        
+        Raises:
+            TypeError: Für dünn besetzte Spielfelder
+            ValueError: Wenn Größe, Spielerzahl oder Handgröße nicht passen
+            IndexError: Wenn der Stapel voll ist
+        """
+        if isinstance(game.board, SparseBoard):
+            raise TypeError("Gemeinsame Spielstände unterstützen nur dichte Spielfelder")
+        if game.board.size != self.board_size or game.player_count != self.player_count:
+            raise ValueError("Spielfeldgröße oder Spielerzahl passt nicht zum Stapel")
+        index = len(self)
+        if index >= self.capacity:
+            raise IndexError("SharedStateBatch ist voll")
+        
+        record = encode_game(game, self.hand_capacity)
+        offset = BATCH_HEADER.size + index * self.slot_size
+        self.memory.buf[offset:offset + len(record)] = record
+        diamonds = offset + self.record_size
+        self.memory.buf[diamonds:offset + self.slot_size] = game.board.cell_diamonds
+        BATCH_HEADER.pack_into(self.memory.buf, 0, BATCH_MAGIC, self.board_size, self.player_count,
+                               self.hand_capacity, self.capacity, index + 1)
+        return index
+    
+    def view(self, index:int) -> StateView:
+        """
+        Gibt eine Sicht auf eine Stellung zurück, ohne sie zu kopieren
+        
+        Args:
+            index: Index der Stellung
+        
+        Returns:
+            StateView
+        
+        Raises:
+            IndexError: Für ungültige Indizes
+        """
+        if not 0 <= index < len(self):
+            raise IndexError(f"Ungültiger Stellungsindex {index}")
+        offset = BATCH_HEADER.size + index * self.slot_size
+        buffer = self.memory.buf
+        return StateView(buffer[offset:offset + self.record_size],
+                         buffer[offset + self.record_size:offset + self.slot_size])
+    
+    def game(self, index:int) -> Game:
+        """Stellt die Stellung als eigenständiges Game her"""
+        view = self.view(index)
+        try:
+            return view.to_game()
+        finally:
+            view.release()
+    
+    def close(self) -> None:
+        """
+        Schließt den Block in diesem Prozess
+        Alle Sichten müssen vorher freigegeben (release) oder verworfen sein.
+        """
+        self.memory.close()
+    
+    def unlink(self) -> None:
+        """Gibt den Block endgültig frei (nur durch den Erzeuger)"""
+        if self.owner:
+            self.memory.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+        self.unlink()
+
+
+def _analyze_chunk(batch:SharedStateBatch, search:MoveSearch, start:int, stop:int) -> list[Move | None]:
+    """Worker-Funktion: wählt für jede Stellung eines Bereichs einen Zug"""
+    moves = [search.choose_move(batch.game(index)) for index in range(start, stop)]
+    batch.close()
+    return moves
+
+
+def analyze_positions(batch:SharedStateBatch, searches:list[MoveSearch], workers:int = 1,
+                      chunk_size:int | None = None) -> list[list[Move | None]]:
+    """
+    Lässt mehrere Suchen Züge für alle Stellungen eines Stapels wählen
+    Die Arbeit wird in Paare (Suche, Bereich von Stellungen) aufgeteilt;
+    Worker erhalten nur den Namen des Blocks und die Indizes.
+    
+    Args:
+        batch: Stapel mit Stellungen
+        searches: Zugsuchen
+        workers: Anzahl der Prozesse (1 = im eigenen Prozess)
+        chunk_size: Stellungen je Auftrag (Standard: gleichmäßig auf die Prozesse verteilt)
+    
+    Returns:
+        list: Je Suche die gewählten Züge in Stellungsreihenfolge
+    """
+    count = len(batch)
+    if workers == 1:
+        return [[search.choose_move(batch.game(index)) for index in range(count)] for search in searches]
+    
+    if chunk_size is None:
+        chunk_size = max(1, -(-count * len(searches) // workers))
+    ranges = [(start, min(count, start + chunk_size)) for start in range(0, count, chunk_size)]
+    from concurrent.futures import ProcessPoolExecutor
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [[executor.submit(collect_in_worker, _analyze_chunk, batch, search, start, stop)
+                    for start, stop in ranges]
+                   for search in searches]
+        for search_futures in futures:
+            moves = []
+            for future in search_futures:
+                chunk_moves, worker_metrics = future.result()
+                moves.extend(chunk_moves)
+                REGISTRY.merge(worker_metrics)
+            results.append(moves)
+    return results
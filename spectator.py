@@ -0,0 +1,114 @@
+"""
+Zuschauer-Kanal für Netzwerkspiele
+Jedes Update wird genau einmal kodiert und derselbe Puffer an alle Zuschauer
+geschrieben. Zuschauer, deren Sendepuffer voll läuft, erhalten keine Deltas
+mehr, sondern später einen frischen Keyframe (Resync).
+"""
+from protocol import encode_message, game_keyframe
+
+# Grenzen für den Sendepuffer eines Zuschauers in Bytes
+HIGH_WATER = 64 * 1024
+LOW_WATER = 16 * 1024
+
+
+class Spectator:
+    """
+    Ein Zuschauer mit seinem StreamWriter und Resync-Status
+    """
+    __slots__ = ('writer', 'needs_keyframe')
+    
+    def __init__(self, writer):
+        """
+        Initialisiert den Zuschauer
+        
+        Args:
+            writer: asyncio.StreamWriter der Verbindung
+        """
+        self.writer = writer
+        self.needs_keyframe = True
+    
+    def buffered(self) -> int:
+        """Gibt die Anzahl noch nicht gesendeter Bytes zurück"""
+        return self.writer.transport.get_write_buffer_size()
+
+
+class SpectatorChannel:
+    """
+    Verteilt die Updates eines Tisches an beliebig viele Zuschauer
+    """
+    
+    def __init__(self, table, high_water:int = HIGH_WATER, low_water:int = LOW_WATER):
+        """
+        Initialisiert den Kanal
+        
+        Args:
+            table: server.Table, dessen Spiel übertragen wird
+            high_water: Ab dieser Puffergröße wird ein Zuschauer auf Resync gesetzt
+            low_water: Unter dieser Puffergröße erhält er wieder einen Keyframe
+        """
+        self.table = table
+        self.high_water = high_water
+        self.low_water = low_water
+        self.spectators = {}  # writer -> Spectator
+        self.resyncs = 0  # Anzahl gesendeter Resync-Keyframes
+    
+    def __len__(self):
+        return len(self.spectators)
+    
+    def subscribe(self, writer) -> Spectator:
+        """
+        Meldet einen Zuschauer an und sendet ihm den aktuellen Zustand
+        
+        Args:
+            writer: asyncio.StreamWriter der Verbindung
+        
+        Returns:
+            Spectator
+        """
+        spectator = Spectator(writer)
+        self.spectators[writer] = spectator
+        writer.write(self._encode_keyframe())
+        spectator.needs_keyframe = False
+        return spectator
+    
+    def unsubscribe(self, writer) -> None:
+        """Meldet einen Zuschauer ab"""
+        self.spectators.pop(writer, None)
+    
+    def _encode_keyframe(self) -> bytes:
+        """Kodiert den aktuellen Zustand des Tisches"""
+        return encode_message(game_keyframe(self.table.game, self.table.table_id))
+    
+    def publish(self, frame:bytes) -> None:
+        """
+        Verteilt ein bereits kodiertes Update an alle Zuschauer
+        Der Keyframe für wartende Zuschauer wird höchstens einmal pro Aufruf kodiert.
+        
+        Args:
+            frame: Kodierte Delta-Nachricht
+        """
+        keyframe = None
+        closed = []
+        
+        for writer, spectator in self.spectators.items():
+            if writer.is_closing():
+                closed.append(writer)
+                continue
+            
+            buffered = spectator.buffered()
+            if spectator.needs_keyframe:
+                # Erst wieder senden, wenn der Puffer weitgehend geleert ist
+                if buffered <= self.low_water:
+                    if keyframe is None:
+                        keyframe = self._encode_keyframe()
+                    writer.write(keyframe)
+                    spectator.needs_keyframe = False
+                    self.resyncs += 1
+            elif buffered > self.high_water:
+                # Zu langsam: Deltas verwerfen statt unbegrenzt zu puffern
+                spectator.needs_keyframe = True
+            else:
+                writer.write(frame)
+        
+        for writer in closed:
+            self.unsubscribe(writer)
@@ -0,0 +1,289 @@
+"""
+Kompakte binäre Kodierung von Spielständen
+Wird für Keyframes von Wiederholungen verwendet. Ein 8x8-Spiel mit zwei
+Spielern benötigt etwa 450 Bytes.
+
+Aufbau:
+    Kopf (HEADER)
+    Regelsatz (RULES_ENTRY, nur bei FLAG_RULES, d.h. abweichend von den Standardregeln)
+    dichtes Spielfeld:  Plättchen (H je Feld), Besitzer (b je Feld),
+                        Chipwerte (B je Feld), Chipbesitzer (b je Feld)
+    dünnes Spielfeld:   Plättchen (TILE_ENTRY je Plättchen),
+                        eingesammelte Chips (CHIP_ENTRY je Chip)
+    Spieler:            Punkte und Hand (PLAYER_ENTRY + hand_capacity * H)
+
+Hände werden mit ihren Plätzen gespeichert (leerer Platz = 0), damit Slots
+in Zügen (Move.tile) nach dem Dekodieren weiter gelten.
+"""
+import struct
+import sys
+from array import array
+
+from board import SparseBoard
+from constants import GAME_STATE_GAME_OVER, GAME_STATE_MENU, GAME_STATE_PLAYING, PLAYER_COLOR_ORDER
+from game import Game
+from rules import (ADJACENCY_CORNER, ADJACENCY_EDGE, MAX_CHIP_VALUE, SCORING_DOMINANCE, SCORING_MAJORITY,
+                   STANDARD_RULES, RuleSet)
+from tile import Tile
+
+MAGIC = b'CRT1'
+
+# magic, flags, size, player_count, current, state, hand_capacity, selected,
+# move_number, tile_count, collected_count, chip_seed
+HEADER = struct.Struct('<4sBHBBBBBIIIQ')
+TILE_ENTRY = struct.Struct('<HHHb')
+CHIP_ENTRY = struct.Struct('<HHb')
+PLAYER_ENTRY = struct.Struct('<iB')
+# Nachbarschaft, Wertung, kleinste und größte Spielerzahl, Anzahl Chips je Wert
+RULES_ENTRY = struct.Struct(f'<BBBB{MAX_CHIP_VALUE}H')
+
+FLAG_SPARSE = 1
+FLAG_GAME_OVER = 2
+FLAG_FREE_CHOICE = 4
+FLAG_RULES = 8
+NO_SELECTION = 255
+
+STATE_CODES = {GAME_STATE_MENU: 0, GAME_STATE_PLAYING: 1, GAME_STATE_GAME_OVER: 2}
+STATE_NAMES = {code: name for name, code in STATE_CODES.items()}
+ADJACENCY_CODES = {ADJACENCY_CORNER: 0, ADJACENCY_EDGE: 1}
+ADJACENCY_NAMES = {code: name for name, code in ADJACENCY_CODES.items()}
+SCORING_CODES = {SCORING_DOMINANCE: 0, SCORING_MAJORITY: 1}
+SCORING_NAMES = {code: name for name, code in SCORING_CODES.items()}
+
+
+def pack_diamonds(diamonds) -> int:
+    """
+    Packt die 4 Diamanten eines Plättchens in 16 Bit (4 Bit je Diamant)
+    
+    Args:
+        diamonds: Liste von 4 Diamantwerten
+    
+    Returns:
+        int: Gepackter Wert (0 steht für kein Plättchen)
+    """
+    return diamonds[0] | diamonds[1] << 4 | diamonds[2] << 8 | diamonds[3] << 12
+
+
+def unpack_diamonds(packed:int) -> list[int]:
+    """
+    Entpackt die mit pack_diamonds gepackten Diamanten
+    
+    Args:
+        packed: Gepackter Wert
+    
+    Returns:
+        list: [oben, rechts, unten, links]
+    """
+    return [packed & 15, packed >> 4 & 15, packed >> 8 & 15, packed >> 12 & 15]
+
+
+def _to_bytes(values:array) -> bytes:
+    """Wandelt ein Array in Little-Endian-Bytes um"""
+    if sys.byteorder == 'big' and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode:str, data, offset:int, count:int) -> tuple[array, int]:
+    """Liest ein Little-Endian-Array und gibt es mit dem neuen Offset zurück"""
+    values = array(typecode)
+    end = offset + count * values.itemsize
+    values.frombytes(data[offset:end])
+    if sys.byteorder == 'big' and values.itemsize > 1:
+        values.byteswap()
+    return values, end
+
+
+def encode_rules(rules:RuleSet) -> bytes:
+    """
+    Kodiert einen Regelsatz (RULES_ENTRY)
+    
+    Args:
+        rules: RuleSet-Objekt
+    
+    Returns:
+        bytes: Kodierter Regelsatz
+    """
+    return RULES_ENTRY.pack(ADJACENCY_CODES[rules.adjacency], SCORING_CODES[rules.scoring],
+                            rules.min_players, rules.max_players, *rules.chip_counts)
+
+
+def decode_rules(data, flags:int) -> tuple[RuleSet, int]:
+    """
+    Liest den Regelsatz eines kodierten Spielstands
+    
+    Args:
+        data: Kodierter Spielstand
+        flags: Flags aus dem Kopf
+    
+    Returns:
+        tuple: (RuleSet, Offset hinter Kopf und Regelsatz)
+    
+    Raises:
+        ValueError: Bei unbekannten Regeln
+    """
+    if not flags & FLAG_RULES:
+        return STANDARD_RULES, HEADER.size
+    adjacency, scoring, min_players, max_players, *chip_counts = RULES_ENTRY.unpack_from(data, HEADER.size)
+    if adjacency not in ADJACENCY_NAMES or scoring not in SCORING_NAMES:
+        raise ValueError("Unbekannter Regelsatz im Spielstand")
+    rules = RuleSet(ADJACENCY_NAMES[adjacency], SCORING_NAMES[scoring], tuple(chip_counts),
+                    min_players, max_players)
+    return rules.validate(), HEADER.size + RULES_ENTRY.size
+
+
+def encode_game(game:Game, hand_capacity:int | None = None) -> bytes:
+    """
+    Kodiert einen Spielstand
+    
+    Args:
+        game: Game-Objekt
+        hand_capacity: Feste Anzahl Plätze je Hand (None = größte aktuelle Hand)
+    
+    Returns:
+        bytes: Kodierter Spielstand
+    """
+    board = game.board
+    manager = game.player_manager
+    players = manager.players
+    if hand_capacity is None:
+        hand_capacity = max(len(player.hand.slots) for player in players)
+    
+    selected = NO_SELECTION
+    if (game.selected_tile is not None and game.selected_slot is not None
+            and manager.get_current_player().hand.get(game.selected_slot) is game.selected_tile):
+        selected = game.selected_slot
+    
+    sparse = isinstance(board, SparseBoard)
+    custom_rules = not game.rules.is_standard
+    flags = ((FLAG_SPARSE if sparse else 0) | (FLAG_GAME_OVER if game.game_over else 0)
+             | (FLAG_FREE_CHOICE if game.free_choice else 0) | (FLAG_RULES if custom_rules else 0))
+    parts = [encode_rules(game.rules)] if custom_rules else []
+    
+    if sparse:
+        tiles = [
+            TILE_ENTRY.pack(row, col, pack_diamonds(tile.diamonds), manager.get_player_index(tile.owner))
+            for row, col, tile in board.iter_tiles()
+        ]
+        chips = [CHIP_ENTRY.pack(row, col, owner) for (row, col), owner in board.chip_owners.items()]
+        parts.extend(tiles)
+        parts.extend(chips)
+        tile_count, collected_count, chip_seed = len(tiles), len(chips), board.chip_seed
+    else:
+        cell_count = board.size * board.size
+        packed = array('H', bytes(2 * cell_count))
+        owners = array('b', [-1]) * cell_count  # wie Board.cell_owners
+        for row, col, tile in board.iter_tiles():
+            packed[row * board.size + col] = pack_diamonds(tile.diamonds)
+            owners[row * board.size + col] = manager.get_player_index(tile.owner)
+        parts.extend([_to_bytes(packed), owners.tobytes(),
+                      board.chip_values.tobytes(), board.chip_owner.tobytes()])
+        tile_count, collected_count, chip_seed = board.placed_tiles_count, 0, 0
+    
+    for player in players:
+        slots = player.hand.slots
+        hand = array('H', [pack_diamonds(tile.diamonds) if tile is not None else 0 for tile in slots])
+        if len(hand) > hand_capacity:
+            raise ValueError("Hand ist größer als hand_capacity")
+        hand.extend([0] * (hand_capacity - len(hand)))
+        parts.append(PLAYER_ENTRY.pack(player.score, len(slots)))
+        parts.append(_to_bytes(hand))
+    
+    header = HEADER.pack(
+        MAGIC, flags, board.size, len(players), manager.current_player_index,
+        STATE_CODES[game.state], hand_capacity, selected, game.move_number,
+        tile_count, collected_count, chip_seed
+    )
+    return header + b''.join(parts)
+
+
+def decode_game(data) -> Game:
+    """
+    Stellt einen mit encode_game kodierten Spielstand wieder her
+    
+    Args:
+        data: Kodierter Spielstand (bytes oder memoryview)
+    
+    Returns:
+        Game: Wiederhergestelltes Spiel
+    
+    Raises:
+        ValueError: Wenn die Daten keinen Spielstand enthalten
+    """
+    (magic, flags, size, player_count, current, state, hand_capacity, selected,
+     move_number, tile_count, collected_count, chip_seed) = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Keine gültigen Spielstand-Daten")
+    
+    rules, offset = decode_rules(data, flags)
+    sparse = bool(flags & FLAG_SPARSE)
+    game = Game(player_count, size, sparse, bool(flags & FLAG_FREE_CHOICE), rules)
+    board = game.board
+    manager = game.player_manager
+    
+    if sparse:
+        board.chip_seed = chip_seed
+        for _ in range(tile_count):
+            row, col, packed, owner = TILE_ENTRY.unpack_from(data, offset)
+            offset += TILE_ENTRY.size
+            tile = Tile(unpack_diamonds(packed))
+            tile.set_owner(PLAYER_COLOR_ORDER[owner])
+            board.restore_tile(tile, row, col)
+        for _ in range(collected_count):
+            row, col, owner = CHIP_ENTRY.unpack_from(data, offset)
+            offset += CHIP_ENTRY.size
+            board.chip_owners[(row, col)] = owner
+    else:
+        cell_count = size * size
+        packed, offset = _from_bytes('H', data, offset, cell_count)
+        owners, offset = _from_bytes('b', data, offset, cell_count)
+        board.chip_values, offset = _from_bytes('B', data, offset, cell_count)
+        board.chip_owner, offset = _from_bytes('b', data, offset, cell_count)
+        for index, value in enumerate(packed):
+            if value:
+                tile = Tile(unpack_diamonds(value))
+                tile.set_owner(PLAYER_COLOR_ORDER[owners[index]])
+                board.restore_tile(tile, index // size, index % size)
+        collected = 0
+        for index, owner in enumerate(board.chip_owner):
+            if owner >= 0:
+                collected |= 1 << index
+        board.chip_collected = collected
+    
+    for player in manager.players:
+        player.score, slot_count = PLAYER_ENTRY.unpack_from(data, offset)
+        offset += PLAYER_ENTRY.size
+        hand, offset = _from_bytes('H', data, offset, hand_capacity)
+        player.hand.slots.extend([None] * slot_count)
+        for slot, value in enumerate(hand[:slot_count]):
+            if value:
+                tile = Tile(unpack_diamonds(value))
+                tile.set_owner(player.color)
+                player.restore_tile(slot, tile)
+    
+    for (row, col), owner in _collected_positions(board):
+        manager.players[owner].collected_chips.append((row, col, board.get_chip_value(row, col)))
+    
+    manager.current_player_index = current
+    game.state = STATE_NAMES[state]
+    game.move_number = move_number
+    if selected != NO_SELECTION:
+        game.selected_slot = selected
+        game.selected_tile = manager.get_current_player().hand.get(selected)
+    if flags & FLAG_GAME_OVER:
+        game.game_over = True
+        game.winner = manager.get_winner()
+    elif game.state == GAME_STATE_PLAYING:
+        game.valid_positions = board.get_valid_placements()
+    return game
+
+
+def _collected_positions(board):
+    """Liefert ((row, col), Besitzer) für alle eingesammelten Chips"""
+    if isinstance(board, SparseBoard):
+        yield from board.chip_owners.items()
+        return
+    for index, owner in enumerate(board.chip_owner):
+        if owner >= 0:
+            yield (index // board.size, index % board.size), owner
@@ -0,0 +1,247 @@
+"""
+Symmetrien des quadratischen Spielfelds
+Die 8 Symmetrien (4 Drehungen, jeweils mit und ohne Spiegelung) bilden Felder
+und Plättchen-Ausrichtungen aufeinander ab. Die Wertung hängt nur von den
+Farbanzahlen je Linie ab, gedrehte oder gespiegelte Stellungen sind daher
+gleichwertig.
+
+Eine Symmetrie ist eine Zahl 0-7: Bit 2 spiegelt links/rechts, die unteren
+Bits geben die anschließenden Vierteldrehungen im Uhrzeigersinn an.
+
+Für vollständige Spielfelder (canonical_key) wird jede Stellung in Byte-Ebenen
+gepackt (Besitzer, Plättchen, Chips; ein Byte je Feld). Eine Symmetrie ist
+dann eine Byte-Übersetzung der Plättchen-Ebene plus eine Permutation der
+Felder, der kleinste Bytestring ist die kanonische Form.
+"""
+from array import array
+from functools import lru_cache
+
+from board import Board, SparseBoard
+from constants import PLAYER_COLOR_INDEX
+from scoring import COLOR_COUNT
+from tile import Tile, rotation_class
+
+SYMMETRY_COUNT = 8
+
+
+def inverse_symmetry(symmetry:int) -> int:
+    """
+    Gibt die Symmetrie zurück, die eine andere rückgängig macht
+    
+    Args:
+        symmetry: Symmetrie 0-7
+    
+    Returns:
+        int: Inverse Symmetrie
+    """
+    # Spiegelungen (auch gedrehte) sind selbstinvers
+    if symmetry >= 4:
+        return symmetry
+    return (4 - symmetry) % 4
+
+
+def transform_cell(symmetry:int, size:int, row:int, col:int) -> tuple[int, int]:
+    """
+    Bildet ein Feld mit einer Symmetrie ab
+    
+    Args:
+        symmetry: Symmetrie 0-7
+        size: Größe des Spielfelds
+        row: Zeile
+        col: Spalte
+    
+    Returns:
+        tuple: (row, col) nach der Abbildung
+    """
+    if symmetry >= 4:
+        col = size - 1 - col
+    for _ in range(symmetry % 4):
+        row, col = col, size - 1 - row
+    return row, col
+
+
+def transform_diamonds(symmetry:int, diamonds) -> tuple:
+    """
+    Bildet die Ausrichtung eines Plättchens mit einer Symmetrie ab
+    
+    Args:
+        symmetry: Symmetrie 0-7
+        diamonds: [oben, rechts, unten, links]
+    
+    Returns:
+        tuple: (oben, rechts, unten, links) nach der Abbildung
+    """
+    top, right, bottom, left = diamonds
+    if symmetry >= 4:
+        right, left = left, right
+    for _ in range(symmetry % 4):
+        top, right, bottom, left = left, top, right, bottom
+    return top, right, bottom, left
+
+
+def canonical_placements(placements, size:int, hand=None) -> tuple[tuple, int]:
+    """
+    Bestimmt die kanonische Form einer Menge gelegter Plättchen
+    
+    Args:
+        placements: Iterierbar über (row, col, Diamanten, Besitzer)
+        size: Größe des Spielfelds
+        hand: Diamanten des Plättchens auf der Hand (optional, wird mit abgebildet)
+    
+    Returns:
+        tuple: (kanonischer Schlüssel, Symmetrie, die in diese Form abbildet)
+    """
+    placements = list(placements)
+    best_key = None
+    best_symmetry = 0
+    for symmetry in range(SYMMETRY_COUNT):
+        tiles = []
+        for row, col, diamonds, owner in placements:
+            cell_row, cell_col = transform_cell(symmetry, size, row, col)
+            tiles.append((cell_row * size + cell_col, transform_diamonds(symmetry, diamonds), owner))
+        tiles.sort()
+        hand_class = rotation_class(transform_diamonds(symmetry, hand)) if hand is not None else None
+        key = (tuple(tiles), hand_class)
+        if best_key is None or key < best_key:
+            best_key = key
+            best_symmetry = symmetry
+    return best_key, best_symmetry
+
+
+def _tile_code(diamonds) -> int:
+    """Packt 4 Diamanten (je 1 bis COLOR_COUNT) in ein Byte"""
+    top, right, bottom, left = diamonds
+    return (((top - 1) * COLOR_COUNT + right - 1) * COLOR_COUNT + bottom - 1) * COLOR_COUNT + left - 1
+
+
+def _tile_diamonds(code:int) -> tuple:
+    """Entpackt ein mit _tile_code gepacktes Plättchen"""
+    code, left = divmod(code, COLOR_COUNT)
+    code, bottom = divmod(code, COLOR_COUNT)
+    top, right = divmod(code, COLOR_COUNT)
+    return top + 1, right + 1, bottom + 1, left + 1
+
+
+# Übersetzungstabellen der Plättchen-Ebene je Symmetrie (für bytes.translate)
+TILE_TABLES = tuple(
+    bytes(_tile_code(transform_diamonds(symmetry, _tile_diamonds(code))) if code < COLOR_COUNT ** 4 else code
+          for code in range(256))
+    for symmetry in range(SYMMETRY_COUNT)
+)
+
+
+@lru_cache(maxsize=None)
+def cell_order(size:int, symmetry:int) -> tuple:
+    """
+    Gibt für jedes Zielfeld den Index des Quellfelds zurück
+    
+    Args:
+        size: Größe des Spielfelds
+        symmetry: Symmetrie 0-7
+    
+    Returns:
+        tuple: Quellindex (row * size + col) je Zielindex
+    """
+    inverse = inverse_symmetry(symmetry)
+    order = []
+    for index in range(size * size):
+        row, col = transform_cell(inverse, size, index // size, index % size)
+        order.append(row * size + col)
+    return tuple(order)
+
+
+def board_planes(board:Board, include_chips:bool = True) -> list[bytes]:
+    """
+    Packt ein Spielfeld in Byte-Ebenen mit einem Byte je Feld
+    
+    Ebenen:
+        Besitzer:  0 leer, 1 Plättchen ohne Besitzer, sonst 2 + Spielerindex
+        Plättchen: gepackte Diamanten (_tile_code)
+        Chips:     Chipwert | (Sammler + 1) << 4
+    
+    Args:
+        board: Spielfeld
+        include_chips: Chipwerte und gesammelte Chips mit aufnehmen
+    
+    Returns:
+        list: Ebenen in Feldreihenfolge row * size + col
+    """
+    size = board.size
+    owners = bytearray(size * size)
+    tiles = bytearray(size * size)
+    for row, col, tile in board.iter_tiles():
+        owners[row * size + col] = PLAYER_COLOR_INDEX.get(tile.owner, -1) + 2
+        tiles[row * size + col] = _tile_code(tile.diamonds)
+    planes = [bytes(owners), bytes(tiles)]
+    
+    if include_chips:
+        if isinstance(board, SparseBoard):
+            chips = bytearray(
+                board.get_chip_value(index // size, index % size) for index in range(size * size)
+            )
+            for (row, col), owner in board.chip_owners.items():
+                chips[row * size + col] |= (owner + 1) << 4
+        else:
+            chips = bytearray(board.chip_values)
+            for index, owner in enumerate(board.chip_owner):
+                if owner >= 0:
+                    chips[index] |= (owner + 1) << 4
+        planes.append(bytes(chips))
+    return planes
+
+
+def canonical_key(board:Board, include_chips:bool = True) -> tuple[bytes, int]:
+    """
+    Bestimmt die kanonische Form eines Spielfelds unter allen 8 Symmetrien
+    Die Ebenen werden nacheinander verglichen; nur Symmetrien, die bisher
+    gleichauf liegen, werden für die nächste Ebene noch berechnet.
+    
+    Args:
+        board: Spielfeld
+        include_chips: Chips zählen zur Stellung (nötig, wenn Punkte eine Rolle spielen)
+    
+    Returns:
+        tuple: (kanonischer Schlüssel, Symmetrie, die in diese Form abbildet)
+    """
+    size = board.size
+    candidates = range(SYMMETRY_COUNT)
+    parts = []
+    for plane_index, plane in enumerate(board_planes(board, include_chips)):
+        transformed = {}
+        for symmetry in candidates:
+            data = plane.translate(TILE_TABLES[symmetry]) if plane_index == 1 else plane
+            transformed[symmetry] = bytes(map(data.__getitem__, cell_order(size, symmetry)))
+        best = min(transformed.values())
+        candidates = [symmetry for symmetry in candidates if transformed[symmetry] == best]
+        parts.append(best)
+    return b''.join(parts), candidates[0]
+
+
+def transform_board(board:Board, symmetry:int) -> Board:
+    """
+    Erstellt ein gedrehtes bzw. gespiegeltes Spielfeld mit neuen Plättchen
+    
+    Args:
+        board: Dichtes Spielfeld
+        symmetry: Symmetrie 0-7
+    
+    Returns:
+        Board: Abgebildetes Spielfeld inklusive Chips
+    
+    Raises:
+        TypeError: Für SparseBoard (Chips folgen dort einem festen Seed)
+    """
+    if isinstance(board, SparseBoard):
+        raise TypeError("Nur dichte Spielfelder können abgebildet werden")
+    size = board.size
+    result = Board(size, board.rules)
+    for row, col, tile in board.iter_tiles():
+        copy = Tile(list(transform_diamonds(symmetry, tile.diamonds)))
+        copy.set_owner(tile.owner)
+        result.restore_tile(copy, *transform_cell(symmetry, size, row, col))
+    
+    order = cell_order(size, symmetry)
+    result.chip_values = array('B', (board.chip_values[source] for source in order))
+    result.chip_owner = array('b', (board.chip_owner[source] for source in order))
+    result.chip_collected = sum(1 << index for index, owner in enumerate(result.chip_owner) if owner >= 0)
+    return result
@@ -0,0 +1,182 @@
+"""
+Tests für den Netzwerk-Server gegen den lokalen Client (LocalClient)
+
+Aufruf:
+    python -m unittest test_server
+"""
+import asyncio
+import random
+import unittest
+
+from metrics import GAMES_COMPLETED
+from protocol import (MSG_DELTA, MSG_ERROR, MSG_KEYFRAME, RemoteTableState, decode_message, encode_message,
+                      game_keyframe)
+from server import CaratServer, LocalClient, Table
+from spectator import HIGH_WATER, LOW_WATER
+
+TIMEOUT = 10.0  # Höchste Wartezeit je Nachricht in Sekunden
+
+
+def _mirror_of(table:Table, seat:int | None = None) -> RemoteTableState:
+    """Spiegel, den ein frischer Keyframe des Tisches ergäbe (über das Leitungsformat)"""
+    return RemoteTableState(decode_message(encode_message(game_keyframe(table.game, table.table_id, seat))))
+
+
+def _state(mirror:RemoteTableState) -> tuple:
+    """Vergleichbarer Zustand eines Tisch-Spiegels"""
+    return (mirror.move_number, mirror.tiles, mirror.collected, mirror.scores, mirror.hand_sizes,
+            mirror.current, mirror.over, mirror.hand)
+
+
+class ServerGameTest(unittest.IsolatedAsyncioTestCase):
+    """Spielt Partien über TCP mit LocalClient gegen einen CaratServer"""
+    
+    async def asyncSetUp(self):
+        self.server = CaratServer()
+        self.listener = await self.server.serve('127.0.0.1', 0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+        self.clients = []
+    
+    async def asyncTearDown(self):
+        for client in self.clients:
+            await client.close()
+        self.listener.close()
+        await self.listener.wait_closed()
+    
+    async def _client(self) -> LocalClient:
+        """Verbindet einen neuen Client mit dem Server"""
+        client = LocalClient()
+        await client.connect('127.0.0.1', self.port)
+        self.clients.append(client)
+        return client
+    
+    async def _receive(self, client:LocalClient) -> dict:
+        return await asyncio.wait_for(client.receive(), TIMEOUT)
+    
+    async def test_game_until_game_over(self):
+        random.seed(7)
+        host, guest = await self._client(), await self._client()
+        table_id = await asyncio.wait_for(host.create_table(2, 'kanten'), TIMEOUT)
+        table = self.server.tables[table_id]
+        clients = [host, guest]
+        for seat, client in enumerate(clients):
+            await asyncio.wait_for(client.join(table_id, seat), TIMEOUT)
+        for seat, client in enumerate(clients):
+            self.assertEqual(_state(client.tables[table_id]), _state(_mirror_of(table, seat)))
+        
+        completed = GAMES_COMPLETED.value
+        rng = random.Random(1)
+        while not table.game.game_over:
+            seat = table.game.player_manager.current_player_index
+            row, col = rng.choice(table.game.valid_positions)
+            await clients[seat].move(table_id, row, col, rng.randrange(4))
+            for client in clients:
+                message = await self._receive(client)
+                self.assertEqual(message['type'], MSG_DELTA)
+            for seat, client in enumerate(clients):
+                self.assertEqual(_state(client.tables[table_id]), _state(_mirror_of(table, seat)))
+        
+        mirror = host.tables[table_id]
+        self.assertTrue(mirror.over)
+        self.assertEqual(mirror.scores, [player.score for player in table.game.player_manager.players])
+        self.assertGreater(sum(mirror.scores), 0)
+        self.assertNotIn(table_id, self.server.tables)
+        self.assertEqual(GAMES_COMPLETED.value, completed + 1)
+    
+    async def test_invalid_requests(self):
+        host, guest = await self._client(), await self._client()
+        for message in ({'type': 'create', 'players': 2, 'size': 10 ** 6},
+                        {'type': 'create', 'players': 7},
+                        {'type': 'join', 'table': 999, 'seat': 0}):
+            await host.send(message)
+            self.assertEqual((await self._receive(host))['type'], MSG_ERROR)
+        
+        table_id = await asyncio.wait_for(host.create_table(2), TIMEOUT)
+        await asyncio.wait_for(host.join(table_id, 0), TIMEOUT)
+        await guest.send({'type': 'join', 'table': table_id, 'seat': 0})
+        self.assertEqual((await self._receive(guest))['type'], MSG_ERROR)
+        await asyncio.wait_for(guest.join(table_id, 1), TIMEOUT)
+        
+        # Zug außerhalb der Reihe
+        row, col = self.server.tables[table_id].game.valid_positions[0]
+        await guest.move(table_id, row, col)
+        self.assertEqual((await self._receive(guest))['type'], MSG_ERROR)
+        
+        # Nach dem Trennen ist der Sitzplatz wieder frei
+        await host.close()
+        self.clients.remove(host)
+        for _ in range(100):
+            if 0 not in self.server.tables[table_id].seats:
+                break
+            await asyncio.sleep(0.01)
+        other = await self._client()
+        self.assertEqual((await asyncio.wait_for(other.join(table_id, 0), TIMEOUT)).seat, 0)
+
+
+class _Transport:
+    """Transport mit einstellbarem Sendepuffer"""
+    
+    def __init__(self):
+        self.buffered = 0
+    
+    def get_write_buffer_size(self) -> int:
+        return self.buffered
+
+
+class _Writer:
+    """StreamWriter-Ersatz, der geschriebene Nachrichten sammelt"""
+    
+    def __init__(self):
+        self.transport = _Transport()
+        self.messages = []
+    
+    def is_closing(self) -> bool:
+        return False
+    
+    def write(self, data:bytes) -> None:
+        self.messages.extend(decode_message(line) for line in data.splitlines())
+
+
+class PlayerBackpressureTest(unittest.TestCase):
+    """Spieler mit vollem Sendepuffer erhalten keine Deltas mehr, sondern einen Keyframe"""
+    
+    def test_lagging_player_is_resynced(self):
+        table = Table(1)
+        fast, slow = _Writer(), _Writer()
+        table.take_seat(0, fast)
+        table.take_seat(1, slow)
+        
+        slow.transport.buffered = HIGH_WATER + 1
+        table.broadcast(b'{"type": "delta"}\n')
+        table.broadcast(b'{"type": "delta"}\n')
+        self.assertEqual(len(fast.messages), 2)
+        self.assertEqual(slow.messages, [])
+        self.assertIn(slow, table.lagging)
+        
+        # Noch über LOW_WATER: weiter nichts
+        slow.transport.buffered = LOW_WATER + 1
+        table.catch_up(slow)
+        self.assertEqual(slow.messages, [])
+        
+        slow.transport.buffered = LOW_WATER
+        table.broadcast(b'{"type": "delta"}\n')
+        self.assertEqual([message['type'] for message in slow.messages], [MSG_KEYFRAME])
+        self.assertEqual(slow.messages[0]['seat'], 1)
+        self.assertNotIn(slow, table.lagging)
+        self.assertEqual(table.resyncs, 1)
+        
+        table.broadcast(b'{"type": "delta"}\n')
+        self.assertEqual([message['type'] for message in slow.messages], [MSG_KEYFRAME, MSG_DELTA])
+    
+    def test_game_over_resyncs_regardless_of_buffer(self):
+        table = Table(1)
+        slow = _Writer()
+        table.take_seat(0, slow)
+        table.lagging.add(slow)
+        slow.transport.buffered = HIGH_WATER * 4
+        table.catch_up(slow, force=True)
+        self.assertEqual([message['type'] for message in slow.messages], [MSG_KEYFRAME])
+
+
+if __name__ == "__main__":
+    unittest.main()
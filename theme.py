@@ -0,0 +1,344 @@
+"""
+Themen (Skins) mit Texturatlas
+Ein Thema legt alle Farben der Darstellung fest. Pro Thema gibt es genau einen
+Texturatlas: eine Fläche mit Plättchen-Hintergründen je Besitzer, Diamanten
+je Wert und Ecke, Punktechips mit Wert und Panels der Spielerinfo. Der
+Renderer blittet nur noch Ausschnitte daraus. Die Größen der Ausschnitte
+folgen dem Layout (layout.py); je Skalierungsfaktor wird der Atlas einmal
+aufgebaut.
+
+Liegt unter themes/<name>.png ein Bild im Atlas-Layout, wird es geladen,
+sonst wird der Atlas aus den Farben des Themas gezeichnet. Bilder haben das
+Layout des Faktors 1 und werden für andere Faktoren ausschnittweise skaliert.
+Vorlagen zum Bemalen lassen sich exportieren.
+
+Dieses Modul ist PyGame-abhängig und wird nur vom Renderer geladen.
+
+Aufruf:
+    python theme.py --export themes
+"""
+import argparse
+import os
+from typing import NamedTuple
+
+import pygame
+
+from constants import *
+from layout import Layout
+
+THEMES_DIR = 'themes'
+DEFAULT_THEME = 'klassisch'
+ATLAS_WIDTH = 512
+
+# Ecken eines Plättchens in der Reihenfolge von Tile.diamonds (oben, rechts, unten, links)
+DIAMOND_CORNERS = ('oben_links', 'oben_rechts', 'unten_rechts', 'unten_links')
+
+
+class Theme(NamedTuple):
+    """
+    Farben eines Themas (RGB, Panels RGBA)
+    """
+    name: str
+    background: tuple
+    grid: tuple
+    outline: tuple
+    text: tuple
+    muted_text: tuple
+    current_text: tuple
+    valid: tuple
+    hint: tuple
+    highlight: tuple
+    tile_back: tuple
+    player_colors: dict
+    diamond_colors: dict
+    chip_face: tuple
+    chip_rim: tuple
+    chip_text: tuple
+    chip_shadow: tuple
+    panel: tuple
+    panel_current: tuple
+    atlas_path: str | None = None
+
+
+def _diamonds_of(player_colors:dict) -> dict:
+    """Ordnet die Diamantwerte den Spielerfarben zu (1 = erste Farbe usw.)"""
+    return {value: player_colors[PLAYER_COLOR_ORDER[value - 1]] for value in DIAMOND_COLORS}
+
+
+_NIGHT_PLAYERS = {
+    'red': (230, 80, 80),
+    'blue': (90, 120, 240),
+    'green': (80, 200, 110),
+    'yellow': (240, 210, 90),
+    'purple': (180, 110, 230),
+    'orange': (245, 150, 70)
+}
+
+_CONTRAST_PLAYERS = {
+    'red': (230, 0, 0),
+    'blue': (0, 60, 255),
+    'green': (0, 170, 0),
+    'yellow': (255, 210, 0),
+    'purple': (130, 0, 200),
+    'orange': (255, 110, 0)
+}
+
+THEMES = {
+    'klassisch': Theme(
+        name="Klassisch", background=BACKGROUND, grid=LIGHT_GRAY, outline=BLACK,
+        text=BLACK, muted_text=DARK_GRAY, current_text=(0, 150, 0), valid=(0, 255, 0),
+        hint=HINT_COLOR, highlight=HIGHLIGHT_COLOR, tile_back=WHITE,
+        player_colors=PLAYER_COLORS, diamond_colors=DIAMOND_COLORS,
+        chip_face=DARK_GRAY, chip_rim=LIGHT_GRAY, chip_text=WHITE, chip_shadow=BLACK,
+        panel=(255, 255, 255, 40), panel_current=(255, 255, 255, 90),
+        atlas_path=os.path.join(THEMES_DIR, 'klassisch.png')),
+    'nacht': Theme(
+        name="Nacht", background=(24, 28, 40), grid=(70, 80, 100), outline=(10, 10, 14),
+        text=(230, 230, 235), muted_text=(150, 155, 170), current_text=(120, 220, 120),
+        valid=(80, 200, 120), hint=(255, 200, 60), highlight=(255, 255, 255), tile_back=(40, 44, 60),
+        player_colors=_NIGHT_PLAYERS, diamond_colors=_diamonds_of(_NIGHT_PLAYERS),
+        chip_face=(20, 20, 28), chip_rim=(120, 130, 150), chip_text=(240, 240, 240), chip_shadow=BLACK,
+        panel=(255, 255, 255, 24), panel_current=(255, 255, 255, 60),
+        atlas_path=os.path.join(THEMES_DIR, 'nacht.png')),
+    'kontrast': Theme(
+        name="Kontrast", background=WHITE, grid=BLACK, outline=BLACK,
+        text=BLACK, muted_text=BLACK, current_text=(0, 120, 0), valid=(0, 200, 0),
+        hint=(255, 120, 0), highlight=(255, 230, 0), tile_back=WHITE,
+        player_colors=_CONTRAST_PLAYERS, diamond_colors=_diamonds_of(_CONTRAST_PLAYERS),
+        chip_face=BLACK, chip_rim=WHITE, chip_text=(255, 230, 0), chip_shadow=GRAY,
+        panel=(0, 0, 0, 20), panel_current=(0, 0, 0, 60),
+        atlas_path=os.path.join(THEMES_DIR, 'kontrast.png'))
+}
+
+
+def next_theme(theme:Theme) -> Theme:
+    """Gibt das nächste Thema in der Reihenfolge von THEMES zurück"""
+    themes = list(THEMES.values())
+    return themes[(themes.index(theme) + 1) % len(themes)] if theme in themes else themes[0]
+
+
+def diamond_offsets(layout:Layout) -> tuple:
+    """
+    Gibt die linke obere Ecke jedes Diamanten-Ausschnitts innerhalb eines Plättchens zurück
+    
+    Args:
+        layout: Layout-Objekt
+    
+    Returns:
+        tuple: (x, y) je Ecke in der Reihenfolge von DIAMOND_CORNERS
+    """
+    left = layout.tile_border_offset
+    right = layout.tile_size - layout.diamond_radius - layout.tile_border_offset*2
+    top = layout.tile_border_offset
+    bottom = layout.tile_size // 2
+    # Ein Pixel Rand für den Umriss
+    return tuple((int(x) - 1, int(y) - 1) for x, y in ((left, top), (right, top), (right, bottom), (left, bottom)))
+
+
+def diamond_points(x:float, y:float, corner:str, radius:float = DIAMOND_RADIUS) -> list:
+    """
+    Gibt die Eckpunkte eines Diamanten zurück (Raute mit abgeschnittener Spitze)
+    
+    Args:
+        x: X-Position der linken oberen Ecke (Pixel)
+        y: Y-Position der linken oberen Ecke (Pixel)
+        corner: Ecke des Plättchens ('oben_links', 'oben_rechts', 'unten_rechts', 'unten_links')
+        radius: Kantenlänge des Diamanten (Pixel)
+    
+    Returns:
+        list: Punkte des Polygons
+    
+    Raises:
+        ValueError: Bei unbekannter Ecke
+    """
+    d = radius / 5
+    if corner == 'oben_links':
+        return [
+            (x, y-d+radius),
+            (x, y+radius),
+            (x+radius, y+radius),
+            (x+radius, y),
+            (x+radius-d, y)
+        ]
+    if corner == 'oben_rechts':
+        return [
+            (x, y),
+            (x+d, y),
+            (x+radius, y+radius-d),
+            (x+radius, y+radius),
+            (x, y+radius)
+        ]
+    if corner == 'unten_rechts':
+        return [
+            (x, y),
+            (x+radius, y),
+            (x+radius, y+d),
+            (x+d, y+radius),
+            (x, y+radius)
+        ]
+    if corner == 'unten_links':
+        return [
+            (x, y),
+            (x+radius, y),
+            (x+radius, y+radius),
+            (x+radius-d, y+radius),
+            (x, y+d)
+        ]
+    raise ValueError(f"Invalid direction: {corner}")
+
+
+def atlas_layout(layout:Layout) -> tuple[dict, tuple[int, int]]:
+    """
+    Berechnet die Lage aller Ausschnitte im Atlas (für alle Themen gleich)
+    Zeilenweise gepackt: jede Art von Ausschnitt beginnt eine neue Zeile.
+    
+    Args:
+        layout: Layout-Objekt (bestimmt die Größen)
+    
+    Returns:
+        tuple: (Schlüssel -> pygame.Rect, (Breite, Höhe) des Atlas)
+        
+        Schlüssel: ('face', Besitzer oder None), ('diamond', Wert, Ecke),
+        ('chip', Wert), ('panel', am Zug)
+    """
+    tile = (layout.tile_size, layout.tile_size)
+    diamond = (layout.diamond_sprite_size, layout.diamond_sprite_size)
+    chip = (layout.chip_sprite_size, layout.chip_sprite_size)
+    groups = [
+        [(('face', owner), tile) for owner in (None, *PLAYER_COLOR_ORDER)],
+        [(('diamond', value, corner), diamond) for value in DIAMOND_COLORS for corner in DIAMOND_CORNERS],
+        [(('chip', value), chip) for value in range(1, max(CHIP_VALUES) + 1)],
+        [(('panel', current), layout.panel_size) for current in (False, True)],
+    ]
+    width = max(ATLAS_WIDTH, *(size[0] for group in groups for _, size in group))
+    regions = {}
+    y = 0
+    for group in groups:
+        x = 0
+        row_height = 0
+        for key, size in group:
+            if x + size[0] > width:
+                x = 0
+                y += row_height
+                row_height = 0
+            regions[key] = pygame.Rect((x, y), size)
+            x += size[0]
+            row_height = max(row_height, size[1])
+        y += row_height
+    return regions, (width, y)
+
+
+class TextureAtlas:
+    """
+    Alle Grafiken eines Themas in einer Fläche
+    """
+    
+    def __init__(self, theme:Theme, font:pygame.font.Font, layout:Layout | None = None):
+        """
+        Lädt den Atlas des Themas oder zeichnet ihn
+        
+        Args:
+            theme: Theme-Objekt
+            font: Schrift für die Chipwerte (passend zum Layout)
+            layout: Layout-Objekt (Standard: Basis-Entwurf mit Faktor 1)
+        
+        Raises:
+            ValueError: Wenn ein geladenes Bild nicht zum Atlas-Layout passt
+        """
+        self.theme = theme
+        self.layout = layout or Layout()
+        self.regions, size = atlas_layout(self.layout)
+        if theme.atlas_path and os.path.exists(theme.atlas_path):
+            self.surface = self._load(theme.atlas_path, size)
+            self.loaded = True
+        else:
+            self.surface = pygame.Surface(size, pygame.SRCALPHA)
+            self._draw(font)
+            self.loaded = False
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+        # Teilflächen teilen sich den Speicher des Atlas
+        self._sprites = {key: self.surface.subsurface(rect) for key, rect in self.regions.items()}
+    
+    def sprite(self, key:tuple) -> pygame.Surface:
+        """
+        Gibt einen Ausschnitt des Atlas als Teilfläche zurück
+        
+        Args:
+            key: Schlüssel des Ausschnitts (siehe atlas_layout)
+        
+        Returns:
+            pygame.Surface: Teilfläche (nicht verändern)
+        """
+        return self._sprites[key]
+    
+    def blit(self, target:pygame.Surface, key:tuple, position:tuple[int, int]) -> None:
+        """Blittet einen Ausschnitt an eine Position der Ziel-Fläche"""
+        target.blit(self.surface, position, self.regions[key])
+    
+    def save(self, path:str) -> None:
+        """Speichert den Atlas als Bild (z.B. als Vorlage für ein eigenes Thema)"""
+        pygame.image.save(self.surface, path)
+    
+    def _load(self, path:str, size:tuple[int, int]) -> pygame.Surface:
+        """Lädt ein Atlas-Bild und skaliert es ausschnittweise auf das Layout"""
+        image = pygame.image.load(path)
+        base_regions, base_size = atlas_layout(Layout())
+        if image.get_size() != base_size:
+            raise ValueError(f"Atlas {path} hat Größe {image.get_size()}, erwartet {base_size}")
+        if size == base_size and base_regions == self.regions:
+            return image
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        for key, rect in self.regions.items():
+            part = image.subsurface(base_regions[key])
+            surface.blit(pygame.transform.smoothscale(part, rect.size), rect)
+        return surface
+    
+    def _draw(self, font:pygame.font.Font) -> None:
+        """Zeichnet alle Ausschnitte aus den Farben des Themas"""
+        theme = self.theme
+        layout = self.layout
+        surface = self.surface
+        outline = layout.line(2)
+        for key, rect in self.regions.items():
+            surface.set_clip(rect)
+            kind = key[0]
+            if kind == 'face':
+                owner = key[1]
+                # Hintergrund in Spielerfarbe, leicht transparent
+                if owner:
+                    surface.fill((*theme.player_colors[owner], 100), rect)
+                pygame.draw.rect(surface, theme.outline, rect, outline)
+            elif kind == 'diamond':
+                _, value, corner = key
+                points = diamond_points(rect.x + 1, rect.y + 1, corner, layout.diamond_radius)
+                pygame.draw.polygon(surface, theme.diamond_colors[value], points)
+                pygame.draw.polygon(surface, theme.outline, points, outline)
+            elif kind == 'chip':
+                x, y = rect.x + rect.width // 2, rect.y + rect.height // 2
+                radius = layout.chip_radius
+                shadow = layout.chip_offset
+                pygame.draw.circle(surface, theme.chip_shadow, (x+shadow, y+shadow), radius)
+                pygame.draw.circle(surface, theme.chip_face, (x, y), radius)
+                pygame.draw.circle(surface, theme.chip_rim, (x, y), radius, layout.line(4))
+                text = font.render(str(key[1]), True, theme.chip_text)
+                surface.blit(text, text.get_rect(center=(x, y)))
+            elif kind == 'panel':
+                color = theme.panel_current if key[1] else theme.panel
+                pygame.draw.rect(surface, color, rect, border_radius=layout.px(8))
+        surface.set_clip(None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Texturatlanten der Themen als Vorlagen exportieren")
+    parser.add_argument('--export', default=THEMES_DIR, help="Zielordner")
+    args = parser.parse_args()
+    pygame.font.init()
+    os.makedirs(args.export, exist_ok=True)
+    font = pygame.font.Font(None, FONT_SIZE)
+    for key, theme in THEMES.items():
+        # Immer aus den Farben zeichnen, nicht ein vorhandenes Bild laden
+        atlas = TextureAtlas(theme._replace(atlas_path=None), font)
+        path = os.path.join(args.export, f'{key}.png')
+        atlas.save(path)
+        print(f"{theme.name}: {path}")
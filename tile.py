@@ -2,8 +2,65 @@
 Tile-Klasse für Diamantenplättchen
 """
 import random
+from functools import lru_cache
+
 from constants import *
 
+# Indizes der Diamanten in Tile.diamonds
+TOP, RIGHT, BOTTOM, LEFT = range(4)
+DIRECTION_INDEX = {'top': TOP, 'right': RIGHT, 'bottom': BOTTOM, 'left': LEFT}
+
+
+@lru_cache(maxsize=None)
+def _distinct_rotations(diamonds:tuple) -> tuple:
+    """Zwischengespeicherte Berechnung für distinct_rotations"""
+    seen = set()
+    rotations = []
+    current = diamonds
+    for rotation in range(4):
+        if current not in seen:
+            seen.add(current)
+            rotations.append(rotation)
+        current = (current[3], current[0], current[1], current[2])
+    return tuple(rotations)
+
+
+def distinct_rotations(diamonds) -> tuple:
+    """
+    Gibt die Drehungen zurück, die zu unterschiedlichen Ausrichtungen führen
+    Das Ergebnis wird je Diamantenfolge zwischengespeichert.
+    
+    Args:
+        diamonds: [oben, rechts, unten, links]
+    
+    Returns:
+        tuple: Anzahl Drehungen im Uhrzeigersinn (0-3)
+    """
+    return _distinct_rotations(tuple(diamonds))
+
+
+@lru_cache(maxsize=None)
+def _rotation_class(diamonds:tuple) -> tuple:
+    """Zwischengespeicherte Berechnung für rotation_class"""
+    top, right, bottom, left = diamonds
+    return min((top, right, bottom, left), (left, top, right, bottom),
+               (bottom, left, top, right), (right, bottom, left, top))
+
+
+def rotation_class(diamonds) -> tuple:
+    """
+    Gibt die kleinste Drehung eines Plättchens zurück
+    Plättchen auf der Hand dürfen beliebig gedreht werden; gleiche Klassen
+    bedeuten gleiche Zugmöglichkeiten.
+    
+    Args:
+        diamonds: [oben, rechts, unten, links]
+    
+    Returns:
+        tuple: Lexikographisch kleinste Ausrichtung
+    """
+    return _rotation_class(tuple(diamonds))
+
 
 class Tile:
     """
@@ -11,16 +68,18 @@ class Tile:
     Jeder Diamant hat einen Farbwert von 1-6
     """
     
-    def __init__(self, diamonds=None):
+    def __init__(self, diamonds=None, rng:random.Random | None = None):
         """
         Initialisiert ein Plättchen
         
         Args:
             diamonds: Liste von 4 Diamantenwerten (1-6) für [oben, rechts, unten, links]
                      Wenn None, werden zufällige Werte generiert
+            rng: Zufallsgenerator für die Diamanten (None = Modul random)
         """
         if diamonds is None:
-            self.diamonds = [random.randint(1, 4) for _ in range(4)]
+            randint = (rng or random).randint
+            self.diamonds = [randint(1, 4) for _ in range(4)]
         else:
             if len(diamonds) != 4:
                 raise ValueError("Ein Plättchen muss genau 4 Diamanten haben")
@@ -39,13 +98,7 @@ class Tile:
         Returns:
             int: Diamantwert (1-6)
         """
-        direction_map = {
-            'top': 0,
-            'right': 1,
-            'bottom': 2,
-            'left': 3
-        }
-        return self.diamonds[direction_map[direction]]
+        return self.diamonds[DIRECTION_INDEX[direction]]
     
     def rotate_clockwise(self):
         """
@@ -62,6 +115,15 @@ class Tile:
         self.diamonds = [self.diamonds[1], self.diamonds[2], 
                         self.diamonds[3], self.diamonds[0]]
     
+    def distinct_rotations(self) -> tuple:
+        """
+        Gibt die Drehungen zurück, die zu unterschiedlichen Ausrichtungen führen
+        
+        Returns:
+            tuple: Anzahl Drehungen im Uhrzeigersinn (0-3) ab der aktuellen Ausrichtung
+        """
+        return _distinct_rotations(tuple(self.diamonds))
+    
     def get_color(self, position):
         """
         Gibt die Farbe eines Diamanten an einer bestimmten Position zurück
@@ -87,18 +149,21 @@ class Tile:
         return f"Tile({self.diamonds}, owner={self.owner}, pos={self.position})"
     
     @staticmethod
-    def create_random_tile():
-        """Factory-Methode für ein zufälliges Plättchen"""
-        return Tile()
+    def create_random_tile(rng:random.Random | None = None):
+        """Factory-Methode für ein zufälliges Plättchen (rng: None = Modul random)"""
+        return Tile(rng=rng)
     
     @staticmethod
-    def create_tile_set():
+    def create_tile_set(rng:random.Random | None = None):
         """
         Erstellt einen kompletten Satz von 36 Plättchen für das Spiel
         Jede Kombination sollte theoretisch möglich sein
+        
+        Args:
+            rng: Zufallsgenerator für Diamanten und Mischen (None = Modul random)
         """
         tiles = []
         for _ in range(36):
-            tiles.append(Tile.create_random_tile())
-        random.shuffle(tiles)
+            tiles.append(Tile.create_random_tile(rng))
+        (rng or random).shuffle(tiles)
         return tiles
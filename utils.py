@@ -0,0 +1,346 @@
+"""
+Hilfsfunktionen für die Spielschleife (Menü, Eingaben, Aktualisierung, Zeichnen)
+Dieses Modul ist PyGame-abhängig und wird nur vom Hauptprogramm geladen.
+"""
+import pygame
+
+from animation import animate_move
+from constants import *
+from game import Game
+from replay import ReplayRecorder
+from theme import next_theme
+
+
+def start_menu(app):
+    """
+    Zeigt das Startmenü und startet ein Spiel mit der gewählten Spielerzahl
+    
+    Args:
+        app: CaratGame-Objekt
+    """
+    app.game = None
+    while app.running and app.game is None:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                app.running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_2, pygame.K_3, pygame.K_4):
+                    _start_game(app, Game(int(event.unicode), free_choice=app.free_choice))
+                elif event.key == pygame.K_1:
+                    # Ein Mensch gegen die KI
+                    game = Game(2, free_choice=app.free_choice)
+                    game.player_manager.players[1].is_human = False
+                    _start_game(app, game)
+                elif event.key == pygame.K_f:
+                    app.free_choice = not app.free_choice
+                elif event.key == pygame.K_t:
+                    _switch_theme(app)
+                elif event.key == pygame.K_ESCAPE:
+                    app.running = False
+            elif event.type == pygame.VIDEORESIZE:
+                _resize(app)
+        
+        _draw_menu(app)
+        app.clock.tick(FPS)
+
+
+def _start_game(app, game):
+    """
+    Startet ein Spiel und beginnt dessen Aufzeichnung
+    
+    Args:
+        app: CaratGame-Objekt
+        game: Game-Objekt
+    """
+    game.start_game()
+    app.game = game
+    if game.board.size != app.renderer.layout.board_size:
+        app.renderer.resize(app.screen, game.board.size)
+    app.recorder = ReplayRecorder(game)
+    app.replay = None
+    app.replay_position = None
+    app.show_hint = False
+    app.timeline.clear()
+    app.animated_moves = game.move_number
+    app.needs_redraw = True
+
+
+def _scrub(app, step):
+    """
+    Springt in der Wiederholung des beendeten Spiels vor oder zurück
+    
+    Args:
+        app: CaratGame-Objekt
+        step: Anzahl Züge (negativ = zurück)
+    """
+    if app.replay is None:
+        app.replay = app.recorder.replay()
+        app.replay_position = len(app.replay)
+    app.replay_position = max(0, min(len(app.replay), app.replay_position + step))
+
+
+def _resize(app):
+    """
+    Passt die Darstellung an die neue Fenstergröße an
+    Sprites werden nur bei geändertem Skalierungsfaktor neu erzeugt.
+    Laufende Animationen haben alte Positionen und werden verworfen.
+    
+    Args:
+        app: CaratGame-Objekt
+    """
+    app.screen = pygame.display.get_surface()
+    app.renderer.resize(app.screen)
+    app.timeline.clear()
+    app.needs_redraw = True
+
+
+def _switch_theme(app):
+    """
+    Wechselt zum nächsten Thema (nur der Texturatlas wird neu aufgebaut)
+    
+    Args:
+        app: CaratGame-Objekt
+    """
+    app.renderer.set_theme(next_theme(app.renderer.theme))
+    app.needs_redraw = True
+
+
+def _draw_menu(app):
+    """Zeichnet das Startmenü"""
+    renderer = app.renderer
+    layout = renderer.layout
+    theme = renderer.theme
+    app.screen.fill(theme.background)
+    
+    title = renderer.text_sprite("Carat", theme.text, title=True)
+    app.screen.blit(title, title.get_rect(center=layout.center(250)))
+    
+    hint = renderer.text_sprite("Spieleranzahl wählen: 2, 3 oder 4", theme.text)
+    app.screen.blit(hint, hint.get_rect(center=layout.center(350)))
+    hint_ai = renderer.text_sprite("1: Spiel gegen die KI", theme.text)
+    app.screen.blit(hint_ai, hint_ai.get_rect(center=layout.center(390)))
+    rule = "an" if app.free_choice else "aus"
+    hint_choice = renderer.text_sprite(f"F: Freie Plättchenwahl ({rule})", theme.text)
+    app.screen.blit(hint_choice, hint_choice.get_rect(center=layout.center(430)))
+    hint_theme = renderer.text_sprite(f"T: Thema ({theme.name})", theme.text)
+    app.screen.blit(hint_theme, hint_theme.get_rect(center=layout.center(470)))
+    
+    pygame.display.flip()
+
+
+def _cell_at(app, mouse_pos):
+    """
+    Rechnet eine Mausposition in eine Spielfeldposition um
+    
+    Args:
+        app: CaratGame-Objekt
+        mouse_pos: (x, y) Mausposition
+    
+    Returns:
+        tuple: (row, col)
+    """
+    return app.renderer.layout.cell_at(mouse_pos)
+
+
+def handle_events(app):
+    """
+    Verarbeitet alle anstehenden PyGame-Ereignisse
+    
+    Args:
+        app: CaratGame-Objekt
+    """
+    game = app.game
+    for event in pygame.event.get():
+        # Jedes Ereignis kann die Anzeige ändern
+        app.needs_redraw = True
+        if event.type == pygame.QUIT:
+            app.running = False
+        
+        elif event.type == pygame.VIDEORESIZE:
+            _resize(app)
+        
+        elif event.type == pygame.MOUSEMOTION:
+            app.mouse_pos = event.pos
+        
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if game.state == GAME_STATE_PLAYING and game.get_current_player().is_human:
+                row, col = _cell_at(app, event.pos)
+                if game.is_valid_placement(row, col):
+                    # Das Plättchen gleitet von der Vorschau an der Maus ins Feld
+                    half = app.renderer.layout.tile_size // 2
+                    app.drop_origin = (event.pos[0] - half, event.pos[1] - half)
+                    game.place_tile(row, col)
+        
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_t:
+                # Thema jederzeit umschaltbar, auch während die KI rechnet
+                _switch_theme(app)
+            elif game.state == GAME_STATE_PLAYING:
+                if event.key == pygame.K_ESCAPE:
+                    # Laufende KI-Berechnung abbrechen und zurück zum Menü
+                    game.cancel_pending_move()
+                    app.hint_provider.cancel()
+                    start_menu(app)
+                    return
+                elif not game.get_current_player().is_human:
+                    continue
+                elif event.key == pygame.K_r:
+                    game.rotate_current_tile_clockwise()
+                elif event.key == pygame.K_e:
+                    game.rotate_current_tile_counter_clockwise()
+                elif event.key == pygame.K_h:
+                    app.show_hint = not app.show_hint
+                elif event.key == pygame.K_TAB and game.free_choice:
+                    _select_next_tile(game)
+            
+            elif game.state == GAME_STATE_GAME_OVER:
+                if event.key == pygame.K_SPACE:
+                    game.reset()
+                    _start_game(app, game)
+                elif event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                    step = -1 if event.key == pygame.K_LEFT else 1
+                    if event.mod & pygame.KMOD_SHIFT:
+                        step *= app.recorder.keyframe_interval
+                    _scrub(app, step)
+                elif event.key == pygame.K_ESCAPE:
+                    start_menu(app)
+                    return
+
+
+def _select_next_tile(game):
+    """
+    Wählt das nächste Plättchen der Hand (freie Plättchenwahl)
+    
+    Args:
+        game: Game-Objekt
+    """
+    slots = [slot for slot, _ in game.get_current_player().hand.items()]
+    if slots:
+        later = [slot for slot in slots if slot > game.selected_slot]
+        game.select_tile(later[0] if later else slots[0])
+
+
+def _now() -> float:
+    """Gibt die Zeit für Animationen in Sekunden zurück"""
+    return pygame.time.get_ticks() / 1000
+
+
+def _update_display_state(app):
+    """
+    Startet Animationen für neue Züge und merkt sich, ob neu gezeichnet werden muss
+    
+    Args:
+        app: CaratGame-Objekt
+    """
+    game = app.game
+    if game.move_number != app.animated_moves:
+        app.timeline.clear()
+        if game.move_number == app.animated_moves + 1:
+            animate_move(app.timeline, app.renderer, game, _now(), app.drop_origin)
+        app.animated_moves = game.move_number
+        app.drop_origin = None
+        app.needs_redraw = True
+    
+    # Ein im Hintergrund fertig gewordener Tipp muss angezeigt werden
+    hint = app.hint_provider.hint(game) if app.show_hint else None
+    if hint != app.drawn_hint:
+        app.needs_redraw = True
+
+
+def update(app):
+    """
+    Aktualisiert den Spielzustand pro Frame
+    Ist ein KI-Spieler am Zug, wird seine Zugberechnung gestartet bzw.
+    abgefragt, bei einem Menschen die Berechnung des Tipps. Die Abfrage
+    blockiert nie.
+    
+    Args:
+        app: CaratGame-Objekt
+    """
+    game = app.game
+    app.hint_provider.update(game)
+    _update_display_state(app)
+    if game.state != GAME_STATE_PLAYING or game.get_current_player().is_human:
+        return
+    
+    if game.pending_move is None:
+        game.pending_move = app.move_provider.request(game)
+        return
+    
+    request = game.pending_move
+    if not request.done:
+        return
+    
+    game.pending_move = None
+    move = request.poll()
+    # Ergebnisse für eine veraltete Stellung verwerfen
+    if move is not None and request.move_number == game.move_number:
+        game.apply_move(move)
+
+
+def render(app):
+    """
+    Zeichnet den aktuellen Frame
+    Ohne Ereignisse, Zugwechsel und laufende Animationen bleibt der letzte
+    Frame stehen und es wird nichts gezeichnet.
+    
+    Args:
+        app: CaratGame-Objekt
+    """
+    now = _now()
+    timeline = app.timeline
+    if timeline.active:
+        timeline.update(now)
+        # Nach der letzten Animation einmal den Endzustand zeichnen
+        app.needs_redraw = app.needs_redraw or not timeline.active
+    if not app.needs_redraw and not timeline.active:
+        return
+    app.needs_redraw = False
+    
+    game = app.game
+    renderer = app.renderer
+    app.screen.fill(renderer.theme.background)
+    
+    if app.replay is not None and app.replay_position < len(app.replay):
+        _render_replay(app)
+        return
+    
+    renderer.draw_board(game.board)
+    app.drawn_hint = None
+    if game.state == GAME_STATE_PLAYING:
+        renderer.draw_valid_positions(game.valid_positions)
+        hint = app.hint_provider.hint(game) if app.show_hint else None
+        if hint is not None:
+            renderer.draw_hint(hint.row, hint.col, hint.tile_for(game))
+        app.drawn_hint = hint
+    renderer.draw_tiles(game.board, timeline.hidden_cells())
+    renderer.draw_player_info(game)
+    timeline.draw(renderer, now)
+    
+    if game.state == GAME_STATE_PLAYING and game.selected_tile:
+        renderer.draw_current_tile(game.selected_tile)
+        row, col = _cell_at(app, app.mouse_pos)
+        if game.board.is_valid_position(row, col):
+            renderer.draw_preview_tile(game.selected_tile, app.mouse_pos)
+    
+    if game.state == GAME_STATE_GAME_OVER:
+        renderer.draw_game_over(game)
+    
+    pygame.display.flip()
+
+
+
+def _render_replay(app):
+    """Zeichnet die aktuell gewählte Stellung der Wiederholung"""
+    renderer = app.renderer
+    position = app.replay.seek(app.replay_position)
+    
+    renderer.draw_board(position.board)
+    renderer.draw_tiles(position.board)
+    renderer.draw_player_info(position)
+    
+    text = f"Wiederholung: Zug {app.replay_position}/{len(app.replay)}  (← →, Shift: {app.recorder.keyframe_interval} Züge)"
+    hint = renderer.text_sprite(text, renderer.theme.text)
+    app.screen.blit(hint, renderer.layout.point(BOARD_OFFSET_X, renderer.layout.base_height - 40))
+    
+    pygame.display.flip()